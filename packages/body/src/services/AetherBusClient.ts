@@ -1,11 +1,20 @@
 import { PhysicsParams } from '../types/intent';
+import { decodeCbor, decodeMsgPack } from './wireCodecs';
+
+// Wire codecs in order of preference. CBOR frames are the smallest for
+// intent vectors; aetherbus.json must stay last because a browser fails the
+// handshake if it offers subprotocols and the server accepts none of them.
+const DEFAULT_PROTOCOLS = ['aetherbus.cbor', 'aetherbus.msgpack', 'aetherbus.json'];
 
 export class AetherBusClient {
     private ws: WebSocket;
     private messageHandler: ((payload: PhysicsParams) => void) | null = null;
+    private decoder = new TextDecoder();
 
-    constructor(url: string) {
-        this.ws = new WebSocket(url);
+    constructor(url: string, protocols: string[] = DEFAULT_PROTOCOLS) {
+        this.ws = new WebSocket(url, protocols);
+        // The Brain sends pre-encoded frames in the negotiated codec as binary messages
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             console.log('Connected to AetherBus');
@@ -13,7 +22,7 @@ export class AetherBusClient {
 
         this.ws.onmessage = (event) => {
             try {
-                const data = JSON.parse(event.data);
+                const data = this.decode(event.data as string | ArrayBuffer) as any;
 
                 // Validate MCP & PhysicsParams (support both direct and tools/ prefixed methods)
                 const isShaderIntentMethod =
@@ -35,6 +44,20 @@ export class AetherBusClient {
         };
     }
 
+    private decode(frame: string | ArrayBuffer): unknown {
+        if (typeof frame === 'string') {
+            return JSON.parse(frame);
+        }
+        switch (this.ws.protocol) {
+            case 'aetherbus.cbor':
+                return decodeCbor(frame);
+            case 'aetherbus.msgpack':
+                return decodeMsgPack(frame);
+            default:
+                return JSON.parse(this.decoder.decode(frame));
+        }
+    }
+
     public onMessage(handler: (payload: PhysicsParams) => void) {
         this.messageHandler = handler;
     }
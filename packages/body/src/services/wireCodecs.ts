@@ -0,0 +1,214 @@
+// Decoders for the binary AetherBus wire codecs negotiated on /ws.
+// The Brain only sends these to clients that offered the matching
+// subprotocol ("aetherbus.cbor" / "aetherbus.msgpack").
+
+const textDecoder = new TextDecoder();
+
+class Reader {
+    private view: DataView;
+    private bytes: Uint8Array;
+    offset = 0;
+
+    constructor(buffer: ArrayBuffer) {
+        this.view = new DataView(buffer);
+        this.bytes = new Uint8Array(buffer);
+    }
+
+    u8(): number {
+        return this.view.getUint8(this.offset++);
+    }
+
+    u16(): number {
+        const value = this.view.getUint16(this.offset);
+        this.offset += 2;
+        return value;
+    }
+
+    u32(): number {
+        const value = this.view.getUint32(this.offset);
+        this.offset += 4;
+        return value;
+    }
+
+    u64(): number {
+        const value = Number(this.view.getBigUint64(this.offset));
+        this.offset += 8;
+        return value;
+    }
+
+    i8(): number {
+        return this.view.getInt8(this.offset++);
+    }
+
+    i16(): number {
+        const value = this.view.getInt16(this.offset);
+        this.offset += 2;
+        return value;
+    }
+
+    i32(): number {
+        const value = this.view.getInt32(this.offset);
+        this.offset += 4;
+        return value;
+    }
+
+    i64(): number {
+        const value = Number(this.view.getBigInt64(this.offset));
+        this.offset += 8;
+        return value;
+    }
+
+    f16(): number {
+        const half = this.u16();
+        const exponent = (half >> 10) & 0x1f;
+        const fraction = half & 0x3ff;
+        const sign = half & 0x8000 ? -1 : 1;
+        if (exponent === 0) return sign * 2 ** -14 * (fraction / 1024);
+        if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+        return sign * 2 ** (exponent - 15) * (1 + fraction / 1024);
+    }
+
+    f32(): number {
+        const value = this.view.getFloat32(this.offset);
+        this.offset += 4;
+        return value;
+    }
+
+    f64(): number {
+        const value = this.view.getFloat64(this.offset);
+        this.offset += 8;
+        return value;
+    }
+
+    raw(length: number): Uint8Array {
+        const slice = this.bytes.subarray(this.offset, this.offset + length);
+        this.offset += length;
+        return slice;
+    }
+
+    str(length: number): string {
+        return textDecoder.decode(this.raw(length));
+    }
+}
+
+// --- MessagePack ------------------------------------------------------------
+
+function readMsgPack(r: Reader): unknown {
+    const type = r.u8();
+    if (type <= 0x7f) return type;
+    if (type >= 0xe0) return type - 0x100;
+    if (type >= 0xa0 && type <= 0xbf) return r.str(type & 0x1f);
+    if (type >= 0x90 && type <= 0x9f) return msgPackArray(r, type & 0x0f);
+    if (type >= 0x80 && type <= 0x8f) return msgPackMap(r, type & 0x0f);
+
+    switch (type) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: return r.raw(r.u8()).slice();
+        case 0xc5: return r.raw(r.u16()).slice();
+        case 0xc6: return r.raw(r.u32()).slice();
+        case 0xca: return r.f32();
+        case 0xcb: return r.f64();
+        case 0xcc: return r.u8();
+        case 0xcd: return r.u16();
+        case 0xce: return r.u32();
+        case 0xcf: return r.u64();
+        case 0xd0: return r.i8();
+        case 0xd1: return r.i16();
+        case 0xd2: return r.i32();
+        case 0xd3: return r.i64();
+        case 0xd9: return r.str(r.u8());
+        case 0xda: return r.str(r.u16());
+        case 0xdb: return r.str(r.u32());
+        case 0xdc: return msgPackArray(r, r.u16());
+        case 0xdd: return msgPackArray(r, r.u32());
+        case 0xde: return msgPackMap(r, r.u16());
+        case 0xdf: return msgPackMap(r, r.u32());
+        default:
+            // Extension types (0xc7-0xc9, 0xd4-0xd8) are never sent by the Brain
+            throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+}
+
+function msgPackArray(r: Reader, length: number): unknown[] {
+    const items = new Array(length);
+    for (let i = 0; i < length; i++) items[i] = readMsgPack(r);
+    return items;
+}
+
+function msgPackMap(r: Reader, length: number): Record<string, unknown> {
+    const map: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+        const key = readMsgPack(r);
+        map[String(key)] = readMsgPack(r);
+    }
+    return map;
+}
+
+export function decodeMsgPack(buffer: ArrayBuffer): unknown {
+    return readMsgPack(new Reader(buffer));
+}
+
+// --- CBOR -------------------------------------------------------------------
+
+function cborLength(r: Reader, info: number): number {
+    if (info < 24) return info;
+    switch (info) {
+        case 24: return r.u8();
+        case 25: return r.u16();
+        case 26: return r.u32();
+        case 27: return r.u64();
+        default:
+            // Indefinite lengths are never produced by canonical encoding
+            throw new Error(`Unsupported CBOR length encoding ${info}`);
+    }
+}
+
+function readCbor(r: Reader): unknown {
+    const initial = r.u8();
+    const major = initial >> 5;
+    const info = initial & 0x1f;
+
+    switch (major) {
+        case 0: return cborLength(r, info);
+        case 1: return -1 - cborLength(r, info);
+        case 2: return r.raw(cborLength(r, info)).slice();
+        case 3: return r.str(cborLength(r, info));
+        case 4: {
+            const length = cborLength(r, info);
+            const items = new Array(length);
+            for (let i = 0; i < length; i++) items[i] = readCbor(r);
+            return items;
+        }
+        case 5: {
+            const length = cborLength(r, info);
+            const map: Record<string, unknown> = {};
+            for (let i = 0; i < length; i++) {
+                const key = readCbor(r);
+                map[String(key)] = readCbor(r);
+            }
+            return map;
+        }
+        case 6:
+            // Tagged value: the tag carries no meaning for AetherBus frames
+            cborLength(r, info);
+            return readCbor(r);
+        default:
+            switch (info) {
+                case 20: return false;
+                case 21: return true;
+                case 22: return null;
+                case 23: return undefined;
+                case 25: return r.f16();
+                case 26: return r.f32();
+                case 27: return r.f64();
+                default:
+                    throw new Error(`Unsupported CBOR simple value ${info}`);
+            }
+    }
+}
+
+export function decodeCbor(buffer: ArrayBuffer): unknown {
+    return readCbor(new Reader(buffer));
+}
@@ -0,0 +1,194 @@
+"""
+FILE: admission.py
+CONTEXT: AG-SC-ADK / Brain / Gateway
+DESCRIPTION: Admission control and load shedding for inbound work.
+
+Every voice_data request passes three gates before it reaches a pipeline:
+a token bucket per connection and per identity source_id (so opening more
+sockets does not buy more rate), a global budget of in-flight pipeline
+messages, and a lag-based shedder. When the event loop falls behind, the
+bus drops telemetry (render_light) and only once the lag is several times
+worse does admission refuse new user intents.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import loop_lag_last, registry
+
+# Priorities, lowest first: telemetry is shed before intents
+TELEMETRY = 0
+INTENT = 1
+TELEMETRY_TOPICS = frozenset({"render_light"})
+
+REJECTED = registry.counter("admission_rejected_total", "Requests refused before entering a pipeline", ["reason"])
+SHED = registry.counter("admission_shed_total", "Bus messages shed under event loop lag", ["topic"])
+
+
+def priority_of(topic):
+    return TELEMETRY if topic in TELEMETRY_TOPICS else INTENT
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average and bursts of up to `burst`.
+    Refilled lazily from the clock on each call, so idle buckets cost nothing.
+    """
+    __slots__ = ("rate", "burst", "tokens", "updated", "clock")
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def refund(self, tokens=1):
+        self.tokens = min(self.burst, self.tokens + tokens)
+
+    def retry_after(self, tokens=1):
+        """
+        Seconds until `tokens` would be available.
+        """
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+class KeyedRateLimiter:
+    """
+    One TokenBucket per key (e.g. identity source_id), bounded as an LRU.
+    An evicted key simply starts again with a full bucket.
+    """
+    def __init__(self, rate, burst, max_keys=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, self.clock)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+
+class ConcurrencyBudget:
+    """
+    Global cap on messages admitted into pipelines but not yet published.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, count=1):
+        with self._lock:
+            if self.in_flight + count > self.limit:
+                return False
+            self.in_flight += count
+            return True
+
+    def release(self, count=1):
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - count)
+
+
+class LoadShedder:
+    """
+    Decides from the latest event loop lag whether work of a priority may run.
+    Telemetry is shed above telemetry_lag, intents only above intent_lag.
+    """
+    def __init__(self, telemetry_lag=0.05, intent_lag=0.25, lag=None):
+        self.thresholds = {TELEMETRY: telemetry_lag, INTENT: intent_lag}
+        self.lag = lag or loop_lag_last.labels().get
+
+    def admit(self, priority):
+        return self.lag() <= self.thresholds[priority]
+
+    def admit_topic(self, topic, count=1):
+        """
+        Bus hook: returns False (and counts the `count` dropped messages) for
+        a telemetry topic to shed now. Intents are never shed on the bus: by
+        the time one is published it was admitted and acknowledged, so it is
+        refused at admission instead, where the client gets an error.
+        """
+        if priority_of(topic) != TELEMETRY or self.admit(TELEMETRY):
+            return True
+        SHED.labels(topic).inc(count)
+        return False
+
+
+class AdmissionController:
+    """
+    The gates for one process. admit(connection_bucket, source_id) returns
+    None when a request may enter a pipeline (holding one budget slot, which
+    the pipeline releases), or (reason, retry_after) when it is refused.
+    """
+    def __init__(self, rate=20.0, burst=40, source_rate=None, source_burst=None, max_in_flight=256,
+                 shedder=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        # An identity shares one rate across all of its connections
+        self.sources = KeyedRateLimiter(source_rate or rate, source_burst or burst, clock=clock)
+        self.budget = ConcurrencyBudget(max_in_flight)
+        self.shedder = shedder or LoadShedder()
+
+    def connection_bucket(self):
+        return TokenBucket(self.rate, self.burst, self.clock)
+
+    def admit(self, connection_bucket, source_id=None):
+        if not self.shedder.admit(INTENT):
+            return self._reject("overloaded", 1.0)
+        if not connection_bucket.try_acquire():
+            return self._reject("rate_connection", connection_bucket.retry_after())
+        source_bucket = self.sources.bucket(source_id) if source_id is not None else None
+        if source_bucket is not None and not source_bucket.try_acquire():
+            # A refused request does not count against the other gates
+            connection_bucket.refund()
+            return self._reject("rate_source", source_bucket.retry_after())
+        if not self.budget.try_acquire():
+            connection_bucket.refund()
+            if source_bucket is not None:
+                source_bucket.refund()
+            return self._reject("budget", 0.1)
+        return None
+
+    def admit_query(self, connection_bucket):
+        """
+        Gates for read-only requests (memory/recall): they share the
+        connection's rate and are refused under overload, but hold no
+        pipeline budget.
+        """
+        if not self.shedder.admit(INTENT):
+            return self._reject("overloaded", 1.0)
+        if not connection_bucket.try_acquire():
+            return self._reject("rate_connection", connection_bucket.retry_after())
+        return None
+
+    @staticmethod
+    def _reject(reason, retry_after):
+        REJECTED.labels(reason).inc()
+        return reason, round(retry_after, 3)
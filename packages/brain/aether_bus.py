@@ -1,60 +1,465 @@
 import asyncio
 import json
-from datetime import datetime
+import time
+from collections import deque
+from fnmatch import fnmatchcase
+from codec import JSON
+from dead_letter import DeadLetter, DeadLetterQueue
 from logger import audit_logger
+from metrics import registry
+
+try:
+    import orjson
+except ImportError:  # Optional fast JSON backend
+    orjson = None
+
+# Overflow policies for a subscriber's bounded send queue
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_COALESCE = "coalesce"  # Keep only the latest pending message per topic and key, drop oldest when full
+OVERFLOW_DISCONNECT = "disconnect"
+
+OVERFLOW_POLICIES = (
+    OVERFLOW_DROP_OLDEST,
+    OVERFLOW_DROP_NEWEST,
+    OVERFLOW_COALESCE,
+    OVERFLOW_DISCONNECT,
+)
+
+WILDCARD_CHARS = "*?["
+
+IDENTITY_CACHE_SIZE = 1024
+
+PUBLISH_SECONDS = registry.histogram("aetherbus_publish_seconds", "Time to encode and enqueue one publish")
+PUBLISHED = registry.counter("aetherbus_published_total", "Frames published on this worker")
+OVERFLOW_DROPS = registry.counter("aetherbus_overflow_drops_total", "Frames dropped or superseded by subscriber overflow policies")
+DEAD_LETTERS = registry.counter("aetherbus_dead_letters_total", "Messages moved to the dead-letter queue", ["kind"])
+
+
+def encode_json(value):
+    """
+    Serialize to compact UTF-8 JSON bytes, using orjson when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class Subscription:
+    """
+    A single subscriber on the bus.
+    Owns a bounded send queue and a drain task, so a slow consumer
+    only ever delays itself.
+    """
+    def __init__(self, bus, callback, topics=None, maxsize=256, overflow=OVERFLOW_DROP_OLDEST, codec=JSON):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.bus = bus
+        self.callback = callback
+        self.topics = tuple(topics) if topics else ("*",)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.codec = codec
+
+        self.queue = deque()  # (topic, frame, coalesce key, DeadLetter being replayed or None)
+        self._pending_keys = set()  # (topic, key) with a frame queued, under OVERFLOW_COALESCE
+        self.dropped = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = None
+
+    def matches(self, topic):
+        return any(fnmatchcase(topic, pattern) for pattern in self.topics)
+
+    def offer(self, topic, message, key=None, letter=None):
+        """
+        Enqueue a pre-encoded frame without waiting. Returns False if it was not accepted.
+        Under OVERFLOW_COALESCE a frame supersedes the pending one with the same
+        topic and key (e.g. the same telemetry source).
+        letter is the DeadLetter the frame replays, carried through to a retry.
+        """
+        if self.closed:
+            return False
+
+        if self.overflow == OVERFLOW_COALESCE and (topic, key) in self._pending_keys:
+            # Supersede the pending message for this topic and key in place
+            for i, (pending_topic, _, pending_key, _) in enumerate(self.queue):
+                if pending_topic == topic and pending_key == key:
+                    self.queue[i] = (topic, message, key, letter)
+                    self.dropped += 1
+                    OVERFLOW_DROPS.inc()
+                    return True
+
+        if len(self.queue) >= self.maxsize:
+            if not self._make_room(topic):
+                return False
+
+        self.queue.append((topic, message, key, letter))
+        if self.overflow == OVERFLOW_COALESCE:
+            self._pending_keys.add((topic, key))
+        self._idle.clear()
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+        return True
+
+    def redeliver(self, letter):
+        """
+        Offer a dead letter's frame again. If the callback fails on it, the
+        same letter goes back to the queue, so its attempts keep counting.
+        """
+        return self.offer(letter.topic, letter.frame, letter=letter)
+
+    def _make_room(self, topic):
+        self.dropped += 1
+        OVERFLOW_DROPS.inc()
+        if self.overflow == OVERFLOW_DROP_NEWEST:
+            return False
+        if self.overflow == OVERFLOW_DISCONNECT:
+            audit_logger.log_event("AetherBus", "Overflow", "SubscriberDisconnected", {"topic": topic})
+            self.bus.unsubscribe(self.callback)
+            return False
+        evicted_topic, _, evicted_key, _ = self.queue.popleft()
+        self._pending_keys.discard((evicted_topic, evicted_key))
+        return True
+
+    async def _drain(self):
+        while not self.closed:
+            if not self.queue:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            topic, message, key, letter = self.queue.popleft()
+            self._pending_keys.discard((topic, key))
+            try:
+                await self.callback(message)
+            except Exception as e:
+                # Subscriber failed (disconnected?); keep the frame for retry
+                if letter is None:
+                    letter = DeadLetter(topic, f"Subscriber Error: {e}", frame=message, callback=self.callback)
+                else:
+                    letter.reason = f"Subscriber Error: {e}"
+                self.bus._dead_letter(letter)
+
+    async def join(self):
+        """
+        Wait until every queued message has been handed to the callback.
+        """
+        if self._task is not None and not self.closed:
+            await self._idle.wait()
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        self._pending_keys.clear()
+        self._idle.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
 
 class AetherBus:
-    def __init__(self):
-        self.subscribers = []
-        self.dead_letter_queue = []
+    def __init__(self, default_maxsize=256, default_overflow=OVERFLOW_DROP_OLDEST,
+                 dead_letter_queue=None, max_delivery_attempts=3, shedder=None):
+        self.subscribers = {}  # callback -> Subscription
+        self.backplane = None  # Relays frames to AetherBus instances in other workers
+        self.shedder = shedder  # admission.LoadShedder: drops low-priority topics under lag
+        self.dead_letter_queue = dead_letter_queue if dead_letter_queue is not None else DeadLetterQueue()
+        self.max_delivery_attempts = max_delivery_attempts
+        self.default_maxsize = default_maxsize
+        self.default_overflow = default_overflow
+
+        # Routing index: exact topics resolve by dict lookup, wildcard
+        # patterns are matched once per topic and cached until membership changes.
+        self._exact = {}
+        self._patterns = []
+        self._route_cache = {}
+
+        # Pre-encoded envelope fragments, so only `arguments` is serialized per publish
+        self._prefix_cache = {}
+        self._identity_cache = {}
+
+    def subscribe(self, callback, topics=None, maxsize=None, overflow=None, codec=None):
+        """
+        Register a subscriber.
+        Callback: async callable receiving each frame as bytes (send_bytes style).
+        Topics: exact names ("ui:shader_intent") or wildcards ("ui:*"). None means everything.
+        Codec: wire encoding of the frames (codec.CODECS); UTF-8 JSON by default.
+        """
+        if callback in self.subscribers:
+            self.unsubscribe(callback)
+
+        subscription = Subscription(
+            self,
+            callback,
+            topics=topics,
+            maxsize=maxsize or self.default_maxsize,
+            overflow=overflow or self.default_overflow,
+            codec=codec or JSON,
+        )
+        self.subscribers[callback] = subscription
+
+        for pattern in subscription.topics:
+            if any(ch in pattern for ch in WILDCARD_CHARS):
+                self._patterns.append((pattern, subscription))
+            else:
+                self._exact.setdefault(pattern, []).append(subscription)
+        self._route_cache.clear()
+        return subscription
+
+    def unsubscribe(self, callback):
+        subscription = self.subscribers.pop(callback, None)
+        if subscription is None:
+            return
+
+        for pattern in subscription.topics:
+            subs = self._exact.get(pattern)
+            if subs and subscription in subs:
+                subs.remove(subscription)
+                if not subs:
+                    del self._exact[pattern]
+        self._patterns = [(p, s) for p, s in self._patterns if s is not subscription]
+        self._route_cache.clear()
+        subscription.close()
+
+    def _route(self, topic):
+        route = self._route_cache.get(topic)
+        if route is None:
+            matched = list(self._exact.get(topic, ()))
+            for pattern, subscription in self._patterns:
+                if subscription not in matched and fnmatchcase(topic, pattern):
+                    matched.append(subscription)
+            route = tuple(matched)
+            self._route_cache[topic] = route
+        return route
+
+    def _envelope_prefix(self, topic):
+        prefix = self._prefix_cache.get(topic)
+        if prefix is None:
+            prefix = b"".join((
+                b'{"jsonrpc":"2.0","method":',
+                encode_json(f"tools/{topic}"),
+                b',"params":{"name":',
+                encode_json(topic),
+                b',"arguments":',
+            ))
+            self._prefix_cache[topic] = prefix
+        return prefix
+
+    def _identity_suffix(self, identity_header):
+        try:
+            key = tuple(identity_header.items())
+            suffix = self._identity_cache.get(key)
+        except TypeError:  # Unhashable header values; encode without caching
+            key, suffix = None, None
+
+        if suffix is None:
+            suffix = b',"_identity":' + encode_json(identity_header) + b"}}"
+            if key is not None:
+                if len(self._identity_cache) >= IDENTITY_CACHE_SIZE:
+                    self._identity_cache.clear()
+                self._identity_cache[key] = suffix
+        return suffix
 
-    def subscribe(self, callback):
-        self.subscribers.append(callback)
+    def encode_frame(self, topic, payload, identity_header):
+        """
+        Build the MCP envelope as one immutable UTF-8 frame:
+        {"jsonrpc": "2.0", "method": "tools/<topic>",
+         "params": {"name": <topic>, "arguments": <payload>, "_identity": <identity>}}
+        """
+        return b"".join((
+            self._envelope_prefix(topic),
+            encode_json(payload),
+            self._identity_suffix(identity_header),
+        ))
 
-    async def publish(self, topic, payload, identity_header):
+    async def publish(self, topic, payload, identity_header, key=None):
         """
-        Publish a message to all subscribers.
+        Publish a message to all subscribers of the topic.
         Topic: e.g., "intent.light"
+        The frame is encoded once and the same bytes object is handed to every
+        subscriber; delivery is queued per subscriber and never waits on a socket.
+        key scopes coalescing within the topic (e.g. a telemetry source id).
+        Returns False if the message was shed or could not be serialized.
         """
-        # Construct MCP Payload
-        mcp_payload = {
-            "jsonrpc": "2.0",
-            "method": f"tools/{topic}",
-            "params": {
-                "name": topic,
-                "arguments": payload,
-                "_identity": identity_header
-            }
-        }
+        if self.shedder is not None and not self.shedder.admit_topic(topic):
+            return False
 
-        # Serialize
+        started = time.perf_counter()
         try:
-            message_text = json.dumps(mcp_payload)
+            frame = self.encode_frame(topic, payload, identity_header)
         except Exception as e:
-            self._handle_dead_letter(payload, f"Serialization Error: {e}")
-            return
+            self._dead_letter(DeadLetter(
+                topic, f"Serialization Error: {e}", payload=payload, identity_header=identity_header
+            ))
+            return False
+
+        # Fan out to matching subscribers only
+        self._deliver_local(topic, frame, payload, identity_header, key)
+        if self.backplane is not None:
+            self.backplane.relay(topic, frame)
+
+        # Logging
+        audit_logger.log_event(identity_header.get("source_id"), "Publish", "Success", {"topic": topic})
+        PUBLISHED.inc()
+        PUBLISH_SECONDS.observe_since(started)
+        return True
 
-        # Broadcast
-        async def _safe_callback(callback):
+    async def publish_many(self, topic, payloads, identity_header):
+        """
+        Publish several payloads to one topic as consecutive frames, in order.
+        One call shares the identity encoding, audit entry and metrics across
+        the batch; a payload that fails to serialize is dead-lettered alone.
+        Under load shedding the batch is admitted or dropped as a whole.
+        """
+        payloads = list(payloads)
+        if self.shedder is not None and not self.shedder.admit_topic(topic, len(payloads)):
+            return 0
+        started = time.perf_counter()
+        published = 0
+        for payload in payloads:
             try:
-                await callback(message_text)
+                frame = self.encode_frame(topic, payload, identity_header)
             except Exception as e:
-                # Subscriber failed (disconnected?)
-                # We might remove them or just log
-                audit_logger.log_event("AetherBus", "Publish", "SubscriberFailed", str(e))
+                self._dead_letter(DeadLetter(
+                    topic, f"Serialization Error: {e}", payload=payload, identity_header=identity_header
+                ))
+                continue
 
-        if self.subscribers:
-            await asyncio.gather(*(_safe_callback(cb) for cb in self.subscribers))
+            self._deliver_local(topic, frame, payload, identity_header)
+            if self.backplane is not None:
+                self.backplane.relay(topic, frame)
+            published += 1
 
-        # Update subscribers list (remove disconnected ones if needed, but for now we keep simple)
-        # Logging
-        audit_logger.log_event(identity_header.get("source_id"), "Publish", "Success", {"topic": topic})
+        if published:
+            audit_logger.log_event(
+                identity_header.get("source_id"), "Publish", "Success", {"topic": topic, "count": published}
+            )
+            PUBLISHED.inc(published)
+            PUBLISH_SECONDS.observe_since(started)
+        return published
+
+    def pressure(self, topic):
+        """
+        Fill ratio (0..1) of the most backed-up subscriber queue for a topic.
+        Producers use it to slow down instead of overflowing consumers.
+        """
+        return max((len(sub.queue) / sub.maxsize for sub in self._route(topic)), default=0.0)
+
+    def dropped(self, topic):
+        """
+        Frames dropped or superseded so far by the current subscribers of a
+        topic (any topic they carry). A producer sending deltas resyncs with a
+        full frame when this grows.
+        """
+        return sum(sub.dropped for sub in self._route(topic))
+
+    def _deliver_local(self, topic, frame, payload=None, identity_header=None, key=None):
+        """
+        Offer the JSON frame to JSON subscribers and, for every other codec in
+        use, one shared encoding made at most once per call. Without the payload
+        (frames from peers) the envelope is recovered from the JSON frame.
+        """
+        encoded = None  # codec name -> frame, or None if that codec failed
+        message = None
+        for subscription in self._route(topic):
+            codec = subscription.codec
+            if codec is JSON:
+                subscription.offer(topic, frame, key)
+                continue
+
+            if encoded is None:
+                encoded = {}
+            if codec.name not in encoded:
+                if message is None:
+                    message = self._envelope(topic, payload, identity_header) if payload is not None else JSON.decode(frame)
+                try:
+                    encoded[codec.name] = codec.encode(message)
+                except Exception as e:
+                    encoded[codec.name] = None
+                    self._dead_letter(DeadLetter(topic, f"Serialization Error ({codec.name}): {e}", frame=frame))
+            if encoded[codec.name] is not None:
+                subscription.offer(topic, encoded[codec.name], key)
+
+    @staticmethod
+    def _envelope(topic, payload, identity_header):
+        # Same structure encode_frame writes as JSON
+        return {
+            "jsonrpc": "2.0",
+            "method": f"tools/{topic}",
+            "params": {"name": topic, "arguments": payload, "_identity": identity_header},
+        }
+
+    async def _deliver_remote(self, topic, frame):
+        # Frames from other workers: local fan-out only, never relayed again
+        self._deliver_local(topic, frame)
+
+    async def attach_backplane(self, backplane):
+        """
+        Join a cross-process backplane; publish/subscribe stay unchanged.
+        """
+        await backplane.start(self._deliver_remote)
+        self.backplane = backplane
+
+    async def detach_backplane(self):
+        if self.backplane is not None:
+            backplane, self.backplane = self.backplane, None
+            await backplane.close()
+
+    async def join(self):
+        """
+        Wait until all subscriber queues have drained.
+        """
+        await asyncio.gather(*(sub.join() for sub in list(self.subscribers.values())))
+
+    async def replay_dead_letters(self, limit=None, rate_per_second=50.0):
+        """
+        Re-deliver dead letters oldest first, at most rate_per_second.
+        Frames go back to the subscriber that failed them (if still subscribed);
+        unserializable payloads are published again.
+        """
+        interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        replayed = 0
+        expired = 0
+        while self.dead_letter_queue and (limit is None or replayed + expired < limit):
+            letter = self.dead_letter_queue.popleft()
+            letter.attempts += 1
+
+            if letter.frame is not None:
+                subscription = self.subscribers.get(letter.callback)
+                if subscription is None or letter.attempts > self.max_delivery_attempts:
+                    expired += 1
+                    continue
+                subscription.redeliver(letter)
+            else:
+                if letter.attempts > self.max_delivery_attempts:
+                    expired += 1
+                    continue
+                try:
+                    frame = self.encode_frame(letter.topic, letter.payload, letter.identity_header)
+                except Exception:
+                    self._dead_letter(letter)
+                    continue
+                self._deliver_local(letter.topic, frame, letter.payload, letter.identity_header)
+
+            replayed += 1
+            if interval:
+                await asyncio.sleep(interval)
+
+        audit_logger.log_event("AetherBus", "DeadLetterReplay", "Success", {"replayed": replayed, "expired": expired})
+        return {"replayed": replayed, "expired": expired}
+
+    def dead_letter_stats(self):
+        return self.dead_letter_queue.stats()
 
-    def _handle_dead_letter(self, payload, reason):
-        print(f"Dead Letter: {reason}")
-        self.dead_letter_queue.append({
-            "payload": payload,
-            "reason": reason,
-            "timestamp": datetime.now().isoformat()
-        })
-        audit_logger.log_event("AetherBus", "DeadLetter", "Error", reason)
+    def _dead_letter(self, letter):
+        self.dead_letter_queue.push(letter)
+        DEAD_LETTERS.labels("serialization" if letter.reason.startswith("Serialization") else "delivery").inc()
+        audit_logger.log_event("AetherBus", "DeadLetter", "Error", {"topic": letter.topic, "reason": letter.reason})
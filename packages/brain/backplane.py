@@ -0,0 +1,178 @@
+"""
+FILE: backplane.py
+CONTEXT: AG-SC-ADK / Brain / AetherBus
+DESCRIPTION: Cross-process relay of published frames between Brain workers.
+
+Every worker listens on a Unix domain socket inside a shared directory and
+forwards each locally published frame to all peers found there. No broker
+process is involved. Frames carry an origin-tagged header so receivers
+drop their own echoes and any duplicates.
+"""
+import asyncio
+import logging
+import os
+import struct
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger("AetherBus.Backplane")
+
+# origin node id, sequence number, topic length, frame length
+HEADER = struct.Struct("!16sQHI")
+
+
+class Backplane:
+    """
+    Interface for relaying frames between AetherBus instances in different processes.
+    start(deliver) registers the local fan-out for frames arriving from peers;
+    relay(topic, frame) must not block the publisher.
+    """
+    async def start(self, deliver):
+        raise NotImplementedError
+
+    def relay(self, topic, frame):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class UnixSocketBackplane(Backplane):
+    def __init__(self, directory, node_id=None, outbox_size=1024, dedup_window=4096,
+                 peer_refresh_seconds=1.0, max_peer_buffer=1024 * 1024):
+        self.directory = directory
+        self.node_id = node_id or uuid.uuid4()
+        self.path = os.path.join(directory, f"{self.node_id.hex[:12]}.sock")
+        self.outbox_size = outbox_size
+        self.dedup_window = dedup_window
+        self.peer_refresh_seconds = peer_refresh_seconds
+        self.max_peer_buffer = max_peer_buffer
+
+        self._origin = self.node_id.bytes
+        self._seq = 0
+        self._seen = OrderedDict()  # (origin, seq) of recently delivered frames
+        self._deliver = None
+        self._server = None
+        self._outbox = None
+        self._sender = None
+        self._readers = set()
+        self._peers = {}  # socket path -> StreamWriter
+        self._peers_refreshed = 0.0
+
+        self.relayed = 0
+        self.received = 0
+        self.duplicates = 0
+        self.dropped = 0
+
+    async def start(self, deliver):
+        self._deliver = deliver
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=self.path)
+        self._outbox = asyncio.Queue(maxsize=self.outbox_size)
+        self._sender = asyncio.create_task(self._send_loop())
+        logger.info(f"🔗 Backplane node {self.node_id.hex[:12]} listening on {self.path}")
+
+    def relay(self, topic, frame):
+        """
+        Queue a locally published frame for every peer. Drops the oldest
+        queued frame instead of waiting when the outbox is full.
+        """
+        if self._outbox is None:
+            return
+        self._seq += 1
+        topic_bytes = topic.encode("utf-8")
+        message = HEADER.pack(self._origin, self._seq, len(topic_bytes), len(frame)) + topic_bytes + frame
+        if self._outbox.full():
+            self._outbox.get_nowait()
+            self.dropped += 1
+        self._outbox.put_nowait(message)
+
+    async def close(self):
+        if self._sender is not None:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+        for writer in self._peers.values():
+            writer.close()
+        self._peers.clear()
+        for task in list(self._readers):
+            task.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def _send_loop(self):
+        while True:
+            message = await self._outbox.get()
+            await self._refresh_peers()
+            for path, writer in list(self._peers.items()):
+                if writer.is_closing():
+                    del self._peers[path]
+                    continue
+                if writer.transport.get_write_buffer_size() > self.max_peer_buffer:
+                    # A stalled peer loses frames rather than slowing the others
+                    self.dropped += 1
+                    continue
+                writer.write(message)
+            self.relayed += 1
+
+    async def _refresh_peers(self):
+        now = time.monotonic()
+        if now - self._peers_refreshed < self.peer_refresh_seconds:
+            return
+        self._peers_refreshed = now
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        alive = {os.path.join(self.directory, name) for name in names if name.endswith(".sock")}
+        alive.discard(self.path)
+
+        for path in list(self._peers):
+            if path not in alive:
+                self._peers.pop(path).close()
+        for path in alive - set(self._peers):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except OSError:
+                continue  # Stale socket file from a dead worker
+            self._peers[path] = writer
+
+    async def _handle_peer(self, reader, writer):
+        task = asyncio.current_task()
+        self._readers.add(task)
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                origin, seq, topic_length, frame_length = HEADER.unpack(header)
+                topic = (await reader.readexactly(topic_length)).decode("utf-8")
+                frame = await reader.readexactly(frame_length)
+                if self._is_duplicate(origin, seq):
+                    self.duplicates += 1
+                    continue
+                self.received += 1
+                await self._deliver(topic, frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._readers.discard(task)
+            writer.close()
+
+    def _is_duplicate(self, origin, seq):
+        if origin == self._origin:
+            return True
+        key = (origin, seq)
+        if key in self._seen:
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+        return False
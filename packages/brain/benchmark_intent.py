@@ -13,24 +13,15 @@ sys.modules['chromadb'] = MagicMock()
 sys.modules['chromadb.config'] = MagicMock()
 
 class MockVault:
-    def store_gem(self, text, metadata):
+    def resonate_or_store(self, text, metadata):
         # Simulate blocking I/O
         time.sleep(0.1)
+        return "mock_gem", False
 
 class MockBus:
     async def publish(self, topic, payload, identity):
         pass
 
-# Mock ZoIdentity since it's missing from identity.py but imported in intent_processor.py
-class MockZoIdentity:
-    def __init__(self, role="UNKNOWN"):
-        self.role = role
-    def get_identity_header(self):
-        return {"role": self.role, "source_id": "mock_id"}
-
-import identity
-identity.ZoIdentity = MockZoIdentity
-
 # Now import IntentProcessor
 from intent_processor import IntentProcessor
 
@@ -0,0 +1,603 @@
+"""
+FILE: benchmark_suite.py
+CONTEXT: AG-SC-ADK / Brain / Benchmarks
+DESCRIPTION: Latency and throughput benchmarks for the Brain's hot paths.
+
+Scenarios:
+  startup   Cold `import main` time in a fresh interpreter
+  bus       AetherBus.publish fan-out at 1/10/100/1000 subscribers
+  embed     Vault._embed_text and batched embedding at batch sizes 1..10k
+  vault     Vault.store_gem / store_gems at batch sizes 1..10k
+  uposatha  UposathaCleaner.cleanse_entropy over 10k..1M gems, in budgeted slices
+  ws        /ws voice_data -> ui:shader_intent round trips, many concurrent clients
+
+Every case reports count, p50/p95/p99/mean latency in ms and throughput per
+second as JSON. With --baseline, a case whose p95 grew or whose throughput
+fell by more than --tolerance is a regression and the exit status is 1.
+Everything runs offline: ChromaDB lives in a temporary directory.
+
+    python benchmark_suite.py --quick --output bench.json
+    python benchmark_suite.py --baseline bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[0]))
+
+from aether_bus import AetherBus
+
+SCENARIOS = ("startup", "bus", "embed", "vault", "uposatha", "ws")
+
+DEFAULTS = {
+    "subscribers": [1, 10, 100, 1000],
+    "batch_sizes": [1, 10, 100, 1000, 10000],
+    "gem_counts": [10_000, 100_000, 1_000_000],
+    "clients": [1, 10, 50],
+}
+QUICK = {
+    "subscribers": [1, 10, 100],
+    "batch_sizes": [1, 100, 1000],
+    "gem_counts": [10_000],
+    "clients": [1, 10],
+}
+
+
+def summarize(samples, items=None, elapsed=None):
+    """
+    Percentiles of per-operation latencies (seconds) in milliseconds.
+    Throughput is items per second of wall time, defaulting to one item per sample.
+    """
+    latencies = np.asarray(samples, dtype=np.float64) * 1000.0
+    if elapsed is None:
+        elapsed = float(np.sum(samples))
+    if items is None:
+        items = len(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        "count": len(latencies),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "mean_ms": round(float(latencies.mean()), 4) if len(latencies) else 0.0,
+        "throughput_per_s": round(items / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Return a description of every case that regressed against the baseline.
+    Cases missing from either side are ignored.
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        if reference["p95_ms"] > 0 and current["p95_ms"] > reference["p95_ms"] * (1.0 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {reference['p95_ms']} ms")
+        if current["throughput_per_s"] < reference["throughput_per_s"] * (1.0 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_per_s']}/s vs baseline {reference['throughput_per_s']}/s"
+            )
+    return regressions
+
+
+def shader_payload(dimensions=384):
+    # Same shape as PRGX2_Alchemist.transmute output
+    return {
+        "intent_vector": np.linspace(-1.0, 1.0, dimensions).round(6).tolist(),
+        "vibe_score": 0.8,
+        "emotional_tone": "WAKING",
+        "neural_shader_params": {"color_base": "#00ffff", "vibe_intensity": 0.8, "ripple_pattern": "expanding_rings"},
+        "triggered_ritual": "normal",
+    }
+
+
+# --- AetherBus -------------------------------------------------------------
+
+async def bench_bus(subscriber_counts, delivery_budget=200_000, max_messages=2000):
+    results = {}
+    payload = shader_payload()
+    identity_header = {"role": "BENCHMARK", "source_id": "benchmark"}
+    for subscribers in subscriber_counts:
+        messages = max(50, min(max_messages, delivery_budget // subscribers))
+        bus = AetherBus()
+        delivered = 0
+
+        def make_sink():
+            # One callback per subscriber: the bus keys subscriptions by callback
+            async def sink(frame):
+                nonlocal delivered
+                delivered += 1
+            return sink
+
+        for _ in range(subscribers):
+            # Deep enough queues that nothing is dropped while publishing
+            bus.subscribe(make_sink(), maxsize=messages)
+
+        samples = []
+        started = time.perf_counter()
+        for _ in range(messages):
+            begin = time.perf_counter()
+            await bus.publish("ui:shader_intent", payload, identity_header)
+            samples.append(time.perf_counter() - begin)
+        await bus.join()
+        elapsed = time.perf_counter() - started
+
+        stats = summarize(samples, items=messages, elapsed=elapsed)
+        stats["deliveries_per_s"] = round(delivered / elapsed, 2)
+        results[f"bus.publish[subscribers={subscribers}]"] = stats
+        for callback in list(bus.subscribers):
+            bus.unsubscribe(callback)
+    return results
+
+
+# --- Embedding and Vault ---------------------------------------------------
+
+def _texts(count, prefix="benchmark gem"):
+    return [f"{prefix} {i} resonance of the waking light" for i in range(count)]
+
+
+def bench_embed(batch_sizes, workdir):
+    from memory.embedder import HashEmbedder, NGramEncoder
+    from memory.vault import Vault
+
+    results = {}
+    vault = Vault(persist_path=os.path.join(workdir, "embed_vault"), embedder=NGramEncoder(cache_size=0))
+    try:
+        texts = _texts(500, "single")
+        samples = []
+        for text in texts:
+            begin = time.perf_counter()
+            vault._embed_text(text)
+            samples.append(time.perf_counter() - begin)
+        results["vault._embed_text"] = summarize(samples)
+    finally:
+        vault.close()
+
+    for embedder in (NGramEncoder(cache_size=0), HashEmbedder(cache_size=0)):
+        for batch_size in batch_sizes:
+            repeats = max(3, min(50, 20_000 // batch_size))
+            samples = []
+            for repeat in range(repeats):
+                texts = _texts(batch_size, f"batch {repeat}")
+                begin = time.perf_counter()
+                embedder.embed(texts)
+                samples.append(time.perf_counter() - begin)
+            results[f"embed.{embedder.name}[batch={batch_size}]"] = summarize(samples, items=repeats * batch_size)
+    return results
+
+
+def bench_vault(batch_sizes, workdir):
+    from memory.embedder import NGramEncoder
+    from memory.vault import Vault
+
+    results = {}
+    for batch_size in batch_sizes:
+        vault = Vault(persist_path=os.path.join(workdir, f"vault_{batch_size}"), embedder=NGramEncoder(cache_size=0))
+        try:
+            repeats = max(3, min(50, 20_000 // batch_size))
+            samples = []
+            for repeat in range(repeats):
+                texts = _texts(batch_size, f"gem {repeat}")
+                metadatas = [{"ritual_tag": "benchmark"} for _ in texts]
+                begin = time.perf_counter()
+                if batch_size == 1:
+                    vault.store_gem(texts[0], metadatas[0])
+                else:
+                    vault.store_gems(texts, metadatas)
+                samples.append(time.perf_counter() - begin)
+
+            # Read path over what was just written: 8 queries per call, top 10
+            recall_samples = {False: [], True: []}
+            for repeat in range(20):
+                queries = _texts(8, f"gem {repeat % repeats}")
+                for rerank in recall_samples:
+                    begin = time.perf_counter()
+                    vault.recall(queries, k=10, rerank=rerank)
+                    recall_samples[rerank].append(time.perf_counter() - begin)
+        finally:
+            vault.close()
+        name = "vault.store_gem" if batch_size == 1 else f"vault.store_gems[batch={batch_size}]"
+        results[name] = summarize(samples, items=repeats * batch_size)
+        gems = repeats * batch_size
+        results[f"vault.recall[gems={gems}]"] = summarize(recall_samples[False], items=20 * 8)
+        results[f"vault.recall[gems={gems},rerank]"] = summarize(recall_samples[True], items=20 * 8)
+    return results
+
+
+# --- Uposatha --------------------------------------------------------------
+
+def seed_gems(client, count, stale_ratio=0.5, dimensions=8, seed=7, name="vocal_resonance_gems", first_id=0):
+    """
+    Fill a gems collection with count gems, stale_ratio of them releasable.
+    Embeddings are small: the ritual only reads metadata, and seeding a
+    million 384-d vectors would dominate the run.
+    """
+    rng = np.random.default_rng(seed)
+    collection = client.get_or_create_collection(name)
+    fresh = datetime.now().isoformat()
+    stale = (datetime.now() - timedelta(days=30)).isoformat()
+    batch = client.get_max_batch_size()
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        usage = rng.integers(0, 6, size=size)
+        old = rng.random(size) < stale_ratio
+        collection.add(
+            ids=[f"gem-{first_id + start + i}" for i in range(size)],
+            embeddings=rng.random((size, dimensions), dtype=np.float32),
+            documents=[f"gem {first_id + start + i}" for i in range(size)],
+            metadatas=[
+                {"usage_count": int(usage[i]), "last_synced": stale if old[i] else fresh}
+                for i in range(size)
+            ],
+        )
+    return collection
+
+
+def bench_uposatha(gem_counts, workdir, slice_deletes=250):
+    import chromadb
+    from rituals.uposatha import UposathaCleaner
+
+    results = {}
+    for count in gem_counts:
+        path = os.path.join(workdir, f"uposatha_{count}")
+        client = chromadb.PersistentClient(path=path)
+        seed_gems(client, count)
+
+        cleaner = UposathaCleaner(client, pause_seconds=0)
+        samples = []
+        deleted = 0
+        started = time.perf_counter()
+        while True:
+            begin = time.perf_counter()
+            result = cleaner.cleanse_entropy(max_deletes=slice_deletes)
+            samples.append(time.perf_counter() - begin)
+            deleted += result["deleted_count"]
+            if result["status"] != "partial":
+                break
+        elapsed = time.perf_counter() - started
+
+        stats = summarize(samples, items=count, elapsed=elapsed)
+        stats["deleted"] = deleted
+        results[f"uposatha.cleanse_entropy[gems={count}]"] = stats
+        del cleaner, client
+        shutil.rmtree(path, ignore_errors=True)
+    return results
+
+
+def bench_uposatha_partitioned(gem_counts, workdir, expired_gems=5000):
+    """
+    Retention over a day-partitioned Record: one expired partition of a
+    fixed size is retired while the live partition grows with gem_counts,
+    so the timings should stay flat.
+    """
+    import chromadb
+    from memory.partitions import PartitionedCollection
+    from memory.vault import GEMS_COLLECTION, Vault
+    from rituals.uposatha import UposathaCleaner
+
+    results = {}
+    for count in gem_counts:
+        path = os.path.join(workdir, f"uposatha_partitioned_{count}")
+        client = chromadb.PersistentClient(path=path)
+        layout = PartitionedCollection(client, GEMS_COLLECTION)
+        expired = min(expired_gems, count)
+        now = datetime.now()
+        seed_gems(client, expired, name=layout.partition_for(now - timedelta(days=30)).name)
+        seed_gems(client, count - expired, name=layout.partition_for(now).name, first_id=expired)
+
+        vault = Vault(persist_path=path, partitioning="day")
+        cleaner = UposathaCleaner(vault.client, vault=vault, pause_seconds=0)
+        begin = time.perf_counter()
+        result = cleaner.cleanse_entropy()
+        stats = summarize([time.perf_counter() - begin], items=expired)
+        stats["deleted"] = result["deleted_count"]
+        stats["promoted"] = result.get("promoted_count", 0)
+        results[f"uposatha.retire_partition[gems={count}]"] = stats
+        vault.close()
+        del cleaner, vault, layout, client
+        shutil.rmtree(path, ignore_errors=True)
+    return results
+
+
+# --- /ws end to end --------------------------------------------------------
+
+class AsgiLifespan:
+    """
+    Drives an ASGI app's lifespan protocol in-process.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._receive = asyncio.Queue()
+        self._send = asyncio.Queue()
+        self._task = None
+
+    async def __aenter__(self):
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._task = asyncio.create_task(self.app(scope, self._receive.get, self._send.put))
+        await self._receive.put({"type": "lifespan.startup"})
+        message = await self._send.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Startup failed: {message.get('message')}")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._receive.put({"type": "lifespan.shutdown"})
+        await self._send.get()
+        await self._task
+
+
+class AsgiWebSocket:
+    """
+    Minimal in-process WebSocket client speaking ASGI directly to the app,
+    so hundreds of connections can share one event loop without sockets.
+    """
+    def __init__(self, app, path="/ws", client_port=50000, subprotocols=()):
+        self.app = app
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "http_version": "1.1",
+            "path": path,
+            "raw_path": path.encode("ascii"),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", client_port),
+            "server": ("testserver", 80),
+            "subprotocols": list(subprotocols),
+            "state": {},
+        }
+        self._inbound = asyncio.Queue()
+        self._outbound = asyncio.Queue()
+        self._task = None
+        self.subprotocol = None
+
+    async def connect(self):
+        self._task = asyncio.create_task(self.app(self.scope, self._inbound.get, self._outbound.put))
+        await self._inbound.put({"type": "websocket.connect"})
+        message = await self._outbound.get()
+        if message["type"] != "websocket.accept":
+            raise RuntimeError(f"Connection refused: {message}")
+        self.subprotocol = message.get("subprotocol")
+        return self
+
+    async def send_text(self, text):
+        await self._inbound.put({"type": "websocket.receive", "text": text})
+
+    async def receive(self):
+        message = await self._outbound.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError("Server closed the connection")
+        return message.get("bytes") if message.get("bytes") is not None else message.get("text")
+
+    async def close(self):
+        await self._inbound.put({"type": "websocket.disconnect", "code": 1000})
+        await self._task
+
+
+def _intent_key(values):
+    # Frames reach every client; a reply is matched to its request by the
+    # leading components of the intent vector, which is a pure function of the text
+    return tuple(round(float(value), 5) for value in values[:8])
+
+
+async def _ws_client(app, client_id, messages, encoder, timeout, codec):
+    socket = await AsgiWebSocket(app, client_port=50000 + client_id, subprotocols=[codec.subprotocol]).connect()
+    waiting = {}
+    keys_by_id = {}  # request id -> intent key, to match admission refusals
+    samples = []
+    frame_bytes = []
+    errors = 0
+
+    async def read_frames():
+        while True:
+            data = await socket.receive()
+            frame_bytes.append(len(data))
+            frame = codec.decode(data)
+            if "error" in frame:
+                future = waiting.pop(keys_by_id.pop(frame.get("id"), None), None)
+                if future is not None and not future.done():
+                    future.set_exception(RuntimeError(frame["error"]["message"]))
+                continue
+            if frame.get("method") != "tools/ui:shader_intent":
+                continue
+            future = waiting.pop(_intent_key(frame["params"]["arguments"]["intent_vector"]), None)
+            if future is not None and not future.done():
+                future.set_result(time.perf_counter())
+
+    reader = asyncio.create_task(read_frames())
+    loop = asyncio.get_running_loop()
+    try:
+        texts = [f"client {client_id} intent {i} awaken the light" for i in range(messages)]
+        vectors = encoder.embed(texts)
+        for request_id, (text, vector) in enumerate(zip(texts, vectors)):
+            future = loop.create_future()
+            key = _intent_key(vector.tolist())
+            waiting[key] = future
+            keys_by_id[request_id] = key
+            begin = time.perf_counter()
+            await socket.send_text(json.dumps(
+                {"jsonrpc": "2.0", "method": "input/voice_data", "params": {"text": text}, "id": request_id}
+            ))
+            try:
+                samples.append(await asyncio.wait_for(future, timeout) - begin)
+            except (asyncio.TimeoutError, RuntimeError):  # Lost, or refused by admission control
+                errors += 1
+            keys_by_id.pop(request_id, None)
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        await socket.close()
+    return samples, errors, frame_bytes
+
+
+async def bench_ws(client_counts, messages_per_client=20, timeout=10.0, codecs=("json",)):
+    # main opens its vault relative to the working directory, which is the temp dir here
+    import main
+    from codec import CODECS
+    from memory.embedder import NGramEncoder
+
+    encoder = NGramEncoder(cache_size=0)  # Independent of the server's cache
+    results = {}
+    async with AsgiLifespan(main.app):
+        await main.app.state.settled.wait()
+        if main.app.state.status != "ready":
+            raise RuntimeError(f"Brain did not awaken: {main.app.state.status}")
+        results["ws.startup_to_ready"] = summarize([main.app.state.startup_seconds])
+        for codec_name in codecs:
+            codec = CODECS.get(codec_name)
+            if codec is None:
+                print(f"⚠️  Codec {codec_name} is not installed, skipping", file=sys.stderr)
+                continue
+            for clients in client_counts:
+                started = time.perf_counter()
+                outcomes = await asyncio.gather(*[
+                    _ws_client(main.app, client_id, messages_per_client, encoder, timeout, codec)
+                    for client_id in range(clients)
+                ])
+                elapsed = time.perf_counter() - started
+                samples = [sample for client_samples, _, _ in outcomes for sample in client_samples]
+                sizes = [size for _, _, client_sizes in outcomes for size in client_sizes]
+                stats = summarize(samples, elapsed=elapsed)
+                stats["errors"] = sum(errors for _, errors, _ in outcomes)
+                stats["mean_frame_bytes"] = round(sum(sizes) / len(sizes), 1) if sizes else 0.0
+                suffix = "" if codec_name == "json" else f",codec={codec_name}"
+                results[f"ws.voice_data_round_trip[clients={clients}{suffix}]"] = stats
+    return results
+
+
+# --- Cold start ------------------------------------------------------------
+
+def bench_startup(workdir, repeats=5):
+    """
+    Time `import main` in fresh interpreters; the Record itself opens later,
+    in the lifespan hook (see ws.startup_to_ready).
+    """
+    import subprocess
+
+    script = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[0]))
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=workdir, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return {"startup.import_main": summarize(samples)}
+
+
+# --- Runner ----------------------------------------------------------------
+
+async def run_suite(scenarios, sizes, workdir, codecs=("json",)):
+    results = {}
+    for scenario in scenarios:
+        print(f"⏱️  Running {scenario} benchmarks...", file=sys.stderr)
+        if scenario == "startup":
+            results.update(await asyncio.to_thread(bench_startup, workdir))
+        elif scenario == "bus":
+            results.update(await bench_bus(sizes["subscribers"]))
+        elif scenario == "embed":
+            results.update(await asyncio.to_thread(bench_embed, sizes["batch_sizes"], workdir))
+        elif scenario == "vault":
+            results.update(await asyncio.to_thread(bench_vault, sizes["batch_sizes"], workdir))
+        elif scenario == "uposatha":
+            results.update(await asyncio.to_thread(bench_uposatha, sizes["gem_counts"], workdir))
+            results.update(await asyncio.to_thread(bench_uposatha_partitioned, sizes["gem_counts"], workdir))
+        elif scenario == "ws":
+            results.update(await bench_ws(sizes["clients"], codecs=codecs))
+    return results
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Brain latency and throughput benchmarks")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--subscribers", type=_int_list)
+    parser.add_argument("--batch-sizes", type=_int_list)
+    parser.add_argument("--gem-counts", type=_int_list)
+    parser.add_argument("--clients", type=_int_list)
+    parser.add_argument("--codecs", default="json", help="Comma-separated /ws wire codecs to measure (json,msgpack,cbor)")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = [name for name in args.only.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    sizes = dict(QUICK if args.quick else DEFAULTS)
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="brain-bench-")
+    os.chdir(workdir)  # Relative paths (akashic_record, audit_gate.log) land in the temp dir
+    try:
+        codecs = [name for name in args.codecs.split(",") if name]
+        # The gateway prints progress; keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            results = asyncio.run(run_suite(scenarios, sizes, workdir, codecs))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scenarios": scenarios,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
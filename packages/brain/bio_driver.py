@@ -1,12 +1,110 @@
 import time
-import math
-import random
 import asyncio
-from identity import ZoIdentity
+
+import numpy as np
+
+from identity import ZoIdentity, tone_profile
 from aether_bus import AetherBus
 
+# Which render_light group each flat field belongs to
+FIELD_GROUPS = {
+    "mood": "vibe_state",
+    "energy_level": "vibe_state",
+    "urgency": "vibe_state",
+    "geometry": "render_params",
+    "chroma_primary": "render_params",
+    "chroma_secondary": "render_params",
+    "pulse_frequency": "render_params",
+    "bloom_factor": "render_params",
+}
+
+
+MOODS = np.array(["WAKING", "FOCUSED", "WARNING"])
+
+
+class TickScheduler:
+    """
+    Fixed-rate ticks on the monotonic clock.
+    Deadlines are start + n * period, so the time spent working between ticks
+    never pushes later ticks back. A deadline that is already a full period
+    behind is skipped and counted as missed rather than fired in a burst.
+    """
+    def __init__(self, period, clock=time.monotonic, sleep=asyncio.sleep):
+        self.period = period
+        self.clock = clock
+        self.sleep = sleep
+        self.ticks = 0
+        self.missed = 0
+        self.max_lag = 0.0
+        self._deadline = None
+
+    async def wait(self):
+        """
+        Sleep until the next deadline and return it (monotonic seconds).
+        """
+        now = self.clock()
+        if self._deadline is None:
+            self._deadline = now
+        else:
+            self._deadline += self.period
+
+        lag = now - self._deadline
+        if lag >= self.period:
+            skipped = int(lag // self.period)
+            self.missed += skipped
+            self._deadline += skipped * self.period
+        elif lag < 0:
+            await self.sleep(-lag)
+
+        self.ticks += 1
+        self.max_lag = max(self.max_lag, self.clock() - self._deadline)
+        return self._deadline
+
+    def stats(self):
+        return {
+            "period": self.period,
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "max_lag_ms": round(self.max_lag * 1000.0, 3),
+        }
+
+
+class BioSource:
+    """
+    State of one simulated bio sensor multiplexed on the driver loop.
+    """
+    __slots__ = ("source_id", "start_time", "base_heart_rate", "base_temp", "phase",
+                 "seq", "ticks_since_keyframe", "last_sent", "moved")
+
+    def __init__(self, source_id, base_heart_rate=75.0, base_temp=36.6, phase=0.0):
+        self.source_id = source_id
+        self.start_time = time.time()
+        self.base_heart_rate = base_heart_rate
+        self.base_temp = base_temp
+        self.phase = phase
+        self.seq = 0
+        self.ticks_since_keyframe = 0
+        self.last_sent = None  # Flat field values the consumers currently hold
+        self.moved = set()  # Fields sent in a delta since the last keyframe
+
+    def resync(self):
+        # The next frame is a keyframe
+        self.last_sent = None
+
+
 class MockBioDriver:
-    def __init__(self, bus: AetherBus):
+    """
+    Streams simulated vitals as render_light frames.
+    Sends a keyframe periodically and otherwise only the fields that moved past
+    their thresholds. Each delta repeats every field moved since the keyframe,
+    so a consumer that missed earlier deltas is whole again after any later one,
+    and a keyframe follows as soon as a frame is shed or dropped on the bus.
+    The tick interval backs off while nothing changes or while render_light
+    subscribers are backed up, and snaps back when vitals move.
+    """
+    def __init__(self, bus: AetherBus, sources=1, min_interval=0.1, max_interval=1.0,
+                 keyframe_interval=50, hr_threshold=1.0, energy_threshold=0.02,
+                 pressure_threshold=0.5, seed=None):
         self.bus = bus
         self.identity = ZoIdentity(role="BIO_DRIVER")
         self.start_time = time.time()
@@ -14,72 +112,195 @@ class MockBioDriver:
         self.base_temp = 36.6
         self.running = False
 
+        self.sources = [
+            BioSource(f"bio-{i}", base_heart_rate=self.base_heart_rate + 3.0 * i, phase=0.7 * i)
+            for i in range(sources)
+        ]
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.keyframe_interval = keyframe_interval
+        self.pressure_threshold = pressure_threshold
+        # Smallest change worth sending, per numeric field
+        self.thresholds = {
+            "energy_level": energy_threshold,
+            "bloom_factor": energy_threshold * 0.5,
+            "urgency": 0.05,
+            "pulse_frequency": hr_threshold / 60.0,
+        }
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.rng = np.random.default_rng(seed)
+        self.scheduler = None
+        self._drops_seen = 0
+
     async def start_loop(self):
         self.running = True
         print("BioDriver Loop Started")
+        self.scheduler = TickScheduler(self.interval)
         while self.running:
-            vitals = self._generate_vitals()
-            payload = self._construct_payload(vitals)
+            await self.scheduler.wait()
+            changed = await self.tick()
+            self.interval = self._adapt_interval(changed)
+            self.scheduler.period = self.interval
 
-            # Publish to AetherBus
-            await self.bus.publish("render_light", payload, self.identity.get_identity_header())
+    async def tick(self):
+        """
+        Publish this tick's frame for every source. Returns True if any was sent.
+        """
+        drops = self.bus.dropped("render_light")
+        if drops > self._drops_seen:
+            # Some consumer lost frames and we cannot tell whose: resync all sources
+            for source in self.sources:
+                source.resync()
+        self._drops_seen = drops
 
-            # 10Hz update
-            await asyncio.sleep(0.1)
+        changed = False
+        header = self.identity.get_identity_header()
+        for source in self.sources:
+            payload = self._next_frame(source)
+            if payload is None:
+                self.frames_skipped += 1
+                continue
+            changed = True
+            self.frames_sent += 1
 
-    def _generate_vitals(self):
-        now = time.time()
-        elapsed = now - self.start_time
+            # Publish to AetherBus; frames only coalesce with their own source's
+            if not await self.bus.publish("render_light", payload, header, key=source.source_id):
+                source.resync()  # Shed under lag
+        return changed
 
-        hr_variation = 10.0 * math.sin(elapsed * 0.5)
-        hr_noise = random.uniform(-2.0, 2.0)
-        heart_rate = self.base_heart_rate + hr_variation + hr_noise
+    async def start_sampling(self, sample_rate=100.0, publish_rate=10.0, topic="bio:samples"):
+        """
+        High-rate load generator: every source is sampled at sample_rate Hz and
+        each publish_rate tick carries one (sources x samples) block of vitals.
+        """
+        self.running = True
+        samples_per_tick = max(1, round(sample_rate / publish_rate))
+        step = 1.0 / sample_rate
+        self.scheduler = TickScheduler(samples_per_tick * step)
+        # Map monotonic deadlines onto the wall clock the vitals model uses
+        wall_offset = time.time() - time.monotonic()
+        offsets = (np.arange(samples_per_tick) + 1 - samples_per_tick) * step
+        header = self.identity.get_identity_header()
+        seq = 0
+        print(f"BioDriver Sampling Started: {len(self.sources)} sources @ {sample_rate} Hz")
+        while self.running:
+            deadline = await self.scheduler.wait()
+            seq += 1
+            block = self._generate_block(self.sources, deadline + wall_offset + offsets)
+            block["seq"] = seq
+            block["sample_rate"] = sample_rate
+            self.frames_sent += 1
+            await self.bus.publish(topic, block, header)
 
-        temp_variation = 0.2 * math.sin(elapsed * 0.05)
-        body_temp = self.base_temp + temp_variation
+    def _adapt_interval(self, changed):
+        if self.bus.pressure("render_light") > self.pressure_threshold:
+            # Consumers are behind: halve the rate
+            return min(self.max_interval, self.interval * 2.0)
+        if changed:
+            return self.min_interval
+        # Steady state: ramp down gradually
+        return min(self.max_interval, self.interval * 1.5)
 
-        energy_level = 0.5 + 0.4 * math.sin(elapsed * 0.2 + 1.0)
+    def _next_frame(self, source):
+        """
+        Return the render_light payload for this tick, or None if nothing
+        changed meaningfully since the last frame consumers received.
+        """
+        fields = self._render_fields(self._generate_vitals(source))
+        source.seq += 1
+        source.ticks_since_keyframe += 1
 
-        mood = "IDLE"
-        if energy_level > 0.8:
-            mood = "FOCUSED"
-        elif energy_level < 0.2:
-            mood = "WARNING"
-        else:
-            mood = "WAKING"
+        if source.last_sent is None or source.ticks_since_keyframe >= self.keyframe_interval:
+            source.last_sent = fields
+            source.moved = set()
+            source.ticks_since_keyframe = 0
+            return self._group(fields, {"frame": "key", "source": source.source_id, "seq": source.seq})
+
+        changes = {}
+        for name, value in fields.items():
+            previous = source.last_sent[name]
+            threshold = self.thresholds.get(name)
+            if threshold is None:
+                if value != previous:
+                    changes[name] = value
+            elif abs(value - previous) >= threshold:
+                changes[name] = value
+        if not changes:
+            return None
+
+        source.last_sent.update(changes)
+        source.moved.update(changes)
+        moved = {name: source.last_sent[name] for name in FIELD_GROUPS if name in source.moved}
+        return self._group(moved, {"frame": "delta", "source": source.source_id, "seq": source.seq})
+
+    @staticmethod
+    def _group(fields, header):
+        for name, value in fields.items():
+            header.setdefault(FIELD_GROUPS[name], {})[name] = value
+        return header
 
+    def _generate_vitals(self, source=None):
+        block = self._generate_block([source or self], np.array([time.time()]))
         return {
-            "timestamp": now,
-            "heart_rate": round(heart_rate, 1),
-            "body_temperature": round(body_temp, 2),
-            "energy_level": round(energy_level, 3),
-            "mood": mood,
-            "urgency": round(abs(hr_variation) / 10.0, 2)
+            "timestamp": block["timestamps"][0],
+            "heart_rate": block["heart_rate"][0][0],
+            "body_temperature": block["body_temperature"][0][0],
+            "energy_level": block["energy_level"][0][0],
+            "mood": block["mood"][0][0],
+            "urgency": block["urgency"][0][0]
         }
 
-    def _construct_payload(self, vitals):
-        # Color Logic based on Mood
-        primary_color = "#00FFFF" # Cyan
-        secondary_color = "#FF00FF" # Magenta
+    def _generate_block(self, sources, timestamps):
+        """
+        Vitals for every source at every timestamp in one NumPy pass.
+        Each field is a (len(sources), len(timestamps)) nested list.
+        """
+        start_times = np.array([source.start_time for source in sources])[:, None]
+        phases = np.array([getattr(source, "phase", 0.0) for source in sources])[:, None]
+        base_heart_rate = np.array([source.base_heart_rate for source in sources])[:, None]
+        base_temp = np.array([source.base_temp for source in sources])[:, None]
+        elapsed = timestamps[None, :] - start_times + phases
+
+        hr_variation = 10.0 * np.sin(elapsed * 0.5)
+        hr_noise = self.rng.uniform(-2.0, 2.0, size=elapsed.shape)
+        heart_rate = base_heart_rate + hr_variation + hr_noise
+
+        temp_variation = 0.2 * np.sin(elapsed * 0.05)
+        body_temp = base_temp + temp_variation
 
-        if vitals["mood"] == "WARNING":
-            primary_color = "#FF0000"
-            secondary_color = "#FFA500"
-        elif vitals["mood"] == "FOCUSED":
-            primary_color = "#FFFFFF"
-            secondary_color = "#0000FF"
+        energy_level = 0.5 + 0.4 * np.sin(elapsed * 0.2 + 1.0)
+
+        # WAKING, FOCUSED above 0.8, WARNING below 0.2
+        mood = MOODS[(energy_level > 0.8) + 2 * (energy_level < 0.2)]
 
         return {
-            "vibe_state": {
-                "mood": vitals["mood"],
-                "energy_level": vitals["energy_level"],
-                "urgency": vitals["urgency"]
-            },
-            "render_params": {
-                "geometry": "FLUID_ORB",
-                "chroma_primary": primary_color,
-                "chroma_secondary": secondary_color,
-                "pulse_frequency": vitals["heart_rate"] / 60.0,
-                "bloom_factor": 0.5 + (vitals["energy_level"] * 0.5)
-            }
+            "sources": [source.source_id if isinstance(source, BioSource) else None for source in sources],
+            "timestamps": timestamps.tolist(),
+            "heart_rate": np.round(heart_rate, 1).tolist(),
+            "body_temperature": np.round(body_temp, 2).tolist(),
+            "energy_level": np.round(energy_level, 3).tolist(),
+            "mood": mood.tolist(),
+            "urgency": np.round(np.abs(hr_variation) / 10.0, 2).tolist(),
         }
+
+    def _render_fields(self, vitals):
+        # Color Logic based on Mood, from the shared tone table
+        look = tone_profile(vitals["mood"])
+        return {
+            "mood": vitals["mood"],
+            "energy_level": vitals["energy_level"],
+            "urgency": vitals["urgency"],
+            "geometry": "FLUID_ORB",
+            "chroma_primary": look.chroma_primary,
+            "chroma_secondary": look.chroma_secondary,
+            "pulse_frequency": vitals["heart_rate"] / 60.0,
+            "bloom_factor": 0.5 + (vitals["energy_level"] * 0.5)
+        }
+
+    def _construct_payload(self, vitals):
+        """
+        Full render_light payload (keyframe shape without the frame header).
+        """
+        return self._group(self._render_fields(vitals), {})
@@ -0,0 +1,106 @@
+"""
+FILE: codec.py
+CONTEXT: AG-SC-ADK / Brain / AetherBus
+DESCRIPTION: Wire codecs for AetherBus frames on the /ws gateway.
+
+JSON is always available and is what the bus and backplane carry natively.
+MessagePack and CBOR are offered when their packages are installed; a client
+picks one per connection through the WebSocket subprotocol
+("aetherbus.cbor", "aetherbus.msgpack", "aetherbus.json"), in its own order
+of preference.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional fast JSON backend
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional binary codec
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # Optional binary codec
+    cbor2 = None
+
+SUBPROTOCOL_PREFIX = "aetherbus."
+
+
+class Codec:
+    """
+    Encodes whole MCP envelopes to bytes and decodes client messages.
+    """
+    name = None
+
+    @property
+    def subprotocol(self):
+        return SUBPROTOCOL_PREFIX + self.name
+
+    def encode(self, message):
+        raise NotImplementedError
+
+    def decode(self, data):
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+
+    def encode(self, message):
+        if orjson is not None:
+            return orjson.dumps(message)
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MsgPackCodec(Codec):
+    name = "msgpack"
+
+    def encode(self, message):
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+class CborCodec(Codec):
+    name = "cbor"
+
+    def encode(self, message):
+        # Canonical CBOR writes each float in the shortest lossless width, which
+        # is what shrinks float32-derived intent vectors and their many zeros
+        return cbor2.dumps(message, canonical=True)
+
+    def decode(self, data):
+        return cbor2.loads(data)
+
+
+JSON = JsonCodec()
+
+# Installed codecs by name, in server preference order
+CODECS = {JSON.name: JSON}
+if msgpack is not None:
+    CODECS[MsgPackCodec.name] = MsgPackCodec()
+if cbor2 is not None:
+    CODECS[CborCodec.name] = CborCodec()
+
+
+def negotiate(subprotocols):
+    """
+    Pick the first codec the client offered that is installed here.
+    Returns (codec, subprotocol to accept or None); JSON without a subprotocol
+    when nothing matches, so plain clients keep working.
+    """
+    for offered in subprotocols or ():
+        if offered.startswith(SUBPROTOCOL_PREFIX):
+            codec = CODECS.get(offered[len(SUBPROTOCOL_PREFIX):])
+            if codec is not None:
+                return codec, offered
+    return JSON, None
@@ -0,0 +1,115 @@
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+
+class DeadLetter:
+    """
+    One undeliverable message.
+    Either a pre-encoded frame that a subscriber failed to take, or a payload
+    that could not be serialized at all.
+    """
+    __slots__ = ("topic", "reason", "frame", "payload", "identity_header", "callback",
+                 "attempts", "created", "size")
+
+    def __init__(self, topic, reason, frame=None, payload=None, identity_header=None, callback=None,
+                 attempts=0):
+        self.topic = topic
+        self.reason = reason
+        self.frame = frame
+        self.payload = payload
+        self.identity_header = identity_header
+        self.callback = callback
+        self.attempts = attempts
+        self.created = time.time()
+        if frame is not None:
+            self.size = len(frame)
+        else:
+            self.size = len(repr(payload))
+
+    def to_record(self):
+        return {
+            "topic": self.topic,
+            "reason": self.reason,
+            "frame": self.frame.decode("utf-8", "replace") if self.frame is not None else None,
+            "payload": None if self.frame is not None else repr(self.payload),
+            "attempts": self.attempts,
+            "timestamp": datetime.fromtimestamp(self.created).isoformat(),
+        }
+
+
+class DeadLetterQueue:
+    """
+    Ring buffer of dead letters capped by entry count and total bytes.
+    Entries pushed out by the caps are appended to an on-disk segment file
+    when spill_path is set, otherwise they are counted and discarded.
+    """
+    def __init__(self, max_entries=1000, max_bytes=4 * 1024 * 1024, spill_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+
+        self._entries = deque()
+        self.bytes = 0
+        self.total = 0
+        self.evicted = 0
+        self.spilled = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def push(self, letter):
+        self._entries.append(letter)
+        self.bytes += letter.size
+        self.total += 1
+
+        overflow = []
+        while len(self._entries) > self.max_entries or (self.bytes > self.max_bytes and len(self._entries) > 1):
+            evicted = self._entries.popleft()
+            self.bytes -= evicted.size
+            self.evicted += 1
+            overflow.append(evicted)
+        if overflow and self.spill_path:
+            self._spill(overflow)
+
+    def popleft(self):
+        letter = self._entries.popleft()
+        self.bytes -= letter.size
+        return letter
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        oldest = self._entries[0].created if self._entries else None
+        return {
+            "depth": len(self._entries),
+            "bytes": self.bytes,
+            "oldest_age_seconds": time.time() - oldest if oldest is not None else 0.0,
+            "total": self.total,
+            "evicted": self.evicted,
+            "spilled": self.spilled,
+        }
+
+    def iter_spill(self):
+        """
+        Read back entries that were spilled to disk, oldest first.
+        """
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _spill(self, letters):
+        lines = "".join(json.dumps(letter.to_record(), ensure_ascii=False) + "\n" for letter in letters)
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self.spilled += len(letters)
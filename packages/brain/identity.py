@@ -1,8 +1,48 @@
 import logging
 import random
+import uuid
+from collections import namedtuple
+from types import MappingProxyType
 
 logger = logging.getLogger("PRGX.Triad")
 
+# One look per tone, shared by the Alchemist's neural shader and the
+# render_light chroma of the bio driver and intent core
+ToneProfile = namedtuple("ToneProfile", ["color_base", "ripple_pattern", "chroma_primary", "chroma_secondary"])
+
+TONE_TABLE = MappingProxyType({
+    "FOCUSED": ToneProfile("#ffffff", "sharp_beams", "#FFFFFF", "#0000FF"),  # White
+    "WARNING": ToneProfile("#ff0000", "chaotic_noise", "#FF0000", "#FFA500"),  # Red
+    "WAKING": ToneProfile("#00ffff", "expanding_rings", "#00FFFF", "#FF00FF"),  # Cyan
+    "CALM": ToneProfile("#2323ee", "calm_waves", "#00FF00", "#0000FF"),
+})
+DEFAULT_TONE = ToneProfile("#2323ee", "calm_waves", "#00FFFF", "#FF00FF")  # Default Blue
+
+
+def tone_profile(tone):
+    return TONE_TABLE.get(tone, DEFAULT_TONE)
+
+
+# neural_shader_params per tone, built once; transmute copies one and sets the intensity
+_SHADER_TEMPLATES = {
+    tone: MappingProxyType({"color_base": profile.color_base, "vibe_intensity": None,
+                            "ripple_pattern": profile.ripple_pattern})
+    for tone, profile in {**TONE_TABLE, None: DEFAULT_TONE}.items()
+}
+
+class ZoIdentity:
+    """
+    Identity of a Brain component on the AetherBus.
+    The header is built once and stamped on every publish.
+    """
+    def __init__(self, role="UNKNOWN"):
+        self.role = role
+        self.source_id = f"{role.lower()}-{uuid.uuid4().hex[:8]}"
+        self._header = {"role": self.role, "source_id": self.source_id}
+
+    def get_identity_header(self):
+        return self._header
+
 class PRGX1_Sentry:
     """
     The Defense Layer.
@@ -10,8 +50,9 @@ class PRGX1_Sentry:
     """
     @staticmethod
     def inspect(payload):
-        # Basic Guardrail logic
-        if not payload.get("intent_vector"):
+        # Basic Guardrail logic (the vector may be a list or a NumPy array)
+        intent_vector = payload.get("intent_vector")
+        if intent_vector is None or len(intent_vector) == 0:
             logger.warning("PRGX1: Missing intent vector. Blocking.")
             return False, "MISSING_VECTOR"
 
@@ -33,38 +74,30 @@ class PRGX2_Alchemist:
         Convert observed vibe into PhysicsParams for the Shader.
         """
         tone = sati_vibe["tone"]
-        intensity = sati_vibe["intensity"]
-
-        # Procedural Color Alchemy
-        color_base = "#2323ee" # Default Blue
-        ripple = "calm_waves"
-
-        if tone == "FOCUSED":
-            color_base = "#ffffff" # White
-            ripple = "sharp_beams"
-        elif tone == "WARNING":
-            color_base = "#ff0000" # Red
-            ripple = "chaotic_noise"
-        elif tone == "WAKING":
-            color_base = "#00ffff" # Cyan
-            ripple = "expanding_rings"
+        shader = dict(_SHADER_TEMPLATES.get(tone) or _SHADER_TEMPLATES[None])
+        shader["vibe_intensity"] = sati_vibe["intensity"]
 
         physics_params = {
             "intent_vector": intent_vector,
             "vibe_score": sati_vibe["score"],
             "emotional_tone": tone,
-            "neural_shader_params": {
-                "color_base": color_base,
-                "vibe_intensity": intensity,
-                "ripple_pattern": ripple
-            },
+            "neural_shader_params": shader,
             "triggered_ritual": "normal", # Default
             "timestamp": "NOW" # Placeholder
         }
 
-        logger.info(f"⚗️ PRGX2 Transmuted: {tone} -> {color_base}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"⚗️ PRGX2 Transmuted: {tone} -> {shader['color_base']}")
         return physics_params
 
+    @staticmethod
+    def transmute_many(sati_vibes, intent_vectors):
+        """
+        Transmute a block of observations in one call, in order.
+        """
+        transmute = PRGX2_Alchemist.transmute
+        return [transmute(vibe, vector) for vibe, vector in zip(sati_vibes, intent_vectors)]
+
 class PRGX3_Diplomat:
     """
     Reality Anchoring / Dialog.
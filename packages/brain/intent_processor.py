@@ -1,8 +1,13 @@
 import random
 import asyncio
+import time
 from aether_bus import AetherBus
-from identity import ZoIdentity
+from identity import ZoIdentity, tone_profile
 from memory.vault import Vault
+from metrics import registry
+
+PATHS = registry.counter("intent_paths_total", "Voice inputs routed to Path A (manifest) or Path B (verify)", ["path"])
+CRYSTALLIZE_SECONDS = registry.histogram("intent_crystallize_seconds", "Time to resonate or store an intent in the Vault")
 
 
 class IntentProcessor:
@@ -24,6 +29,7 @@ class IntentProcessor:
         # Decide Path (50/50 for simulation)
         is_ambiguous = random.random() > 0.5
 
+        PATHS.labels("B" if is_ambiguous else "A").inc()
         if is_ambiguous:
             # Path B: Ritual of Truth
             await self._trigger_path_b(text_input or "DELETE SECTOR 7?")
@@ -49,13 +55,15 @@ class IntentProcessor:
         """
         Store or update the intent in the Vault.
         """
-        # In a real system, we'd query for semantic similarity first.
-        # Here we just store it as a new gem for simulation.
-        # The blocking store_gem call uses chromadb.PersistentClient which does synchronous file/network operations.
+        # Query for semantic similarity first: a resonant gem is amplified
+        # instead of storing a duplicate.
+        # The vault uses chromadb.PersistentClient which does synchronous file/network operations.
         # We wrap it in asyncio.to_thread to avoid blocking the async event loop.
+        started = time.perf_counter()
         await asyncio.to_thread(
-            self.vault.store_gem, text, {"source": "voice", "confidence": 1.0}
+            self.vault.resonate_or_store, text, {"source": "voice", "confidence": 1.0}
         )
+        CRYSTALLIZE_SECONDS.observe_since(started)
 
     async def _trigger_path_b(self, text):
         payload = {
@@ -70,12 +78,7 @@ class IntentProcessor:
     async def _trigger_path_a(self):
         # Generate random "Manifestation" parameters
         mood = random.choice(["FOCUSED", "WAKING", "CALM"])
-        primary = "#00FFFF"
-        secondary = "#FF00FF"
-
-        if mood == "CALM":
-            primary = "#00FF00"
-            secondary = "#0000FF"
+        look = tone_profile(mood)
 
         payload = {
             "type": "MANIFEST",
@@ -86,8 +89,8 @@ class IntentProcessor:
             },
             "render_params": {
                 "geometry": "FLUID_ORB",
-                "chroma_primary": primary,
-                "chroma_secondary": secondary,
+                "chroma_primary": look.chroma_primary,
+                "chroma_secondary": look.chroma_secondary,
                 "pulse_frequency": 1.0,
                 "bloom_factor": 0.8,
             },
@@ -0,0 +1,71 @@
+"""
+FILE: jsonrpc.py
+CONTEXT: AG-SC-ADK / Brain / Gateway
+DESCRIPTION: JSON-RPC 2.0 request validation and error responses for /ws.
+
+A client message is either one request object or a batch array of them.
+Requests in a batch are validated independently, so one malformed entry is
+answered with its own error while the rest are still handled. Notifications
+(no "id") are not answered, except when admission control refuses them.
+Accepted voice_data requests are acknowledged once queued; the resulting
+intent arrives later as a bus frame.
+"""
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Implementation-defined server errors (-32000 to -32099)
+RATE_LIMITED = -32029
+OVERLOADED = -32053
+
+
+def result(request_id, value):
+    return {"jsonrpc": "2.0", "id": request_id, "result": value}
+
+
+def error(request_id, code, message, data=None):
+    response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+    if data is not None:
+        response["error"]["data"] = data
+    return response
+
+
+def is_notification(request):
+    return "id" not in request
+
+
+def split_batch(message):
+    """
+    Normalize a decoded client message into (requests, errors, is_batch).
+    requests: the valid request objects, in arrival order.
+    errors: error responses for entries that are not valid requests.
+    """
+    if isinstance(message, list):
+        if not message:
+            return [], [error(None, INVALID_REQUEST, "Empty batch")], True
+        requests, errors = [], []
+        for entry in message:
+            problem = _invalid(entry)
+            if problem is None:
+                requests.append(entry)
+            else:
+                errors.append(problem)
+        return requests, errors, True
+
+    problem = _invalid(message)
+    if problem is not None:
+        return [], [problem], False
+    return [message], [], False
+
+
+def _invalid(entry):
+    if not isinstance(entry, dict):
+        return error(None, INVALID_REQUEST, "Request must be an object")
+    request_id = entry.get("id")
+    if not isinstance(entry.get("method"), str):
+        return error(request_id, INVALID_REQUEST, "Missing method")
+    if "params" in entry and not isinstance(entry["params"], (dict, list)):
+        return error(request_id, INVALID_REQUEST, "Params must be an object or array")
+    return None
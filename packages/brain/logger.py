@@ -1,20 +1,203 @@
-import logging
+import atexit
+import gzip
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # Optional fast JSON backend
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # Optional zstd segment compression
+    zstandard = None
+
+
+def _dumps_line(entry):
+    if orjson is not None:
+        return orjson.dumps(entry, default=str) + b"\n"
+    return json.dumps(entry, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks and never formats on the caller's thread.
+    Records that do not fit in the bounded queue are counted and discarded.
+    """
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Serialization happens on the writer thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AuditSink(threading.Thread):
+    """
+    Background writer for the audit trail.
+    Drains the record queue in batches and appends NDJSON lines to the log file,
+    flushing on batch size or elapsed time and rotating by file size.
+    """
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, record_queue, handler, log_file, batch_size=256, flush_interval=0.5,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, compression=None):
+        super().__init__(name="RSIAuditSink", daemon=True)
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+
+        self.queue = record_queue
+        self.handler = handler
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compression = compression
+
+        self.written = 0
+        self.failed = 0
+        self.rotations = 0
+        self._reported_drops = 0
+        self._stream = None
+
+    def run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                self._write(batch)
+                self._close_stream()
+                return
+            if isinstance(item, tuple) and item[0] is self._FLUSH:
+                self._write(batch)
+                batch = []
+                item[1].set()
+                continue
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch):
+        dropped = self.handler.dropped
+        if not batch and dropped == self._reported_drops:
+            return
+
+        lines = []
+        if dropped != self._reported_drops:
+            lines.append(_dumps_line({
+                "ts": time.time(),
+                "source": "RSILogger",
+                "action": "Drop",
+                "status": "QueueFull",
+                "payload_summary": {"dropped": dropped - self._reported_drops, "dropped_total": dropped},
+            }))
+            self._reported_drops = dropped
+        for record in batch:
+            entry = record.msg if isinstance(record.msg, dict) else {"message": record.getMessage()}
+            lines.append(_dumps_line({"ts": record.created, **entry}))
+
+        try:
+            stream = self._open_stream()
+            stream.write(b"".join(lines))
+            stream.flush()
+            self.written += len(batch)
+            if stream.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            self.failed += len(batch)
+
+    def _open_stream(self):
+        if self._stream is None:
+            self._stream = open(self.log_file, "ab")
+        return self._stream
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _segment_name(self, index):
+        suffix = {"gzip": ".gz", "zstd": ".zst"}.get(self.compression, "")
+        return f"{self.log_file}.{index}{suffix}"
+
+    def _rotate(self):
+        self._close_stream()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = self._segment_name(index)
+                if os.path.exists(source):
+                    os.replace(source, self._segment_name(index + 1))
+            self._compress(self.log_file, self._segment_name(1))
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        self.rotations += 1
+
+    def _compress(self, source, target):
+        if self.compression == "gzip":
+            with open(source, "rb") as src, gzip.open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        elif self.compression == "zstd":
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            os.replace(source, target)
+
 
 class RSILogger:
-    def __init__(self, log_file="audit_gate.log"):
+    def __init__(self, log_file="audit_gate.log", name="RSI_Audit", max_queue=10000, batch_size=256, flush_interval=0.5,
+                 max_bytes=10 * 1024 * 1024, backup_count=5, compression=None):
         self.log_file = log_file
 
         # Setup logger
-        self.logger = logging.getLogger("RSI_Audit")
+        self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+        # Queue handler: the event loop only enqueues, the sink thread writes
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.logger.addHandler(self.handler)
 
-        # File handler
-        handler = logging.FileHandler(self.log_file)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        self.sink = AuditSink(
+            self.queue,
+            self.handler,
+            self.log_file,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            compression=compression,
+        )
+        self.sink.start()
+        atexit.register(self.close)
 
     def log_event(self, source, action, status, payload_summary=None):
         """
@@ -26,7 +209,34 @@ class RSILogger:
             "status": status,
             "payload_summary": payload_summary
         }
-        self.logger.info(json.dumps(entry))
+        self.logger.info(entry)
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def flush(self, timeout=5.0):
+        """
+        Block until everything queued so far has been written.
+        """
+        if not self.sink.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self.queue.put((AuditSink._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self.sink.is_alive():
+            try:
+                self.queue.put(AuditSink._STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self.sink.join(timeout)
+        self.logger.removeHandler(self.handler)
+
 
 # Global instance
 audit_logger = RSILogger()
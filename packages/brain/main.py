@@ -1,14 +1,55 @@
 import asyncio
-import json
+import logging
+import os
+try:
+    import fcntl
+except ImportError:  # Not on Windows: one process per Record is then up to the operator
+    fcntl = None
+import time
+import uuid
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from concurrent.futures import ThreadPoolExecutor
 from aether_bus import AetherBus
+from admission import AdmissionController, LoadShedder
+from codec import JSON, negotiate
+import jsonrpc
+from backplane import UnixSocketBackplane
 from sati import SATI
 from identity import PRGX_Triad
 from memory.akashic_vault import AkashicVault
+from memory.embedder import NGramEncoder
 from rituals.startup_ritual import perform_startup_ritual
+from rituals.uposatha import UposathaCleaner, uposatha_vigil
+from pipeline import VoicePipeline
+from session import SessionRegistry, session_janitor
+from metrics import disable_profiler, enable_profiler, loop_lag_monitor, registry
 
-app = FastAPI()
+logger = logging.getLogger("PRGX.Gateway")
+
+# How long a /ws client waits for the Record to open before being told to retry
+READY_TIMEOUT_SECONDS = 30.0
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Accept connections at once; the Record opens and warms in the background
+    app.state.status = "starting"
+    app.state.startup_seconds = None
+    app.state.settled = asyncio.Event()  # Set once awaken() succeeded or failed
+    app.state.background = []
+    app.state.awakening = asyncio.create_task(awaken(app, time.perf_counter()))
+    app.state.session_janitor = asyncio.create_task(session_janitor(sessions))
+    app.state.loop_lag_monitor = asyncio.create_task(loop_lag_monitor())
+    try:
+        yield
+    finally:
+        await shutdown(app)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS
 app.add_middleware(
@@ -20,71 +61,345 @@ app.add_middleware(
 )
 
 # Initialize Core Systems
-bus = AetherBus()
-sati = SATI()
+# Event loop lag beyond these sheds render_light telemetry, then refuses new intents
+shedder = LoadShedder(
+    telemetry_lag=float(os.environ.get("BRAIN_SHED_TELEMETRY_LAG", "0.05")),
+    intent_lag=float(os.environ.get("BRAIN_SHED_INTENT_LAG", "0.25")),
+)
+admission = AdmissionController(
+    rate=float(os.environ.get("BRAIN_WS_RATE", "20")),
+    burst=int(os.environ.get("BRAIN_WS_BURST", "40")),
+    max_in_flight=int(os.environ.get("BRAIN_MAX_IN_FLIGHT", "256")),
+    shedder=shedder,
+)
+bus = AetherBus(shedder=shedder)
+# One encoder for SATI and the Record: utterances are embedded once per request
+encoder = NGramEncoder()
+sati = SATI(encoder=encoder)
+sessions = SessionRegistry()
 prgx = PRGX_Triad()
-vault = AkashicVault()
+# Opened by awaken(): importing chromadb and loading the index stay off the import path
+vault = None
+uposatha = None
+record_lock = None  # Descriptor holding the Record directory's exclusive lock
+
+# CPU-bound pipeline stages (SATI, PRGX) run here, off the event loop
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pipeline")
+pipelines = set()
+
+# Metrics: hot paths count in their own modules, state here is read on scrape
+WS_CONNECTIONS = registry.gauge("ws_connections", "Open /ws connections")
+WS_MESSAGES = registry.counter("ws_messages_total", "Messages received on /ws by JSON-RPC method", ["method"])
+WS_METHODS = {"input/voice_data", "memory/recall"}
+# Upper bound on memory/recall's k and on the queries in one call
+MAX_RECALL_K = 50
+MAX_RECALL_QUERIES = 64
+registry.gauge("aetherbus_subscribers", "Subscriptions on this worker's bus").set_function(lambda: len(bus.subscribers))
+registry.gauge("aetherbus_dead_letter_depth", "Messages held in the dead-letter queue").set_function(
+    lambda: len(bus.dead_letter_queue)
+)
+registry.gauge("aetherbus_dead_letter_bytes", "Bytes held in the dead-letter queue").set_function(
+    lambda: bus.dead_letter_queue.bytes
+)
+registry.gauge("akashic_pending_commits", "Commits and resonances waiting for the next flush").set_function(
+    lambda: vault.pending_count if vault is not None else 0
+)
+registry.gauge("brain_ready", "1 once the Record is open and warm").set_function(
+    lambda: int(getattr(app.state, "status", None) == "ready")
+)
+registry.gauge("admission_in_flight", "Admitted messages not yet published, across connections").set_function(
+    lambda: admission.budget.in_flight
+)
+STARTUP_SECONDS = registry.gauge("brain_startup_seconds", "Lifespan start until ready, in seconds")
+registry.gauge("brain_sessions", "Open SATI sessions").set_function(lambda: len(sessions))
+pipeline_depth = registry.gauge("pipeline_depth", "Messages waiting in or being worked on by each stage", ["stage"])
+for stage in ("intake", "transmute", "commit", "publish"):
+    pipeline_depth.set_function(
+        lambda stage=stage: sum(pipeline.depths()[stage] for pipeline in list(pipelines)), stage
+    )
+
+def rejection(request_id, reason, retry_after):
+    if reason == "overloaded":
+        return jsonrpc.error(request_id, jsonrpc.OVERLOADED, "Brain is overloaded",
+                             {"reason": reason, "retry_after": retry_after})
+    return jsonrpc.error(request_id, jsonrpc.RATE_LIMITED, "Rate limit exceeded",
+                         {"reason": reason, "retry_after": retry_after})
+
+
+def recall_arguments(params):
+    """
+    Validate memory/recall params into Vault.recall keyword arguments.
+    Takes "query" (one text) or "queries" (a list), plus optional "k",
+    "tone", "ritual_tag", "min_usage" and "rerank". Raises ValueError.
+    """
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    queries = params.get("queries", params.get("query"))
+    if isinstance(queries, list):
+        if not queries or len(queries) > MAX_RECALL_QUERIES or not all(isinstance(q, str) for q in queries):
+            raise ValueError(f"queries must be 1 to {MAX_RECALL_QUERIES} strings")
+    elif not isinstance(queries, str):
+        raise ValueError("query must be a string")
+
+    k = params.get("k", 5)
+    min_usage = params.get("min_usage")
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_RECALL_K:
+        raise ValueError(f"k must be an integer from 1 to {MAX_RECALL_K}")
+    if min_usage is not None and (not isinstance(min_usage, int) or isinstance(min_usage, bool)):
+        raise ValueError("min_usage must be an integer")
+    for name in ("tone", "ritual_tag"):
+        if params.get(name) is not None and not isinstance(params[name], str):
+            raise ValueError(f"{name} must be a string")
+    return {
+        "queries": queries,
+        "k": k,
+        "tone": params.get("tone"),
+        "ritual_tag": params.get("ritual_tag"),
+        "min_usage": min_usage,
+        "rerank": bool(params.get("rerank", False)),
+    }
+
+
+async def recall(request_id, arguments):
+    try:
+        hits = await asyncio.to_thread(vault.recall, **arguments)
+    except Exception as e:
+        logger.error(f"memory/recall failed: {e}")
+        return jsonrpc.error(request_id, jsonrpc.INTERNAL_ERROR, "Recall failed")
+    return jsonrpc.result(request_id, {"hits": hits})
+
 
-@app.on_event("startup")
-async def startup_event():
-    success = await perform_startup_ritual()
-    if not success:
-        print("FATAL: Startup Ritual Failed")
-        exit(1)
+async def awaken(app, started):
+    """
+    Open the Akashic Record off the event loop, run the startup ritual, then
+    mark the Brain ready and start the vault-bound background work.
+    """
+    global vault, uposatha, record_lock
+    try:
+        # One process per Record: further workers on the same directory fail readiness
+        record_path = os.environ.get("AKASHIC_RECORD_DIR", "akashic_record")
+        record_lock = lock_record(record_path)
+
+        # BRAIN_VAULT_PARTITION=day|week stores one collection per period.
+        # Char n-gram similarity is lexical, not semantic: "10 percent" and
+        # "100 percent" score above any usable threshold, so only identical
+        # intents resonate.
+        vault = await asyncio.to_thread(
+            AkashicVault, persist_path=record_path, embedder=encoder,
+            partitioning=os.environ.get("BRAIN_VAULT_PARTITION") or None, dedup_threshold=None,
+        )
+        uposatha = UposathaCleaner(vault.client, vault=vault)
+
+        success = await perform_startup_ritual(vault=vault, embedder=encoder)
+        if not success:
+            raise RuntimeError("Startup Ritual Failed")
+
+        # Brain processes sharing a backplane directory relay frames over Unix sockets
+        backplane_dir = os.environ.get("AETHERBUS_BACKPLANE_DIR")
+        if backplane_dir:
+            await bus.attach_backplane(UnixSocketBackplane(backplane_dir))
+    except Exception as e:
+        app.state.status = "failed"
+        app.state.settled.set()
+        logger.critical(f"FATAL: Brain failed to awaken: {e}")
+        return
+
+    # Opt-in: sample the stacks of pipeline/vault work running longer than this
+    slow_ms = os.environ.get("BRAIN_PROFILE_SLOW_MS")
+    if slow_ms:
+        enable_profiler(threshold=float(slow_ms) / 1000.0)
+
+    # Uposatha runs in budgeted slices in the background
+    app.state.background.append(asyncio.create_task(uposatha_vigil(uposatha)))
+
+    app.state.startup_seconds = time.perf_counter() - started
+    STARTUP_SECONDS.set(round(app.state.startup_seconds, 4))
+    app.state.status = "ready"
+    app.state.settled.set()
+    logger.info(f"✨ Brain ready in {app.state.startup_seconds:.3f}s")
+
+def lock_record(path):
+    """
+    Take an exclusive lock on the Record directory, creating it if needed.
+    Returns the descriptor holding it (None where advisory locks are not
+    available); raises RuntimeError if another process holds the Record.
+    """
+    os.makedirs(path, exist_ok=True)
+    if fcntl is None:
+        return None
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        raise RuntimeError(f"Akashic Record {path} is already open in another process")
+    return fd
+
+async def shutdown(app):
+    global vault, record_lock
+    tasks = [app.state.awakening, app.state.session_janitor, app.state.loop_lag_monitor, *app.state.background]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    disable_profiler()
+    await bus.detach_backplane()
+    executor.shutdown(wait=False)
+    # Durably write any commits still waiting in the write-behind queue
+    if vault is not None:
+        await asyncio.to_thread(vault.close)
+        vault = None
+    if record_lock is not None:
+        os.close(record_lock)
+        record_lock = None
+
+@app.get("/health")
+async def health():
+    """
+    Liveness is answering at all; readiness is status "ready" (503 until then).
+    """
+    status = app.state.status
+    body = {"status": status, "ready": status == "ready", "startup_seconds": app.state.startup_seconds}
+    return JSONResponse(body, status_code=200 if status == "ready" else 503)
+
+@app.get("/pipeline")
+async def pipeline_stats():
+    """
+    Per-stage queue depths summed over all connected clients.
+    """
+    totals = {"connections": len(pipelines), "sessions": len(sessions), "intake": 0, "transmute": 0, "commit": 0, "publish": 0}
+    for pipeline in pipelines:
+        for stage, depth in pipeline.depths().items():
+            totals[stage] += depth
+    return totals
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus text exposition of every registered metric.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    print("Client connected to AetherBus Gateway")
+    # Wire codec per connection: offered as subprotocol "aetherbus.<codec>", JSON otherwise
+    codec, subprotocol = negotiate(websocket.scope.get("subprotocols"))
+    await websocket.accept(subprotocol=subprotocol)
+    try:
+        await asyncio.wait_for(app.state.settled.wait(), READY_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    if app.state.status != "ready":
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason=f"Brain is {app.state.status}")
+        return
+    print(f"Client connected to AetherBus Gateway ({codec.name})")
+
+    async def send_to_client(frame: bytes):
+        # Frames arrive pre-encoded from the bus; forward the bytes untouched
+        await websocket.send_bytes(frame)
 
-    async def send_to_client(message: str):
-        await websocket.send_text(message)
+    async def respond(responses, is_batch):
+        # Batches are answered with one array, single requests with one object
+        await websocket.send_bytes(codec.encode(responses if is_batch else responses[0]))
 
-    bus.subscribe(send_to_client)
+    # Each connection observes through its own SATI state
+    session_id = str(uuid.uuid4())
+    state = sessions.open(session_id)
+
+    bus.subscribe(send_to_client, codec=codec)
+    pipeline = VoicePipeline(bus, sati, prgx, vault, executor=executor, state=state, budget=admission.budget).start()
+    rate_bucket = admission.connection_bucket()
+    pipelines.add(pipeline)
+    WS_CONNECTIONS.inc()
 
     try:
         while True:
-            data = await websocket.receive_text()
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
             try:
-                message = json.loads(data)
-                method = message.get("method")
+                # Binary messages use the negotiated codec, text is always JSON
+                if received.get("bytes") is not None:
+                    message = codec.decode(received["bytes"])
+                else:
+                    message = JSON.decode(received["text"])
+            except ValueError:  # Undecodable frame for this codec
+                await respond([jsonrpc.error(None, jsonrpc.PARSE_ERROR, "Parse error")], False)
+                continue
+
+            # A JSON-RPC batch array is handled request by request, in order
+            requests, errors, is_batch = jsonrpc.split_batch(message)
+            texts = []
+            accepted = []  # ids of voice_data requests to acknowledge once queued
+            recalls = []  # (request id, Vault.recall arguments)
+            for request in requests:
+                method = request["method"]
+                WS_MESSAGES.labels(method if method in WS_METHODS else "other").inc()
 
                 if method == "input/voice_data":
-                    print("Brain: Received Voice Data.")
-                    params = message.get("params", {})
-                    text = params.get("text", "")
-
-                    # 1. SATI Observation
-                    # Mock Vibe Score extraction (In real system, this comes from Audio Model)
-                    vibe_score = 0.8 # Mock Positive
-                    tone = "WAKING"
-                    current_vibe = sati.observe(text, vibe_score, tone)
-                    intent_vector = sati.encode_intent(text)
-
-                    # 2. PRGX1 Sentry Check
-                    valid, reason = prgx.sentry.inspect({"intent_vector": intent_vector, "vibe_score": vibe_score})
-                    if not valid:
-                        print(f"PRGX1 Blocked: {reason}")
-                        # Trigger Diplomat?
+                    params = request.get("params") or {}
+                    text = params.get("text", "") if isinstance(params, dict) else None
+                    if not isinstance(text, str):
+                        if not jsonrpc.is_notification(request):
+                            errors.append(jsonrpc.error(request["id"], jsonrpc.INVALID_PARAMS, "text must be a string"))
                         continue
+                    identity = params.get("_identity")
+                    source_id = identity.get("source_id") if isinstance(identity, dict) else None
+                    refused = admission.admit(rate_bucket, source_id)
+                    if refused is not None:
+                        # Refusals are reported even for notifications: the utterance is lost otherwise
+                        errors.append(rejection(request.get("id"), *refused))
+                        continue
+                    texts.append(text)
+                    if not jsonrpc.is_notification(request):
+                        accepted.append(request["id"])
+                elif method == "memory/recall":
+                    if jsonrpc.is_notification(request):
+                        continue  # Nowhere to send the hits
+                    try:
+                        arguments = recall_arguments(request.get("params") or {})
+                    except ValueError as e:
+                        errors.append(jsonrpc.error(request["id"], jsonrpc.INVALID_PARAMS, str(e)))
+                        continue
+                    refused = admission.admit_query(rate_bucket)
+                    if refused is not None:
+                        errors.append(rejection(request["id"], *refused))
+                        continue
+                    recalls.append((request["id"], arguments))
+                elif not jsonrpc.is_notification(request):
+                    errors.append(jsonrpc.error(request["id"], jsonrpc.METHOD_NOT_FOUND, f"Unknown method: {method}"))
 
-                    # 3. PRGX2 Alchemist Transmutation (RSI Loop)
-                    physics_params = prgx.alchemist.transmute(current_vibe, intent_vector)
-
-                    # 4. Akashic Record Commit
-                    vault.commit_change(physics_params, text)
-
-                    # 5. GenUI Manifestation (Publish)
-                    await bus.publish("ui:shader_intent", physics_params, {"source": "brain"})
-
-            except json.JSONDecodeError:
-                pass
+            if texts:
+                print(f"Brain: Received Voice Data ({len(texts)}).")
+                # SATI -> PRGX1 -> PRGX2 -> Akashic -> Publish, off the event loop,
+                # micro-batched with whatever else arrives within the batch window
+                await pipeline.submit_many(texts)
+            responses = errors + [jsonrpc.result(request_id, {"accepted": True}) for request_id in accepted]
+            if recalls:
+                # Recalls in one batch run side by side, off the event loop
+                responses += list(await asyncio.gather(
+                    *(recall(request_id, arguments) for request_id, arguments in recalls)
+                ))
+            if responses:
+                await respond(responses, is_batch)
 
     except WebSocketDisconnect:
         print("Client disconnected")
-        if send_to_client in bus.subscribers:
-            bus.subscribers.remove(send_to_client)
+    finally:
+        WS_CONNECTIONS.dec()
+        bus.unsubscribe(send_to_client)
+        pipelines.discard(pipeline)
+        await pipeline.close()
+        sessions.close(session_id)
 
 if __name__ == "__main__":
     import uvicorn
+    workers = int(os.environ.get("BRAIN_WORKERS", "1"))
+    if workers > 1:
+        # Every worker would open its own Chroma client, write-behind flusher,
+        # dedup index and Uposatha vigil on the same akashic_record directory
+        raise SystemExit(
+            f"BRAIN_WORKERS={workers}: the Akashic Record is a local vault that only one process may open. "
+            "Run one Brain per Record (AKASHIC_RECORD_DIR); they can share frames via AETHERBUS_BACKPLANE_DIR."
+        )
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -2,21 +2,124 @@ import logging
 import uuid
 from datetime import datetime
 from memory.vault import Vault
+from metrics import SIZE_BUCKETS, profile, registry
 
 logger = logging.getLogger("Akashic.Vault")
 
+COMMITS = registry.counter("akashic_commits_total", "Commits by outcome", ["outcome"])
+COMMITS_QUEUED = COMMITS.labels("queued")
+COMMITS_RESONATED = COMMITS.labels("resonated")
+FLUSH_BATCH = registry.histogram("akashic_flush_batch_size", "Commits written per write-behind flush", buckets=SIZE_BUCKETS)
+
 class AkashicVault(Vault):
     """
     Wrapper around the standard Vault (ChromaDB) to support
     Akashic Record integration and 'Commit Rituals'.
+
+    Commits are write-behind: commit_change returns the gem id at once and a
+    worker thread groups pending commits into one upsert per flush window.
+    Repeats of an existing intent resonate that gem instead of adding a new one.
     """
-    def __init__(self, persist_path="akashic_record"):
-        super().__init__(persist_path)
+    def __init__(self, persist_path="akashic_record", flush_interval=0.25, max_batch=256, embedder=None,
+                 partitioning=None, dedup_threshold=0.97):
+        super().__init__(persist_path, embedder=embedder, dedup_threshold=dedup_threshold,
+                         flush_interval=flush_interval, partitioning=partitioning)
+        self.max_batch = max_batch
+        self._pending = []  # (text, metadata, embedding) awaiting the next flush
 
-    def commit_change(self, physics_params, original_text, ritual_tag="normal"):
+    def commit_change(self, physics_params, original_text, ritual_tag="normal", embedding=None):
         """
         Commit a significant change/intent to the Record.
+        Returns the gem id immediately; the write lands on the next flush.
+        Runs a similarity lookup, so call it off the event loop.
+        Pass the utterance's embedding when it was already encoded upstream.
         """
+        gem_id, entry = self._prepare_commit(physics_params, original_text, ritual_tag, embedding)
+        if entry is None:
+            return gem_id
+
+        # Store the shared intent embedding alongside the text
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AkashicVault is closed")
+            # Another thread may have committed the same text since our lookup
+            winner = self._claim_text(original_text, gem_id)
+            if winner == gem_id:
+                self._pending.append(entry)
+                self._ensure_flusher()
+                if len(self._pending) >= self.max_batch:
+                    self._cond.notify()
+        if winner != gem_id:
+            self._resonate(winner)
+            return winner
+        COMMITS_QUEUED.inc()
+
+        logger.debug(f"📜 Akashic Record Queued: {gem_id} [{ritual_tag}]")
+        return gem_id
+
+    def commit_changes(self, changes, ritual_tag="normal"):
+        """
+        Commit a group of (physics_params, original_text, embedding) in order.
+        New gems are queued together, so the group lands in the same flush
+        and therefore the same multi-document upsert. A change that fails its
+        similarity lookup is logged and yields None without affecting the rest.
+        """
+        gem_ids = []
+        entries = []  # (position in gem_ids, entry)
+        for physics_params, original_text, embedding in changes:
+            try:
+                gem_id, entry = self._prepare_commit(physics_params, original_text, ritual_tag, embedding)
+            except Exception as e:
+                logger.error(f"Akashic commit failed for one change in a group: {e}")
+                gem_ids.append(None)
+                continue
+            if entry is not None:
+                entries.append((len(gem_ids), entry))
+            gem_ids.append(gem_id)
+
+        if entries:
+            queued = 0
+            resonated = []
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("AkashicVault is closed")
+                for position, entry in entries:
+                    # Repeats later in this group, or committed by another
+                    # thread since the lookup, resonate the first gem
+                    winner = self._claim_text(entry[0], gem_ids[position])
+                    if winner == gem_ids[position]:
+                        self._pending.append(entry)
+                        queued += 1
+                    else:
+                        gem_ids[position] = winner
+                        resonated.append(winner)
+                if queued:
+                    self._ensure_flusher()
+                    if len(self._pending) >= self.max_batch:
+                        self._cond.notify()
+            for winner in resonated:
+                self._resonate(winner)
+            if queued:
+                COMMITS_QUEUED.inc(queued)
+                logger.debug(f"📜 Akashic Record Queued: {queued} gems [{ritual_tag}]")
+        return gem_ids
+
+    def _resonate(self, gem_id):
+        self.update_resonance(gem_id)
+        COMMITS_RESONATED.inc()
+
+    def _prepare_commit(self, physics_params, original_text, ritual_tag, embedding):
+        """
+        Resonate an existing gem, or build the pending entry for a new one.
+        Returns (gem_id, entry); entry is None when the text resonated.
+        """
+        if embedding is None:
+            embedding = self.embedder.embed_one(original_text)
+        existing_id = self.find_resonant(original_text, embedding)
+        if existing_id is not None:
+            self._resonate(existing_id)
+            return existing_id, None
+
         gem_id = str(uuid.uuid4())
 
         metadata = {
@@ -28,10 +131,44 @@ class AkashicVault(Vault):
             "vibe_score": physics_params["vibe_score"],
             "emotional_tone": physics_params["emotional_tone"]
         }
+        return gem_id, (original_text, metadata, embedding)
 
-        # Store vector (using the intent vector from params if possible, or text embedding)
-        # Here we store text for simplicity of retrieval in this prototype
-        self.store_gem(original_text, metadata)
+    @property
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending) + sum(self._resonance.values())
 
-        logger.info(f"📜 Akashic Record Committed: {gem_id} [{ritual_tag}]")
-        return gem_id
+    def flush(self):
+        """
+        Write every pending commit with one multi-document upsert, then merge
+        pending resonances. Safe to call from any thread; blocks until stored.
+        """
+        with self._flush_lock, profile("akashic.flush"):
+            with self._cond:
+                batch, self._pending = self._pending, []
+
+            if batch:
+                FLUSH_BATCH.observe(len(batch))
+                texts = [text for text, _, _ in batch]
+                metadatas = [metadata for _, metadata, _ in batch]
+                embeddings = [embedding for _, _, embedding in batch]
+                try:
+                    self.store_gems(texts, metadatas, embeddings=embeddings)
+                except Exception as e:
+                    # Keep the batch for the next window rather than losing it
+                    logger.error(f"Akashic flush failed, retrying {len(batch)} commits: {e}")
+                    with self._cond:
+                        self._pending[:0] = batch
+                    raise
+                logger.info(f"📜 Akashic Record Committed: {len(batch)} gems")
+
+            # After the upsert, so gems resonated inside their own window exist
+            return len(batch) + self.flush_resonance()
+
+    def _has_pending(self):
+        # Caller holds self._cond
+        return bool(self._pending) or super()._has_pending()
+
+    def _batch_full(self):
+        # Caller holds self._cond
+        return len(self._pending) >= self.max_batch
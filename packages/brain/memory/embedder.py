@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger("PRGX.Embedder")
+
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+# 64-bit FNV-style constants for the rolling n-gram hash
+NGRAM_PRIME = np.uint64(1099511628211)
+NGRAM_OFFSET = np.uint64(14695981039346656037)
+TEXT_START = "\x02"
+TEXT_END = "\x03"
+
+
+class Embedder:
+    """
+    Interface for local text encoders shared by SATI and the Vault.
+    embed(texts) returns a contiguous (n, dimensions) float32 array; rows are
+    cached in an LRU so repeated texts are encoded once.
+    Subclasses implement _key(text) and _compute(texts, keys).
+    """
+    name = "embedder"
+
+    def __init__(self, dimensions=384, cache_size=4096):
+        self.dimensions = dimensions
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts):
+        """
+        Embed a batch of texts into a contiguous (n, dimensions) float32 array.
+        """
+        out = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        missing = {}  # key -> (text, [row indexes])
+
+        with self._lock:
+            for row, text in enumerate(texts):
+                key = self._key(text)
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    out[row] = cached
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, (text, []))[1].append(row)
+                    self.misses += 1
+
+        if missing:
+            keys = list(missing)
+            vectors = self._compute([missing[key][0] for key in keys], keys)
+            with self._lock:
+                for key, vector in zip(keys, vectors):
+                    out[missing[key][1]] = vector
+                    self._remember(key, vector)
+        return out
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def _key(self, text):
+        return text
+
+    def _compute(self, texts, keys):
+        raise NotImplementedError
+
+    def _remember(self, key, vector):
+        # Caller holds self._lock
+        if self.cache_size <= 0:
+            return
+        vector = vector.copy()
+        vector.setflags(write=False)
+        self._cache[key] = vector
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+class HashEmbedder(Embedder):
+    """
+    Deterministic local embedding built from a chain of SHA-256 digests.
+    Row i is sha256(text) || sha256(sha256(text)) || ... scaled to [0, 1],
+    identical to the values existing vault collections were written with.
+    """
+    name = "sha256-chain"
+
+    def __init__(self, dimensions=384, cache_size=4096):
+        super().__init__(dimensions, cache_size)
+        self.rounds = -(-dimensions // DIGEST_SIZE)
+
+    def _key(self, text):
+        # sha256(text) is also the first link of the chain
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _compute(self, texts, keys):
+        chain = bytearray()
+        for seed in keys:
+            digest = seed
+            chain += digest
+            for _ in range(self.rounds - 1):
+                digest = hashlib.sha256(digest).digest()
+                chain += digest
+
+        raw = np.frombuffer(bytes(chain), dtype=np.uint8).reshape(len(keys), self.rounds * DIGEST_SIZE)
+        return raw[:, :self.dimensions].astype(np.float32) / np.float32(255.0)
+
+
+class NGramEncoder(Embedder):
+    """
+    Offline intent encoder: hashed character n-gram features (signed feature
+    hashing) projected to a fixed dimension and L2-normalized.
+    Similar utterances land close together, unlike the hash chain.
+    The whole batch is hashed in one NumPy pass over its code points.
+    """
+    name = "char-ngram"
+
+    def __init__(self, dimensions=384, ngram_range=(1, 3), cache_size=4096):
+        super().__init__(dimensions, cache_size)
+        self.ngram_range = ngram_range
+
+    def _compute(self, texts, keys):
+        n = len(texts)
+        parts = [TEXT_START + text.casefold() + TEXT_END for text in texts]
+        codepoints = np.frombuffer("".join(parts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        rows = np.repeat(np.arange(n), [len(part) for part in parts])
+
+        flat_index = []
+        signs = []
+        low, high = self.ngram_range
+        for size in range(low, high + 1):
+            count = len(codepoints) - size + 1
+            if count <= 0:
+                continue
+            hashes = np.full(count, NGRAM_OFFSET + np.uint64(size), dtype=np.uint64)
+            for offset in range(size):
+                hashes = (hashes ^ codepoints[offset:offset + count]) * NGRAM_PRIME
+            # An n-gram counts only if it does not straddle two texts
+            valid = rows[:count] == rows[size - 1:size - 1 + count]
+            hashes = hashes[valid]
+            hashes ^= hashes >> np.uint64(29)
+
+            flat_index.append(rows[:count][valid] * self.dimensions + (hashes % np.uint64(self.dimensions)).astype(np.int64))
+            signs.append(np.where(hashes & np.uint64(1 << 40), 1.0, -1.0))
+
+        if not flat_index:
+            return np.zeros((n, self.dimensions), dtype=np.float32)
+
+        features = np.bincount(
+            np.concatenate(flat_index),
+            weights=np.concatenate(signs),
+            minlength=n * self.dimensions,
+        ).reshape(n, self.dimensions)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        np.divide(features, norms, out=features, where=norms > 0)
+        return features.astype(np.float32)
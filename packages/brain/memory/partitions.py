@@ -0,0 +1,262 @@
+"""
+FILE: partitions.py
+CONTEXT: AG-SC-ADK / Brain / Memory
+DESCRIPTION: Time-partitioned gem storage behind the Chroma collection API.
+
+PartitionedCollection stands in for the single gems collection: one Chroma
+collection per day or week plus a "noble" partition for gems kept past
+retention. Writes land in the current partition, reads fan out over all
+partitions in parallel and merge, so Vault code works unchanged. Retention
+retires a whole partition by dropping its collection, which costs the same
+however large the rest of the Record is, and leaves no holes in the HNSW
+indexes that are kept. A drop waits for reads already running on that
+partition, so a query never sees its collection vanish midway.
+"""
+import logging
+import threading
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logger = logging.getLogger("PRGX.Partitions")
+
+GRANULARITIES = {"day": ("d", timedelta(days=1)), "week": ("w", timedelta(weeks=1))}
+NOBLE_SUFFIX = "noble"
+
+# start/end are None for the noble partition and a pre-partitioning collection
+Partition = namedtuple("Partition", ["name", "start", "end"])
+
+
+class PartitionedCollection:
+    """
+    The subset of chromadb's Collection API the Vault uses (upsert, get,
+    update, delete, query, count), spread over time partitions.
+    Partitions are named <base>_d<YYYYMMDD> or <base>_w<YYYYMMDD> (the ISO
+    week's Monday); an existing unpartitioned <base> collection is still read
+    and updated but never written to or retired.
+    """
+    def __init__(self, client, base_name, granularity="day", workers=4, clock=datetime.now):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity: {granularity}")
+        self.client = client
+        self.base_name = base_name
+        self.granularity = granularity
+        self.prefix, self.span = GRANULARITIES[granularity]
+        self.workers = workers
+        self.clock = clock
+        self.max_batch = client.get_max_batch_size()
+
+        self._collections = {}  # name -> Collection
+        self._partitions = {}  # name -> Partition
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)  # Notified as reads finish
+        self._reading = Counter()  # name -> reads in flight on that partition
+        self._pool = None
+        for collection in client.list_collections():
+            name = collection if isinstance(collection, str) else collection.name
+            partition = self._parse(name)
+            if partition is not None:
+                self._partitions[name] = partition
+                self._collections[name] = client.get_collection(name)
+
+    # --- Partition bookkeeping ---------------------------------------------
+
+    def _parse(self, name):
+        if name == self.base_name or name == self.noble_name:
+            return Partition(name, None, None)
+        head, _, tail = name.rpartition("_")
+        if head != self.base_name or tail[:1] != self.prefix:
+            return None
+        try:
+            start = datetime.strptime(tail[1:], "%Y%m%d")
+        except ValueError:
+            return None
+        return Partition(name, start, start + self.span)
+
+    @property
+    def noble_name(self):
+        return f"{self.base_name}_{NOBLE_SUFFIX}"
+
+    def partition_for(self, moment):
+        start = datetime(moment.year, moment.month, moment.day)
+        if self.granularity == "week":
+            start -= timedelta(days=start.weekday())
+        name = f"{self.base_name}_{self.prefix}{start:%Y%m%d}"
+        return Partition(name, start, start + self.span)
+
+    def partitions(self):
+        """
+        All partitions, oldest data first: the unpartitioned collection, the
+        noble partition, then time partitions by start.
+        """
+        with self._lock:
+            return self._sorted_partitions()
+
+    def _sorted_partitions(self):
+        # Caller holds self._lock
+        return sorted(self._partitions.values(),
+                      key=lambda p: (p.start is not None, p.name != self.base_name, p.start or datetime.min))
+
+    def expired(self, before):
+        """
+        Time partitions whose whole span ended before `before`.
+        """
+        return [p for p in self.partitions() if p.end is not None and p.end <= before]
+
+    def collection(self, name):
+        with self._lock:
+            return self._collections[name]
+
+    def _ensure(self, partition):
+        with self._lock:
+            collection = self._collections.get(partition.name)
+            if collection is None:
+                collection = self.client.get_or_create_collection(partition.name)
+                self._collections[partition.name] = collection
+                self._partitions[partition.name] = partition
+                logger.info(f"🗂️ Opened vault partition {partition.name}")
+            return collection
+
+    def current(self):
+        return self._ensure(self.partition_for(self.clock()))
+
+    def noble(self):
+        return self._ensure(Partition(self.noble_name, None, None))
+
+    def drop(self, name):
+        """
+        Remove a whole partition in one collection delete.
+        New reads skip it at once; reads already on it finish first.
+        """
+        with self._lock:
+            self._collections.pop(name, None)
+            self._partitions.pop(name, None)
+            self._idle.wait_for(lambda: not self._reading[name])
+        self.client.delete_collection(name)
+        logger.info(f"🍂 Dropped vault partition {name}")
+
+    @contextmanager
+    def _snapshot(self):
+        """
+        (partition, collection) pairs in partitions() order, taken in one step
+        and held against drop() until the block exits.
+        """
+        with self._lock:
+            names = [p.name for p in self._sorted_partitions()]
+            pairs = [(self._partitions[name], self._collections[name]) for name in names]
+            self._reading.update(names)
+        try:
+            yield pairs
+        finally:
+            with self._lock:
+                self._reading -= Counter(names)
+                self._idle.notify_all()
+
+    def _fan_out(self, function):
+        """
+        Apply function to every partition's collection, in parallel.
+        Results come back in partitions() order.
+        """
+        with self._snapshot() as pairs:
+            collections = [collection for _, collection in pairs]
+            if len(collections) <= 1:
+                return [function(collection) for collection in collections]
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vault-partition")
+                pool = self._pool
+            return list(pool.map(function, collections))
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # --- Collection API ------------------------------------------------------
+
+    def count(self):
+        return sum(self._fan_out(lambda collection: collection.count()))
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None):
+        self.current().upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("metadatas", "documents")):
+        include = list(include)
+        if ids is not None or (limit is None and not offset):
+            pages = self._fan_out(lambda collection: collection.get(ids=ids, where=where, include=include))
+            return _concat(pages, include)
+
+        # Paged read across partitions in partitions() order
+        offset = offset or 0
+        remaining = limit
+        pages = []
+        with self._snapshot() as pairs:
+            for _, collection in pairs:
+                if remaining is not None and remaining <= 0:
+                    break
+                size = collection.count() if where is None else len(collection.get(where=where, include=[])["ids"])
+                if offset >= size:
+                    offset -= size
+                    continue
+                page = collection.get(where=where, limit=remaining, offset=offset, include=include)
+                offset = 0
+                if remaining is not None:
+                    remaining -= len(page["ids"])
+                pages.append(page)
+        return _concat(pages, include)
+
+    def update(self, ids, metadatas=None, embeddings=None, documents=None):
+        positions = {gem_id: i for i, gem_id in enumerate(ids)}
+
+        def update_partition(collection):
+            found = collection.get(ids=list(ids), include=[])["ids"]
+            if not found:
+                return
+            rows = [positions[gem_id] for gem_id in found]
+            collection.update(
+                ids=found,
+                metadatas=[metadatas[i] for i in rows] if metadatas is not None else None,
+                embeddings=[embeddings[i] for i in rows] if embeddings is not None else None,
+                documents=[documents[i] for i in rows] if documents is not None else None,
+            )
+
+        self._fan_out(update_partition)
+
+    def delete(self, ids):
+        self._fan_out(lambda collection: collection.delete(ids=ids))
+
+    def query(self, query_embeddings, n_results=10, where=None, include=("metadatas", "documents", "distances")):
+        """
+        Query every partition in parallel and keep the n_results nearest per
+        query row across all of them.
+        """
+        include = list(include)
+        wanted = include if "distances" in include else include + ["distances"]
+        results = self._fan_out(lambda collection: collection.query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where, include=wanted
+        ))
+
+        merged = {key: [] for key in ["ids"] + include}
+        for row in range(len(query_embeddings)):
+            candidates = sorted(
+                (distance, part, position)
+                for part, result in enumerate(results)
+                for position, distance in enumerate(result["distances"][row])
+            )[:n_results]
+            for key in merged:
+                merged[key].append([results[part][key][row][position] for _, part, position in candidates])
+        return merged
+
+
+def _concat(pages, include):
+    merged = {"ids": []}
+    for key in include:
+        merged[key] = []
+    for page in pages:
+        for key in merged:
+            values = page.get(key)
+            if values is not None:
+                merged[key].extend(values)
+    return merged
@@ -1,15 +1,214 @@
-import chromadb
-from chromadb.config import Settings
+import hashlib
 import logging
 import os
+import re
+import threading
 import time
-import hashlib
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
+import numpy as np
+from memory.embedder import HashEmbedder
+from memory.partitions import PartitionedCollection
+from metrics import profile, registry
 
 logger = logging.getLogger("PRGX.Vault")
 
+GEMS_COLLECTION = "vocal_resonance_gems"
+TEXT_INDEX_SIZE = 100_000
+HOT_TIER_SIZE = 2048
+
+WRITE_SECONDS = registry.histogram("vault_write_seconds", "Duration of one store_gems call, embedding included")
+GEMS_WRITTEN = registry.counter("vault_gems_written_total", "Gems upserted into ChromaDB")
+RESONANCE_FLUSH_SECONDS = registry.histogram("vault_resonance_flush_seconds", "Duration of one batched resonance flush")
+DEDUP = registry.counter("vault_dedup_lookups_total", "Dedup lookups by the tier that answered them", ["result"])
+DEDUP_TEXT = DEDUP.labels("text_index")
+DEDUP_HOT = DEDUP.labels("hot_tier")
+DEDUP_CHROMA = DEDUP.labels("chroma")
+DEDUP_MISS = DEDUP.labels("miss")
+RECALL_SECONDS = registry.histogram("vault_recall_seconds", "Duration of one recall call, embedding and rerank included")
+RECALL_SHARED = registry.counter("vault_recall_shared_total", "Recall calls answered by an identical lookup already in flight")
+
+# Re-ranking looks at this many candidates per requested result
+RERANK_OVERSAMPLE = 4
+# Hash-chain collections (plain or partitioned) cut over to another embedder's collection
+LEGACY_COLLECTION = re.compile(GEMS_COLLECTION + r"(_noble|_[dw]\d{8})?")
+MIGRATION_PAGE = 1024
+GEMS_MIGRATED = registry.counter("vault_gems_migrated_total", "Gems re-embedded from the hash-chain collection")
+
+
+def gems_collection(embedder):
+    """
+    Collection holding gems embedded by this embedder. Vectors from different
+    encoders are never compared, so each gets its own collection; the hash
+    chain keeps the original name its existing gems were written under.
+    """
+    if isinstance(embedder, HashEmbedder):
+        return GEMS_COLLECTION
+    return f"{GEMS_COLLECTION}_{embedder.name}"
+
+
+class HotTier:
+    """
+    Bounded in-process cache of recent gems in front of ChromaDB.
+    Keeps document, metadata and a normalized float32 embedding per gem, and
+    answers nearest-neighbour lookups with one brute-force matrix product.
+    Eviction takes the least-resonant gem among the least recently used.
+    """
+    def __init__(self, capacity=HOT_TIER_SIZE, dimensions=384, eviction_sample=8):
+        self.capacity = capacity
+        self.eviction_sample = eviction_sample
+        self._matrix = np.zeros((capacity, dimensions), dtype=np.float32)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._slot_ids = [None] * capacity
+        self._documents = [None] * capacity
+        self._metadatas = [None] * capacity
+        self._slots = OrderedDict()  # gem id -> slot, least recently used first
+        self._free = list(range(capacity - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, gem_id):
+        return gem_id in self._slots
+
+    def put(self, gem_id, document, metadata, embedding):
+        if self.capacity <= 0:
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        with self._lock:
+            slot = self._slots.get(gem_id)
+            if slot is None:
+                slot = self._free.pop() if self._free else self._evict()
+                self._slots[gem_id] = slot
+            else:
+                self._slots.move_to_end(gem_id)
+            self._matrix[slot] = vector / norm if norm else vector
+            self._active[slot] = True
+            self._slot_ids[slot] = gem_id
+            self._documents[slot] = document
+            self._metadatas[slot] = dict(metadata)
+
+    def get(self, gem_id):
+        """
+        Return (document, metadata) for a cached gem, or None on a miss.
+        """
+        with self._lock:
+            slot = self._slots.get(gem_id)
+            if slot is None:
+                self.misses += 1
+                return None
+            self._slots.move_to_end(gem_id)
+            self.hits += 1
+            return self._documents[slot], dict(self._metadatas[slot])
+
+    def nearest(self, embedding, threshold):
+        """
+        Return (gem_id, similarity) of the closest cached gem at or above
+        threshold, or None on a miss.
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        with self._lock:
+            if not self._slots or not norm:
+                self.misses += 1
+                return None
+            scores = self._matrix @ (query / norm)
+            scores[~self._active] = -np.inf
+            slot = int(np.argmax(scores))
+            similarity = float(scores[slot])
+            if similarity < threshold:
+                self.misses += 1
+                return None
+            gem_id = self._slot_ids[slot]
+            self._slots.move_to_end(gem_id)
+            self.hits += 1
+            return gem_id, similarity
+
+    def add_usage(self, deltas, last_synced):
+        with self._lock:
+            for gem_id, delta in deltas.items():
+                slot = self._slots.get(gem_id)
+                if slot is not None:
+                    meta = self._metadatas[slot]
+                    meta["usage_count"] = meta.get("usage_count", 0) + delta
+                    meta["last_synced"] = last_synced[gem_id]
+
+    def discard(self, gem_ids):
+        with self._lock:
+            for gem_id in gem_ids:
+                slot = self._slots.pop(gem_id, None)
+                if slot is not None:
+                    self._release(slot)
+                    self._free.append(slot)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._slots), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+    def _evict(self):
+        # Caller holds self._lock; choose among the oldest entries by usage_count
+        candidates = []
+        for gem_id, slot in self._slots.items():
+            candidates.append((self._metadatas[slot].get("usage_count", 0), gem_id))
+            if len(candidates) >= self.eviction_sample:
+                break
+        _, victim = min(candidates)
+        slot = self._slots.pop(victim)
+        self._release(slot)
+        return slot
+
+    def _release(self, slot):
+        self._active[slot] = False
+        self._slot_ids[slot] = None
+        self._documents[slot] = None
+        self._metadatas[slot] = None
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+    The first caller runs the function; callers arriving while it runs wait
+    for and share its result (or exception). Nothing is cached afterwards.
+    on_join(key), if given, is called as a caller joins a call in flight.
+    """
+    def __init__(self, on_join=None):
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.on_join = on_join
+
+    def do(self, key, function):
+        """
+        Returns (result, shared), shared being True for callers that joined.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            if self.on_join is not None:
+                self.on_join(key)
+            return future.result(), True
+
+        try:
+            future.set_result(function())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result(), False
+
+
 class Vault:
-    def __init__(self, persist_path="vault_db"):
+    def __init__(self, persist_path="vault_db", embedder=None, dedup_threshold=0.97,
+                 text_index_size=TEXT_INDEX_SIZE, flush_interval=1.0, hot_tier_size=HOT_TIER_SIZE,
+                 partitioning=None):
         # Use pysqlite3-binary to ensure SQLite version compatibility
         try:
             __import__('pysqlite3')
@@ -17,58 +216,549 @@ class Vault:
             sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
         except ImportError:
             pass
+        # Imported here, after the sqlite3 swap and only when a Vault is opened
+        import chromadb
 
         self.persist_path = persist_path
+        self.embedder = embedder or HashEmbedder()
         self.client = chromadb.PersistentClient(path=self.persist_path)
+        self.max_upsert = self.client.get_max_batch_size()
+
+        # Initialize Collections: one, or one per day/week when partitioned
+        # (Uposatha then retires whole partitions instead of deleting ids)
+        self.collection_name = gems_collection(self.embedder)
+        self.migrate_legacy_gems()
+        if partitioning:
+            self.gems = PartitionedCollection(self.client, self.collection_name, partitioning)
+        else:
+            self.gems = self.client.get_or_create_collection(self.collection_name)
+
+        # Dedup-before-write: exact text hashes resolve in memory, near
+        # duplicates above dedup_threshold (cosine) resolve via one NN query.
+        # None disables the semantic stage: only identical texts resonate.
+        self.dedup_threshold = dedup_threshold
+        self.text_index_size = text_index_size
+        self._text_index = OrderedDict()  # sha256(text) -> gem id
+        self._indexed_keys = {}  # gem id -> {sha256(text)}, every text that resolves to it
+        self._index_lock = threading.Lock()
+        self._dedup_lock = threading.Lock()
+
+        # Hot tier: recent gems answered in-process before touching ChromaDB
+        self.hot = HotTier(hot_tier_size, self.embedder.dimensions)
+
+        # Resonance accumulator: usage bumps are counted in memory and merged
+        # into one batched update per flush interval by the flusher thread.
+        self.flush_interval = flush_interval
+        self._resonance = Counter()  # gem id -> pending usage delta
+        self._resonance_synced = {}  # gem id -> latest last_synced
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # One flush in flight at a time
+        self._flusher = None
+        self._closed = False
+        self._recalls = SingleFlight()
+
+    def migrate_legacy_gems(self):
+        """
+        One-time cut-over for a vault not on the hash chain: gems still in the
+        hash-chain collections are re-embedded with this vault's embedder into
+        its unpartitioned collection (same ids, documents and metadata, so
+        Uposatha still judges them), then those collections are dropped.
+        Upserts are idempotent, so an interrupted migration resumes on the
+        next open. Returns the number of gems moved.
+        """
+        if self.collection_name == GEMS_COLLECTION:
+            return 0
+        names = [c if isinstance(c, str) else c.name for c in self.client.list_collections()]
+        legacy = sorted(name for name in names if LEGACY_COLLECTION.fullmatch(name))
+        if not legacy:
+            return 0
 
-        # Initialize Collections
-        self.gems = self.client.get_or_create_collection("vocal_resonance_gems")
+        target = self.client.get_or_create_collection(self.collection_name)
+        page_size = min(MIGRATION_PAGE, self.max_upsert)
+        migrated = 0
+        for name in legacy:
+            collection = self.client.get_collection(name)
+            for offset in range(0, collection.count(), page_size):
+                page = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+                rows = [i for i, document in enumerate(page["documents"]) if document is not None]
+                if not rows:
+                    continue
+                documents = [page["documents"][i] for i in rows]
+                target.upsert(
+                    ids=[page["ids"][i] for i in rows],
+                    documents=documents,
+                    metadatas=[page["metadatas"][i] for i in rows],
+                    embeddings=self.embedder.embed(documents),
+                )
+                migrated += len(rows)
+            self.client.delete_collection(name)
+        GEMS_MIGRATED.inc(migrated)
+        logger.info(f"🔁 Migrated {migrated} Gems from {len(legacy)} hash-chain collections to {self.collection_name}")
+        return migrated
 
     def _embed_text(self, text, dimensions=384):
         """
         Build a small deterministic embedding locally.
         This avoids online model downloads in constrained environments.
         """
-        seed = hashlib.sha256(text.encode("utf-8")).digest()
-        vector = []
-        while len(vector) < dimensions:
-            vector.extend([byte / 255.0 for byte in seed])
-            seed = hashlib.sha256(seed).digest()
-        return vector[:dimensions]
+        if dimensions != self.embedder.dimensions:
+            return HashEmbedder(dimensions, cache_size=0).embed_one(text)
+        return self.embedder.embed_one(text)
 
     def store_gem(self, text, metadata):
         """
         Store a realized intent as a 'Gem'.
         """
-        gem_id = metadata.get("id", str(time.time()))
+        self.store_gems([text], [metadata])
 
-        # Add basic metadata if missing
-        metadata.setdefault("usage_count", 1)
-        metadata.setdefault("last_synced", datetime.now().isoformat())
+    def store_gems(self, texts, metadatas, embeddings=None):
+        """
+        Store many Gems with as few upsert round trips as Chroma's batch limit allows.
+        Precomputed embeddings (e.g. from SATI's shared encoder) skip re-embedding.
+        """
+        if not texts:
+            return []
 
-        self.gems.upsert(
-            documents=[text],
-            metadatas=[metadata],
-            embeddings=[self._embed_text(text)],
-            ids=[gem_id]
-        )
-        logger.info(f"💎 Stored Gem: {text[:20]}... (ID: {gem_id})")
+        started = time.perf_counter()
+        ids = []
+        now = datetime.now().isoformat()
+        for metadata in metadatas:
+            # Ids must be unique within one upsert
+            ids.append(metadata.get("id") or str(uuid.uuid4()))
+
+            # Add basic metadata if missing
+            metadata.setdefault("usage_count", 1)
+            metadata.setdefault("last_synced", now)
+
+        if embeddings is None:
+            embeddings = self.embedder.embed(texts)
+        else:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+        texts, metadatas = list(texts), list(metadatas)
+        for start in range(0, len(ids), self.max_upsert):
+            end = start + self.max_upsert
+            self.gems.upsert(
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end],
+                ids=ids[start:end]
+            )
+        for text, gem_id, metadata, embedding in zip(texts, ids, metadatas, embeddings):
+            self._index_text(text, gem_id)
+            self.hot.put(gem_id, text, metadata, embedding)
+
+        GEMS_WRITTEN.inc(len(ids))
+        WRITE_SECONDS.observe_since(started)
+        if len(ids) == 1:
+            logger.info(f"💎 Stored Gem: {texts[0][:20]}... (ID: {ids[0]})")
+        else:
+            logger.info(f"💎 Stored {len(ids)} Gems in one batch")
+        return ids
 
     def update_resonance(self, gem_id):
         """
         Increment usage count (Resonance) for a gem.
+        The increment is applied in memory and written on the next flush.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Vault is closed")
+            self._resonance[gem_id] += 1
+            self._resonance_synced[gem_id] = datetime.now().isoformat()
+            self._ensure_flusher()
+        logger.debug(f"✨ Resonance amplified for Gem {gem_id}")
+        return True
+
+    def get_usage_count(self, gem_id):
+        """
+        Stored usage count plus any increments still waiting to be flushed.
+        Returns None if the gem does not exist.
+        """
+        # Held by every flush, so a delta is never counted both pending and stored, or neither
+        with self._flush_lock:
+            with self._cond:
+                pending = self._resonance.get(gem_id, 0)
+            gem = self.get_gem(gem_id)
+        if gem is None:
+            return None
+        return gem["metadata"].get("usage_count", 0) + pending
+
+    def get_gem(self, gem_id):
+        """
+        Fetch a gem's document and stored metadata, hot tier first.
+        """
+        cached = self.hot.get(gem_id)
+        if cached is not None:
+            document, metadata = cached
+            return {"id": gem_id, "document": document, "metadata": metadata}
+
+        existing = self.gems.get(ids=[gem_id], include=["documents", "metadatas", "embeddings"])
+        if not existing["ids"]:
+            return None
+        document = existing["documents"][0]
+        metadata = existing["metadatas"][0]
+        self.hot.put(gem_id, document, metadata, existing["embeddings"][0])
+        return {"id": gem_id, "document": document, "metadata": metadata}
+
+    def hot_stats(self):
+        return self.hot.stats()
+
+    def warm(self, limit=None):
+        """
+        Load the persisted index and fill the hot tier (and text index) with
+        the most recently written gems, so the first lookups after startup
+        are answered in memory. Returns the number of gems loaded.
+        """
+        limit = self.hot.capacity if limit is None else limit
+        total = self.gems.count()
+        if not total or limit <= 0:
+            return 0
+
+        page = self.gems.get(
+            limit=limit,
+            offset=max(0, total - limit),
+            include=["documents", "metadatas", "embeddings"],
+        )
+        loaded = 0
+        for gem_id, document, metadata, embedding in zip(
+            page["ids"], page["documents"], page["metadatas"], page["embeddings"]
+        ):
+            if document is None or len(embedding) != self.embedder.dimensions:
+                continue
+            self._index_text(document, gem_id)
+            self.hot.put(gem_id, document, metadata or {}, embedding)
+            loaded += 1
+
+        # One nearest-neighbour query pulls the HNSW segment into memory
+        if len(page["embeddings"]):
+            self.gems.query(query_embeddings=[page["embeddings"][-1]], n_results=1, include=[])
+        logger.info(f"🔥 Vault warmed: {loaded} of {total} Gems held in the hot tier")
+        return loaded
+
+    def flush_resonance(self):
+        """
+        Merge all pending increments into one batched get + update.
         """
+        with self._cond:
+            deltas, self._resonance = self._resonance, Counter()
+            synced, self._resonance_synced = self._resonance_synced, {}
+        if not deltas:
+            return 0
+
+        started = time.perf_counter()
+        ids = list(deltas)
         try:
-            existing = self.gems.get(ids=[gem_id], include=["metadatas"])
-            if existing and existing['metadatas']:
-                meta = existing['metadatas'][0]
-                meta['usage_count'] = meta.get('usage_count', 0) + 1
-                meta['last_synced'] = datetime.now().isoformat()
-
-                self.gems.update(
-                    ids=[gem_id],
-                    metadatas=[meta]
-                )
-                logger.debug(f"✨ Resonance amplified for Gem {gem_id}")
+            existing = self.gems.get(ids=ids, include=["metadatas"])
+            found = existing["ids"]
+            metadatas = existing["metadatas"]
+            for gem_id, meta in zip(found, metadatas):
+                meta["usage_count"] = meta.get("usage_count", 0) + deltas[gem_id]
+                meta["last_synced"] = synced[gem_id]
+            if found:
+                self.gems.update(ids=found, metadatas=metadatas)
+                self.hot.add_usage({gem_id: deltas[gem_id] for gem_id in found}, synced)
         except Exception as e:
             logger.error(f"Failed to update resonance: {e}")
+            with self._cond:
+                self._resonance.update(deltas)
+                for gem_id, last_synced in synced.items():
+                    self._resonance_synced.setdefault(gem_id, last_synced)
+            raise
+
+        missing = set(ids).difference(found)
+        if missing:
+            # Released by Uposatha since it was indexed
+            self.forget(missing)
+        RESONANCE_FLUSH_SECONDS.observe_since(started)
+        logger.debug(f"✨ Resonance flushed for {len(found)} Gems")
+        return len(found)
+
+    def flush(self):
+        """
+        Write everything pending. Safe to call from any thread.
+        """
+        with self._flush_lock, profile("vault.flush"):
+            return self.flush_resonance()
+
+    def close(self, timeout=None):
+        """
+        Stop the flusher and durably write whatever is still pending.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join(timeout)
+        self.flush()
+        if self.partitioned:
+            self.gems.close()
+
+    @property
+    def partitioned(self):
+        return isinstance(self.gems, PartitionedCollection)
+
+    def _has_pending(self):
+        # Caller holds self._cond
+        return bool(self._resonance)
+
+    def _batch_full(self):
+        # Caller holds self._cond
+        return False
+
+    def _ensure_flusher(self):
+        # Caller holds self._cond
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run_flusher, name="VaultFlusher", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            with self._cond:
+                if not self._has_pending() and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Let the window fill unless the batch is already full
+                if not self._batch_full():
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                with self._cond:
+                    self._cond.wait(self.flush_interval)
+
+    def find_resonant(self, text, embedding=None):
+        """
+        Return the id of an existing gem this text resonates with, or None.
+        Exact repeats are answered from the in-memory hash index; otherwise the
+        nearest neighbour is accepted if it is the same text or its cosine
+        similarity clears dedup_threshold.
+        """
+        key = self._text_key(text)
+        with self._index_lock:
+            gem_id = self._text_index.get(key)
+            if gem_id is not None:
+                self._text_index.move_to_end(key)
+                DEDUP_TEXT.inc()
+                return gem_id
+
+        if embedding is None:
+            embedding = self.embedder.embed_one(text)
+
+        # Without a threshold the hot tier has nothing to add; identical texts are matched below
+        hot_match = self.hot.nearest(embedding, self.dedup_threshold) if self.dedup_threshold is not None else None
+        if hot_match is not None:
+            gem_id, _ = hot_match
+            self._index_text(text, gem_id)
+            DEDUP_HOT.inc()
+            return gem_id
+
+        result = self.gems.query(
+            query_embeddings=[embedding],
+            n_results=1,
+            include=["embeddings", "documents", "metadatas"],
+        )
+        if not result["ids"] or not result["ids"][0]:
+            DEDUP_MISS.inc()
+            return None
+
+        gem_id = result["ids"][0][0]
+        document = result["documents"][0][0]
+        neighbour = np.asarray(result["embeddings"][0][0], dtype=np.float32)
+        if document != text and (self.dedup_threshold is None or _cosine(embedding, neighbour) < self.dedup_threshold):
+            DEDUP_MISS.inc()
+            return None
+
+        self._index_text(text, gem_id)
+        self.hot.put(gem_id, document, result["metadatas"][0][0], neighbour)
+        DEDUP_CHROMA.inc()
+        return gem_id
+
+    def resonate_or_store(self, text, metadata, embedding=None):
+        """
+        Resonate the matching gem if one exists, otherwise store a new one.
+        Returns (gem_id, resonated).
+        """
+        with self._dedup_lock:
+            if embedding is None:
+                embedding = self.embedder.embed_one(text)
+            gem_id = self.find_resonant(text, embedding)
+            if gem_id is not None:
+                self.update_resonance(gem_id)
+                return gem_id, True
+
+            [gem_id] = self.store_gems([text], [metadata], embeddings=[embedding])
+            return gem_id, False
+
+    def recall(self, queries, k=5, tone=None, ritual_tag=None, min_usage=None, rerank=False,
+               resonance_weight=0.2):
+        """
+        Top-k stored gems for one query text or a list of them.
+        Queries are embedded as one batch (through the embedder's cache) and
+        searched in one Chroma query, filtered on emotional_tone, ritual_tag
+        and a minimum usage_count. Candidates are scored by cosine similarity
+        in NumPy; with rerank, RERANK_OVERSAMPLE * k candidates per query are
+        ranked by (1 - resonance_weight) * cosine + resonance_weight * resonance,
+        resonance being log usage scaled to the best candidate.
+        Returns a list of hits ({"id", "document", "metadata", "similarity",
+        "score"}), or one such list per query when given a list. Identical
+        concurrent calls share one lookup. Commits still waiting for the
+        write-behind flush are not visible yet.
+        """
+        single = isinstance(queries, str)
+        texts = [queries] if single else list(queries)
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        if not texts:
+            return []
+
+        key = (tuple(texts), k, tone, ritual_tag, min_usage, rerank, resonance_weight)
+        results, shared = self._recalls.do(
+            key, lambda: self._recall(texts, k, tone, ritual_tag, min_usage, rerank, resonance_weight)
+        )
+        if shared:
+            RECALL_SHARED.inc()
+        return results[0] if single else results
+
+    def _recall(self, texts, k, tone, ritual_tag, min_usage, rerank, resonance_weight):
+        started = time.perf_counter()
+        with profile("vault.recall"):
+            embeddings = self.embedder.embed(texts)
+            result = self.gems.query(
+                query_embeddings=embeddings,
+                n_results=k * RERANK_OVERSAMPLE if rerank else k,
+                where=self._recall_filter(tone, ritual_tag, min_usage),
+                include=["documents", "metadatas", "embeddings"],
+            )
+            hits = self._score(embeddings, result, k, resonance_weight if rerank else 0.0)
+        RECALL_SECONDS.observe_since(started)
+        return hits
+
+    @staticmethod
+    def _recall_filter(tone, ritual_tag, min_usage):
+        conditions = []
+        if tone is not None:
+            conditions.append({"emotional_tone": tone})
+        if ritual_tag is not None:
+            conditions.append({"ritual_tag": ritual_tag})
+        if min_usage is not None:
+            conditions.append({"usage_count": {"$gte": min_usage}})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    def _score(self, queries, result, k, resonance_weight):
+        """
+        Score every (query, candidate) pair with one vectorized pass: candidate
+        rows are stacked, each paired with its query row, and the cosine is a
+        row-wise dot product of normalized vectors.
+        """
+        counts = [len(ids) for ids in result["ids"]]
+        if not sum(counts):
+            return [[] for _ in counts]
+
+        candidates = np.asarray(
+            [embedding for embeddings in result["embeddings"] for embedding in embeddings], dtype=np.float32
+        )
+        candidates /= np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        similarity = np.einsum("nd,nd->n", candidates, np.repeat(queries, counts, axis=0))
+
+        ids = [gem_id for row in result["ids"] for gem_id in row]
+        metadatas = [metadata or {} for row in result["metadatas"] for metadata in row]
+        documents = [document for row in result["documents"] for document in row]
+        if resonance_weight:
+            # Pending resonance counts too, so a just-repeated intent ranks as it will after the flush
+            with self._cond:
+                pending = dict(self._resonance)
+            usage = np.log1p(np.asarray(
+                [metadata.get("usage_count", 0) + pending.get(gem_id, 0) for gem_id, metadata in zip(ids, metadatas)],
+                dtype=np.float32,
+            ))
+
+        hits = []
+        start = 0
+        for count in counts:
+            end = start + count
+            scores = similarity[start:end]
+            if resonance_weight and count:
+                peak = usage[start:end].max()
+                resonance = usage[start:end] / peak if peak > 0 else np.zeros(count, dtype=np.float32)
+                scores = (1.0 - resonance_weight) * scores + resonance_weight * resonance
+            order = np.argsort(-scores, kind="stable")[:k]
+            hits.append([
+                {
+                    "id": ids[start + i],
+                    "document": documents[start + i],
+                    "metadata": metadatas[start + i],
+                    "similarity": round(float(similarity[start + i]), 6),
+                    "score": round(float(scores[i]), 6),
+                }
+                for i in order
+            ])
+            start = end
+        return hits
+
+    def forget(self, gem_ids):
+        """
+        Drop gems from the in-memory index and hot tier (e.g. after they were deleted).
+        """
+        self.hot.discard(gem_ids)
+        with self._index_lock:
+            for gem_id in gem_ids:
+                for key in self._indexed_keys.pop(gem_id, ()):
+                    if self._text_index.get(key) == gem_id:
+                        del self._text_index[key]
+
+    @staticmethod
+    def _text_key(text):
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _index_text(self, text, gem_id):
+        key = self._text_key(text)
+        with self._index_lock:
+            self._index_key(key, gem_id)
+
+    def _claim_text(self, text, gem_id):
+        """
+        Index text for a new gem unless another gem already holds it.
+        Returns the id the text resolves to: gem_id, or the earlier gem's.
+        """
+        key = self._text_key(text)
+        with self._index_lock:
+            winner = self._text_index.get(key)
+            if winner is not None:
+                self._text_index.move_to_end(key)
+                return winner
+            self._index_key(key, gem_id)
+        return gem_id
+
+    def _index_key(self, key, gem_id):
+        # Caller holds self._index_lock
+        previous_id = self._text_index.get(key)
+        if previous_id is not None and previous_id != gem_id:
+            self._unindex_key(key, previous_id)
+        self._text_index[key] = gem_id
+        self._text_index.move_to_end(key)
+        self._indexed_keys.setdefault(gem_id, set()).add(key)
+        while len(self._text_index) > self.text_index_size:
+            evicted_key, evicted_id = self._text_index.popitem(last=False)
+            self._unindex_key(evicted_key, evicted_id)
+
+    def _unindex_key(self, key, gem_id):
+        # Caller holds self._index_lock
+        keys = self._indexed_keys.get(gem_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._indexed_keys[gem_id]
+
+
+def _cosine(a, b):
+    denominator = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if denominator == 0.0:
+        return 0.0
+    return float(np.dot(a, b)) / denominator
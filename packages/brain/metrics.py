@@ -0,0 +1,400 @@
+"""
+FILE: metrics.py
+CONTEXT: AG-SC-ADK / Brain / Observability
+DESCRIPTION: In-process metrics registry rendered in Prometheus text format.
+
+Counters and histograms are module-level in the code they measure and cost a
+lock plus an integer add per observation; histogram buckets are fixed at
+creation, so observing never allocates. Gauges can be backed by a function
+that is only evaluated on scrape (queue depths, subscriber counts).
+SlowRequestProfiler is an opt-in sampling profiler for spans that run long.
+"""
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as StackCounter, deque
+
+logger = logging.getLogger("PRGX.Metrics")
+
+# Seconds; tuned for in-process work from ~50us to several seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    A named metric, optionally split by label values.
+    labels(*values) returns the child for one label combination; children
+    are created once and cached, so hold on to them on hot paths.
+    """
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        # Unlabelled metrics have a single child under the empty key
+        for values, child in list(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, values):
+        yield f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ("function",)
+
+    def __init__(self, function=None):
+        super().__init__()
+        self.function = function
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def get(self):
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception as e:
+                logger.debug(f"Gauge callback failed: {e}")
+                return float("nan")
+        return self.value
+
+    def render(self, name, labelnames, values):
+        yield f"{name}{_format_labels(labelnames, values)} {_format_value(self.get())}"
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def observe_since(self, started):
+        """
+        Observe the time elapsed since a time.perf_counter() reading.
+        """
+        self.observe(time.perf_counter() - started)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def render(self, name, labelnames, values):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="' + _format_value(float(bound)) + '"'
+            yield f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}"
+        yield f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total)}"
+        yield f"{name}_count{_format_labels(labelnames, values)} {cumulative}"
+
+
+class CounterMetric(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+
+class GaugeMetric(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value):
+        self._children[()].set(value)
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount=1):
+        self._children[()].dec(amount)
+
+    def set_function(self, function, *values):
+        """
+        Compute this gauge (or one labelled child) on scrape instead of on update.
+        """
+        self.labels(*values).function = function
+
+
+class HistogramMetric(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def observe_since(self, started):
+        self._children[()].observe_since(started)
+
+
+class MetricsRegistry:
+    """
+    Holds every metric by name. Asking for an existing name returns the same
+    metric, so modules can declare their metrics at import time.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(CounterMetric, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(GaugeMetric, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(HistogramMetric, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """
+        The whole registry in Prometheus text exposition format (0.0.4).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler for slow spans.
+    span(name) marks work on the current thread; a sampler thread captures
+    that thread's stack every sample_interval once the span has run longer
+    than threshold. Finished slow spans keep their most frequent stacks in
+    reports and are logged.
+    """
+    def __init__(self, threshold=0.25, sample_interval=0.005, max_reports=20, top_stacks=5):
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.top_stacks = top_stacks
+        self.reports = deque(maxlen=max_reports)
+        self._active = {}  # span token -> [name, thread id, started, stack counts]
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="SlowRequestProfiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def span(self, name):
+        return _ProfiledSpan(self, name)
+
+    def _enter(self, name):
+        token = object()
+        with self._lock:
+            self._active[token] = [name, threading.get_ident(), time.perf_counter(), StackCounter()]
+        return token
+
+    def _exit(self, token):
+        with self._lock:
+            name, _, started, stacks = self._active.pop(token)
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+        report = {
+            "name": name,
+            "duration_ms": round(duration * 1000.0, 2),
+            "samples": sum(stacks.values()),
+            "stacks": [{"count": count, "stack": stack} for stack, count in stacks.most_common(self.top_stacks)],
+        }
+        self.reports.append(report)
+        slow_requests.labels(name).inc()
+        top = report["stacks"][0]["stack"].splitlines()[-1].strip() if report["stacks"] else "no samples"
+        logger.warning(f"🐢 Slow {name}: {report['duration_ms']} ms, hottest frame: {top}")
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval):
+            now = time.perf_counter()
+            with self._lock:
+                due = [entry for entry in self._active.values() if now - entry[2] >= self.threshold]
+            if not due:
+                continue
+            frames = sys._current_frames()
+            for entry in due:
+                frame = frames.get(entry[1])
+                if frame is not None:
+                    entry[3]["".join(traceback.format_stack(frame, limit=12))] += 1
+
+
+class _ProfiledSpan:
+    __slots__ = ("profiler", "name", "token")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.token = None
+
+    def __enter__(self):
+        self.token = self.profiler._enter(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._exit(self.token)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+NULL_SPAN = _NullSpan()
+profiler = None  # Set by enable_profiler()
+
+
+def enable_profiler(threshold=0.25, sample_interval=0.005):
+    global profiler
+    if profiler is None:
+        profiler = SlowRequestProfiler(threshold, sample_interval).start()
+    return profiler
+
+
+def disable_profiler():
+    global profiler
+    if profiler is not None:
+        profiler.stop()
+        profiler = None
+
+
+def profile(name):
+    """
+    Span for the slow-request profiler, or a shared no-op when it is disabled.
+    """
+    if profiler is None:
+        return NULL_SPAN
+    return profiler.span(name)
+
+
+async def loop_lag_monitor(interval=0.5):
+    """
+    Measure how late the event loop wakes from a sleep; the overshoot is time
+    the loop spent blocked by other callbacks.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        loop_lag.observe(lag)
+        loop_lag_last.set(lag)
+
+
+# Global instance
+registry = MetricsRegistry()
+
+loop_lag = registry.histogram("brain_event_loop_lag_seconds", "Event loop wake-up delay beyond the scheduled sleep")
+loop_lag_last = registry.gauge("brain_event_loop_lag_last_seconds", "Most recent event loop lag measurement")
+slow_requests = registry.counter("brain_slow_requests_total", "Spans that exceeded the profiler threshold", ["span"])
@@ -0,0 +1,228 @@
+"""
+FILE: pipeline.py
+CONTEXT: AG-SC-ADK / Brain / Gateway
+DESCRIPTION: Staged, off-loop processing of one connection's voice input.
+
+intake -> transmute (executor, batched) -> commit (worker thread) -> publish
+Each stage is a single task reading a bounded queue, so results leave in the
+order they arrived while the stages of consecutive messages overlap.
+Intake holds the first message of a batch for up to batch_window seconds so
+bursts are transmuted, committed and published as groups.
+"""
+import asyncio
+import logging
+import time
+
+from metrics import SIZE_BUCKETS, profile, registry
+
+logger = logging.getLogger("AetherBus.Pipeline")
+
+QUEUES = ("intake", "commit", "publish")
+
+MESSAGE_SECONDS = registry.histogram("pipeline_message_seconds", "voice_data intake to ui:shader_intent publish")
+BATCH_SIZE = registry.histogram("pipeline_transmute_batch_size", "Messages transmuted per executor call", buckets=SIZE_BUCKETS)
+BLOCKED = registry.counter("pipeline_blocked_total", "Messages blocked by the PRGX1 sentry")
+
+
+class VoicePipeline:
+    def __init__(self, bus, sati, prgx, vault, executor=None, intake_size=64, batch_size=16, state=None,
+                 batch_window=0.002, budget=None):
+        self.bus = bus
+        self.sati = sati
+        self.state = state  # This connection's SatiState
+        self.prgx = prgx
+        self.vault = vault
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.budget = budget  # Admission slots held by submitted messages, released when they leave
+        self._admitted = 0
+
+        self.queues = {name: asyncio.Queue(maxsize=intake_size) for name in QUEUES}
+        self.in_flight = {"transmute": 0, "commit": 0}
+        self.processed = 0
+        self.blocked = 0
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._transmute_stage()),
+            asyncio.create_task(self._commit_stage()),
+            asyncio.create_task(self._publish_stage()),
+        ]
+        return self
+
+    async def submit(self, text):
+        """
+        Hand a voice_data text to the pipeline. Waits only when this
+        connection's intake is full, which backpressures its own socket.
+        """
+        self._admitted += 1
+        await self.queues["intake"].put((text, time.perf_counter()))
+
+    async def submit_many(self, texts):
+        """
+        Hand several texts (e.g. one JSON-RPC batch) to the pipeline in order.
+        """
+        received = time.perf_counter()
+        intake = self.queues["intake"]
+        # Owned from here on, so close() frees slots of texts never queued
+        self._admitted += len(texts)
+        for text in texts:
+            await intake.put((text, received))
+
+    def depths(self):
+        """
+        Messages waiting in or being worked on by each stage.
+        """
+        return {
+            "intake": self.queues["intake"].qsize(),
+            "transmute": self.in_flight["transmute"],
+            "commit": self.queues["commit"].qsize() + self.in_flight["commit"],
+            "publish": self.queues["publish"].qsize(),
+        }
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._release(self._admitted)
+
+    def _release(self, count):
+        if count <= 0:
+            return
+        self._admitted -= count
+        if self.budget is not None:
+            self.budget.release(count)
+
+    async def _transmute_stage(self):
+        loop = asyncio.get_running_loop()
+        intake = self.queues["intake"]
+        while True:
+            batch = await self._collect(intake)
+
+            self.in_flight["transmute"] = len(batch)
+            BATCH_SIZE.observe(len(batch))
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self._transmute_batch, [text for text, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Transmute stage failed for {len(batch)} messages: {e}")
+                results = []
+                self._release(len(batch))
+            finally:
+                self.in_flight["transmute"] = 0
+
+            for result, (_, received) in zip(results, batch):
+                if result is None:
+                    self.blocked += 1
+                    BLOCKED.inc()
+                    self._release(1)
+                else:
+                    await self.queues["commit"].put(result + (received,))
+
+    async def _collect(self, queue):
+        """
+        Wait for one item, then keep taking items until batch_size or until
+        batch_window has passed since the first one arrived.
+        """
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _transmute_batch(self, texts):
+        """
+        CPU-bound stages for a block of messages, run on the executor.
+        Returns (text, physics_params, embedding) per message, or None if PRGX1 blocked it.
+        """
+        with profile("pipeline.transmute"):
+            return self._transmute_texts(texts)
+
+    def _transmute_texts(self, texts):
+        # Embed the whole block once; the vault reuses these vectors
+        states = [self.state] * len(texts)
+        vectors = self.sati.encode_intents(texts, states)
+
+        results = []
+        admitted = []  # (position, current_vibe, intent_vector)
+        for text, vector in zip(texts, vectors):
+            # 1. SATI Observation
+            # Mock Vibe Score extraction (In real system, this comes from Audio Model)
+            vibe_score = 0.8 # Mock Positive
+            tone = "WAKING"
+            current_vibe = self.sati.observe(text, vibe_score, tone, state=self.state)
+            intent_vector = vector.tolist()
+
+            # 2. PRGX1 Sentry Check
+            valid, reason = self.prgx.sentry.inspect({"intent_vector": intent_vector, "vibe_score": vibe_score})
+            if not valid:
+                print(f"PRGX1 Blocked: {reason}")
+                # Trigger Diplomat?
+                results.append(None)
+                continue
+
+            admitted.append((len(results), current_vibe, intent_vector))
+            results.append(None)
+
+        # 3. PRGX2 Alchemist Transmutation (RSI Loop), one call for the block
+        if admitted:
+            payloads = self.prgx.alchemist.transmute_many(
+                [vibe for _, vibe, _ in admitted], [intent_vector for _, _, intent_vector in admitted]
+            )
+            for (position, _, _), physics_params in zip(admitted, payloads):
+                results[position] = (texts[position], physics_params, vectors[position])
+        return results
+
+    async def _commit_stage(self):
+        commits = self.queues["commit"]
+        while True:
+            batch = [await commits.get()]
+            while len(batch) < self.batch_size and not commits.empty():
+                batch.append(commits.get_nowait())
+
+            # 4. Akashic Record Commit (dedup lookup off-loop, write-behind store)
+            self.in_flight["commit"] = len(batch)
+            try:
+                await asyncio.to_thread(self._commit_batch, batch)
+            except Exception as e:
+                logger.error(f"Commit stage failed for {len(batch)} messages: {e}")
+            finally:
+                self.in_flight["commit"] = 0
+
+            for _, physics_params, _, received in batch:
+                await self.queues["publish"].put((physics_params, received))
+
+    def _commit_batch(self, batch):
+        with profile("pipeline.commit"):
+            # One group per batch: new gems share a write-behind flush and upsert
+            self.vault.commit_changes(
+                [(physics_params, text, embedding) for text, physics_params, embedding, _ in batch]
+            )
+
+    async def _publish_stage(self):
+        publishes = self.queues["publish"]
+        while True:
+            batch = [await publishes.get()]
+            while len(batch) < self.batch_size and not publishes.empty():
+                batch.append(publishes.get_nowait())
+            # 5. GenUI Manifestation (Publish), one bus call per batch
+            await self.bus.publish_many(
+                "ui:shader_intent", [physics_params for physics_params, _ in batch], {"source": "brain"}
+            )
+            self.processed += len(batch)
+            self._release(len(batch))
+            for _, received in batch:
+                MESSAGE_SECONDS.observe_since(received)
@@ -5,15 +5,35 @@ DESCRIPTION: The ritual of initialization.
 """
 import logging
 import asyncio
+import time
 
 logger = logging.getLogger("PRGX.Startup")
 
-async def perform_startup_ritual():
+# Utterances encoded once at startup so the encoder's code paths and cache are warm
+WARMUP_TEXTS = (
+    "awaken the light",
+    "show me the waking light",
+    "calm the waves",
+    "focus",
+    "delete sector 7",
+    "confirm",
+)
+
+async def perform_startup_ritual(vault=None, embedder=None):
     logger.info("🌅 Initiating Startup Ritual...")
+    started = time.perf_counter()
 
-    # 1. Initialize Neural Cache (Mock)
+    # 1. Warm the Neural Cache: index load and encoder prefill run side by side
     logger.info("🧠 Warming up Neural Cache...")
-    await asyncio.sleep(0.5)
+    warmups = []
+    if vault is not None:
+        warmups.append(asyncio.to_thread(vault.warm))
+    if embedder is not None:
+        warmups.append(asyncio.to_thread(embedder.embed, list(WARMUP_TEXTS)))
+    for result in await asyncio.gather(*warmups, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.critical(f"Neural Cache failed to warm: {result}")
+            return False
 
     # 2. Check Parajika Fail-Guard (System Integrity)
     logger.info("🛡️ Checking Parajika Fail-Guard...")
@@ -22,5 +42,5 @@ async def perform_startup_ritual():
         logger.critical("SYSTEM COMPROMISED. HALT.")
         return False
 
-    logger.info("✨ Startup Ritual Complete. System is AWAKE.")
+    logger.info(f"✨ Startup Ritual Complete in {time.perf_counter() - started:.3f}s. System is AWAKE.")
     return True
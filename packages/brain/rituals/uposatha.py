@@ -16,72 +16,300 @@ DESCRIPTION: The mechanism of selective forgetting to maintain cognitive hygiene
 # -------------------------------------------------------------------------
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
-import chromadb
+from memory.vault import GEMS_COLLECTION
+from metrics import registry
 
 # Initialize Logger with a solemn tone
 logger = logging.getLogger("PRGX.Uposatha")
 
+RUN_SECONDS = registry.histogram("uposatha_run_seconds", "Duration of one cleanse_entropy call")
+RUNS = registry.counter("uposatha_runs_total", "cleanse_entropy calls by resulting status", ["status"])
+SCANNED = registry.counter("uposatha_scanned_total", "Gems judged by the ritual")
+DELETED = registry.counter("uposatha_deleted_total", "Phantom gems released by the ritual")
+PROMOTED = registry.counter("uposatha_promoted_total", "Gems moved to the noble partition before their partition was dropped")
+PARTITIONS_DROPPED = registry.counter("uposatha_partitions_dropped_total", "Expired vault partitions dropped whole")
+
 
 class UposathaCleaner:
-    def __init__(self, vault_client: chromadb.PersistentClient):
-        self.collection = vault_client.get_collection("vocal_resonance_gems")
+    def __init__(self, vault_client: "chromadb.PersistentClient", vault=None, page_size=500,
+                 pause_seconds=0.01):
+        # A partitioned vault is retired partition by partition (see _cleanse_partitions)
+        self.partitioned = vault is not None and vault.partitioned
+        self.collection = vault.gems if vault is not None else vault_client.get_collection(GEMS_COLLECTION)
         self.retention_days = 15
         self.min_usage_threshold = 3
+        # Optional owning Vault: pending resonance is flushed before judgment
+        # so gems bumped in memory are not released as phantoms.
+        self.vault = vault
+
+        # Streaming: gems are judged one page at a time and released in
+        # chunks, yielding the SQLite writer between chunks.
+        self.page_size = page_size
+        self.pause_seconds = pause_seconds
+        self.progress = None  # Resumable state of an unfinished pass
 
-    def cleanse_entropy(self) -> dict:
+    def cleanse_entropy(self, budget_seconds=None, max_deletes=None) -> dict:
         """
         Performs the ritual of purification.
         Removes 'Phantom Memories' that have not resonated with the user's intent.
+        When a time or delete budget runs out the pass is paused and the next
+        call resumes where it stopped (status "partial").
         """
         logger.info("🕯️ Initiating Uposatha Ritual: Scanning for decaying echoes...")
+        started = time.perf_counter()
+        result = self._cleanse(budget_seconds, max_deletes)
+        RUN_SECONDS.observe_since(started)
+        RUNS.labels(result["status"]).inc()
+        return result
+
+    def _cleanse(self, budget_seconds, max_deletes):
+        if self.vault is not None:
+            self.vault.flush()
+        if not self.partitioned:
+            return self._cleanse_gems([self.collection], budget_seconds, max_deletes)
 
-        if self.collection.count() == 0:
+        started = time.monotonic()
+        retired = self._cleanse_partitions(budget_seconds)
+        if retired["status"] == "partial":
+            return retired
+
+        # Gems outside time partitions (noble, pre-partitioning) are judged one by one
+        if budget_seconds is not None:
+            budget_seconds = max(0.0, budget_seconds - (time.monotonic() - started))
+        kept = [self.collection.collection(p.name) for p in self.collection.partitions() if p.end is None]
+        judged = self._cleanse_gems(kept, budget_seconds, max_deletes)
+
+        if judged["status"] == "partial":
+            status = "partial"
+        elif "purified" in (retired["status"], judged["status"]):
+            status = "purified"
+        else:
+            status = "stable"
+        result = {
+            "status": status,
+            "deleted_count": retired["deleted_count"] + judged["deleted_count"],
+            "promoted_count": retired.get("promoted_count", 0),
+            "dropped_partitions": retired.get("dropped_partitions", 0),
+        }
+        if "progress" in judged:
+            result["progress"] = judged["progress"]
+        return result
+
+    def _cleanse_gems(self, collections, budget_seconds, max_deletes):
+        """
+        The per-gem ritual: page through the collections in order and release
+        faint gems not synced within the retention window.
+        """
+        if self.progress is None and sum(collection.count() for collection in collections) == 0:
             logger.info("The Vault is empty. No burdens to release.")
             return {"status": "clean", "deleted_count": 0}
 
+        if self.progress is None:
+            now = datetime.now()
+            self.progress = {
+                "started": now.isoformat(),
+                "threshold_date": (now - timedelta(days=self.retention_days)).isoformat(),
+                "collection": 0,
+                "offset": 0,
+                "scanned": 0,
+                "deleted": 0,
+            }
+        progress = self.progress
+
+        started = time.monotonic()
+        run_deleted = 0
+        while True:
+            if progress["collection"] >= len(collections):
+                self.progress = None
+                break
+            if budget_seconds is not None and time.monotonic() - started >= budget_seconds:
+                break
+            if max_deletes is not None and run_deleted >= max_deletes:
+                break
+
+            # 1. Fetch one page of gems below the resonance threshold
+            # (usage_count is filtered server-side, last_synced per page)
+            collection = collections[progress["collection"]]
+            page = collection.get(
+                where={"usage_count": {"$lt": self.min_usage_threshold}},
+                limit=self.page_size,
+                offset=progress["offset"],
+                include=["metadatas"],
+            )
+            ids = page["ids"]
+            if not ids:
+                progress["collection"] += 1
+                progress["offset"] = 0
+                continue
+
+            released = self._judge(ids, page["metadatas"], progress["threshold_date"])
+            judged = len(ids)
+            if max_deletes is not None and len(released) > max_deletes - run_deleted:
+                # Stop the page right after the last gem this run may release
+                released = released[:max_deletes - run_deleted]
+                judged = released[-1] + 1 if released else 0
+            ids_to_release = [ids[i] for i in released]
+            progress["scanned"] += judged
+            SCANNED.inc(judged)
+            # Survivors stay in place, so the cursor only advances past them
+            progress["offset"] += judged - len(ids_to_release)
+
+            # 2. The Act of Release (Letting Go), one chunk per page
+            if ids_to_release:
+                collection.delete(ids=ids_to_release)
+                if self.vault is not None:
+                    self.vault.forget(ids_to_release)
+                progress["deleted"] += len(ids_to_release)
+                run_deleted += len(ids_to_release)
+                DELETED.inc(len(ids_to_release))
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+
+            if judged == len(ids) and len(ids) < self.page_size:
+                progress["collection"] += 1
+                progress["offset"] = 0
+
+        if self.progress is not None:
+            logger.info(
+                f"⏳ Uposatha Paused: Released {run_deleted} echoes, "
+                f"{progress['scanned']} judged so far. Resuming next vigil."
+            )
+            return {"status": "partial", "deleted_count": run_deleted, "progress": dict(progress)}
+
+        if progress["deleted"]:
+            logger.info(
+                f"✨ Uposatha Complete: Released {progress['deleted']} phantom echoes back to the void."
+            )
+            return {"status": "purified", "deleted_count": run_deleted}
+        logger.info("✨ Uposatha Complete: All memories are vibrant and necessary.")
+        return {"status": "stable", "deleted_count": 0}
+
+    def _cleanse_partitions(self, budget_seconds):
+        """
+        Retire every time partition that ended before the retention window.
+        Resonant gems (usage_count at or above min_usage_threshold) are
+        promoted to the noble partition first; then the whole partition is
+        dropped at once, so the cost does not grow with the size of the rest
+        of the Record.
+        """
         now = datetime.now()
-        threshold_date = (now - timedelta(days=self.retention_days)).isoformat()
-
-        # 1. Fetch only gems that meet the criteria for release
-        # Optimized: Server-side filtering replaces full collection scan
-        decaying_gems = self.collection.get(
-            where={
-                "$and": [
-                    {"last_synced": {"$lt": threshold_date}},
-                    {"usage_count": {"$lt": self.min_usage_threshold}},
-                ]
-            },
-            include=["metadatas"],
+        threshold = now - timedelta(days=self.retention_days)
+        expired = self.collection.expired(threshold)
+        if not expired:
+            logger.info("✨ Uposatha Complete: No partition has outlived its season.")
+            return {"status": "stable", "deleted_count": 0}
+
+        started = time.monotonic()
+        released = promoted = dropped = 0
+        for partition in expired:
+            if budget_seconds is not None and dropped and time.monotonic() - started >= budget_seconds:
+                break
+            kept, let_go = self._retire(partition.name)
+            promoted += kept
+            released += let_go
+            dropped += 1
+
+        PARTITIONS_DROPPED.inc(dropped)
+        PROMOTED.inc(promoted)
+        DELETED.inc(released)
+        result = {"deleted_count": released, "promoted_count": promoted, "dropped_partitions": dropped}
+        if dropped < len(expired):
+            logger.info(f"⏳ Uposatha Paused: {dropped} of {len(expired)} expired partitions retired. Resuming next vigil.")
+            return {"status": "partial", **result}
+        logger.info(
+            f"✨ Uposatha Complete: {dropped} partitions returned to the void, "
+            f"{released} echoes released, {promoted} noble gems kept."
         )
+        return {"status": "purified", **result}
+
+    def _retire(self, name):
+        """
+        Promote a partition's resonant gems to the noble partition one page at
+        a time, then drop it. Returns (promoted, released).
+        """
+        partition = self.collection.collection(name)
+        total = partition.count()
+        SCANNED.inc(total)
+
+        promoted = set()
+        noble = None
+        while True:
+            # Promoted gems stay in the partition until the drop, so the offset is stable
+            page = partition.get(
+                where={"usage_count": {"$gte": self.min_usage_threshold}},
+                limit=self.page_size,
+                offset=len(promoted),
+                include=["documents", "metadatas", "embeddings"],
+            )
+            if not page["ids"]:
+                break
+            if noble is None:
+                noble = self.collection.noble()
+            noble.upsert(
+                ids=page["ids"],
+                documents=page["documents"],
+                metadatas=page["metadatas"],
+                embeddings=page["embeddings"],
+            )
+            promoted.update(page["ids"])
+            if len(page["ids"]) < self.page_size:
+                break
+
+        released = []
+        if self.vault is not None and total > len(promoted):
+            for offset in range(0, total, self.page_size):
+                ids = partition.get(limit=self.page_size, offset=offset, include=[])["ids"]
+                released.extend(gem_id for gem_id in ids if gem_id not in promoted)
 
-        ids_to_release = decaying_gems["ids"]
-        metadatas = decaying_gems["metadatas"]
+        self.collection.drop(name)
+        if released:
+            self.vault.forget(released)
+        return len(promoted), total - len(promoted)
+
+    def _judge(self, ids, metadatas, threshold_date):
+        """
+        Return the positions of gems whose last resonance is older than the threshold.
+        """
+        released = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for i, meta in enumerate(metadatas):
+            last_synced = meta.get("last_synced")
+            if not isinstance(last_synced, str) or last_synced >= threshold_date:
+                continue
+            released.append(i)
 
-        # 2. The Act of Release (Letting Go)
-        if ids_to_release:
             # Optional: Log the Judgment for debugging
-            for i, gem_id in enumerate(ids_to_release):
-                meta = metadatas[i]
-                usage_count = meta.get("usage_count", 0)
+            if debug:
                 try:
-                    last_synced = datetime.fromisoformat(
-                        meta.get("last_synced", threshold_date)
-                    )
-                    age_days = (now - last_synced).days
+                    age_days = (datetime.now() - datetime.fromisoformat(last_synced)).days
                 except ValueError:
                     age_days = "unknown"
                 logger.debug(
-                    f"🍂 Marking gem {gem_id} for release (Age: {age_days}d, Usage: {usage_count})"
+                    f"🍂 Marking gem {ids[i]} for release (Age: {age_days}d, Usage: {meta.get('usage_count', 0)})"
                 )
+        return released
 
-            count = len(ids_to_release)
-            self.collection.delete(ids=ids_to_release)
-            logger.info(
-                f"✨ Uposatha Complete: Released {count} phantom echoes back to the void."
+
+async def uposatha_vigil(cleaner, interval_seconds=6 * 3600, budget_seconds=2.0, max_deletes=5000,
+                         resume_seconds=5.0):
+    """
+    Run the ritual periodically in the background.
+    Each run happens in a worker thread with a bounded budget; an unfinished
+    pass resumes shortly after instead of holding the writer for long.
+    """
+    delay = interval_seconds
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            result = await asyncio.to_thread(
+                cleaner.cleanse_entropy, budget_seconds=budget_seconds, max_deletes=max_deletes
             )
-            return {"status": "purified", "deleted_count": count}
-        else:
-            logger.info("✨ Uposatha Complete: All memories are vibrant and necessary.")
-            return {"status": "stable", "deleted_count": 0}
+        except Exception as e:
+            logger.error(f"Uposatha vigil failed: {e}")
+            delay = interval_seconds
+            continue
+        delay = resume_seconds if result["status"] == "partial" else interval_seconds
@@ -1,40 +1,83 @@
 import time
 import logging
+from memory.embedder import NGramEncoder
 
 logger = logging.getLogger("SATI.Mindfulness")
 
+
+class SatiState:
+    """
+    Per-session mindfulness buffer: the last observed vibe and intent.
+    Slotted so thousands of live sessions stay compact.
+    """
+    __slots__ = ("score", "tone", "intensity", "last_intent_vector", "last_seen")
+
+    def __init__(self):
+        self.score = 0.0
+        self.tone = "NEUTRAL"
+        self.intensity = 0.0
+        self.last_intent_vector = []
+        self.last_seen = time.monotonic()
+
+    @property
+    def current_vibe(self):
+        return {
+            "score": self.score,
+            "tone": self.tone,
+            "intensity": self.intensity
+        }
+
+
 class SATI:
     """
     SATI (Mindfulness Layer)
     Records the 'Vibe' (Emotional Tone) and Current Intent.
     Acts as the immediate consciousness buffer before deep processing.
+    Stateless per call when given a SatiState; otherwise uses its own default state.
     """
-    def __init__(self):
-        self.current_vibe = {
-            "score": 0.0,
-            "tone": "NEUTRAL",
-            "intensity": 0.0
-        }
-        self.last_intent_vector = []
+    def __init__(self, encoder=None):
+        self.state = SatiState()
+        # Share this encoder with the Vault so each utterance is embedded once
+        self.encoder = encoder or NGramEncoder()
+
+    @property
+    def current_vibe(self):
+        return self.state.current_vibe
+
+    @property
+    def last_intent_vector(self):
+        return self.state.last_intent_vector
 
-    def observe(self, voice_input, vibe_score, tone):
+    def observe(self, voice_input, vibe_score, tone, state=None):
         """
         Observe incoming stimuli (Voice/Vibe).
         """
-        self.current_vibe = {
-            "score": vibe_score,
-            "tone": tone,
-            "intensity": abs(vibe_score) # Simple intensity metric
-        }
-        logger.info(f"👁️ SATI Observed: {tone} (Score: {vibe_score})")
-        return self.current_vibe
+        state = state or self.state
+        state.score = vibe_score
+        state.tone = tone
+        state.intensity = abs(vibe_score) # Simple intensity metric
+        state.last_seen = time.monotonic()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"👁️ SATI Observed: {tone} (Score: {vibe_score})")
+        return state.current_vibe
+
+    def encode_intent(self, text, state=None):
+        """
+        Encode intent into a float32 vector with the shared encoder.
+        Empty input yields an empty vector, which PRGX1 rejects.
+        """
+        return self.encode_intents([text], [state])[0]
 
-    def encode_intent(self, text):
+    def encode_intents(self, texts, states=None):
         """
-        Encode intent into a vector (Mock for now).
-        Real implementation would use an embedding model.
+        Encode a batch of utterances in one pass. Returns one row per text.
         """
-        # Mock vector generation (Identity Annihilation - PII removed)
-        vector = [ord(c) % 100 / 100.0 for c in text[:10]]
-        self.last_intent_vector = vector
-        return vector
+        vectors = self.encoder.embed(texts)
+        states = states or [None] * len(texts)
+        results = []
+        for text, vector, state in zip(texts, vectors, states):
+            if not text.strip():
+                vector = vector[:0]
+            (state or self.state).last_intent_vector = vector
+            results.append(vector)
+        return results
@@ -0,0 +1,91 @@
+"""
+FILE: session.py
+CONTEXT: AG-SC-ADK / Brain / Gateway
+DESCRIPTION: Per-connection SATI state, held in a sharded registry.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from zlib import crc32
+
+from sati import SatiState
+
+logger = logging.getLogger("AetherBus.Sessions")
+
+
+class SessionRegistry:
+    """
+    Maps session ids to their SatiState.
+    Sessions are spread over independently locked shards (each an LRU), so
+    lookups are O(1), contention stays per shard, and memory is bounded by
+    max_sessions plus idle eviction.
+    """
+    def __init__(self, shards=16, idle_timeout=300.0, max_sessions=10000):
+        self.idle_timeout = idle_timeout
+        self.shard_capacity = max(1, max_sessions // shards)
+        self._shards = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self.evicted = 0
+
+    def _shard(self, session_id):
+        index = crc32(session_id.encode("utf-8")) % len(self._shards)
+        return self._shards[index], self._locks[index]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def open(self, session_id):
+        """
+        Return the session's state, creating it if needed.
+        """
+        shard, lock = self._shard(session_id)
+        with lock:
+            state = shard.get(session_id)
+            if state is None:
+                state = shard[session_id] = SatiState()
+                if len(shard) > self.shard_capacity:
+                    shard.popitem(last=False)
+                    self.evicted += 1
+            else:
+                shard.move_to_end(session_id)
+            state.last_seen = time.monotonic()
+            return state
+
+    def get(self, session_id):
+        shard, lock = self._shard(session_id)
+        with lock:
+            return shard.get(session_id)
+
+    def close(self, session_id):
+        shard, lock = self._shard(session_id)
+        with lock:
+            shard.pop(session_id, None)
+
+    def evict_idle(self, now=None):
+        """
+        Drop sessions not seen within idle_timeout. Returns how many were dropped.
+        """
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.idle_timeout
+        dropped = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                stale = [sid for sid, state in shard.items() if state.last_seen < cutoff]
+                for sid in stale:
+                    del shard[sid]
+            dropped += len(stale)
+        self.evicted += dropped
+        return dropped
+
+
+async def session_janitor(registry, interval_seconds=60.0):
+    """
+    Periodically evict idle sessions.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        dropped = registry.evict_idle()
+        if dropped:
+            logger.info(f"🧹 Evicted {dropped} idle sessions")
@@ -0,0 +1,155 @@
+from pathlib import Path
+import sys
+import asyncio
+import json
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from admission import (
+    INTENT, TELEMETRY, AdmissionController, ConcurrencyBudget, KeyedRateLimiter, LoadShedder, TokenBucket,
+)
+from aether_bus import AetherBus
+from identity import PRGX_Triad
+from pipeline import VoicePipeline
+from sati import SATI
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.retry_after() == 0.5
+
+    clock.now = 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now = 100.0  # Never refills past the burst
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_keyed_rate_limiter_is_bounded_lru():
+    limiter = KeyedRateLimiter(rate=1.0, burst=1, max_keys=2, clock=FakeClock())
+
+    first = limiter.bucket("a")
+    limiter.bucket("b")
+    assert limiter.bucket("a") is first  # Refreshes "a", so "b" is evicted next
+    limiter.bucket("c")
+
+    assert len(limiter) == 2
+    assert limiter.bucket("a") is first
+
+
+def test_shedder_drops_telemetry_before_intents():
+    lag = [0.0]
+    shedder = LoadShedder(telemetry_lag=0.05, intent_lag=0.25, lag=lambda: lag[0])
+
+    assert shedder.admit(TELEMETRY) and shedder.admit(INTENT)
+    lag[0] = 0.1
+    assert not shedder.admit(TELEMETRY) and shedder.admit(INTENT)
+    lag[0] = 0.5
+    assert not shedder.admit(TELEMETRY) and not shedder.admit(INTENT)
+
+
+def test_controller_reports_which_gate_refused():
+    clock = FakeClock()
+    lag = [0.0]
+    controller = AdmissionController(
+        rate=1.0, burst=2, source_rate=1.0, source_burst=3, max_in_flight=4,
+        shedder=LoadShedder(lag=lambda: lag[0]), clock=clock,
+    )
+    first, second = controller.connection_bucket(), controller.connection_bucket()
+
+    assert controller.admit(first, "voice") is None
+    assert controller.admit(first, "voice") is None
+    assert controller.admit(first, "voice")[0] == "rate_connection"
+    # A second socket for the same identity shares its source bucket
+    assert controller.admit(second, "voice") is None
+    assert controller.admit(second, "voice")[0] == "rate_source"
+    assert controller.admit(second, "other") is None
+    assert controller.admit(controller.connection_bucket(), None)[0] == "budget"
+    assert controller.budget.in_flight == 4
+
+    lag[0] = 1.0
+    assert controller.admit(controller.connection_bucket(), None)[0] == "overloaded"
+
+
+def test_bus_sheds_render_light_under_lag():
+    lag = [0.1]
+    bus = AetherBus(shedder=LoadShedder(telemetry_lag=0.05, intent_lag=0.25, lag=lambda: lag[0]))
+    received = []
+
+    async def subscriber(frame):
+        received.append(json.loads(frame)["params"]["name"])
+
+    bus.subscribe(subscriber)
+
+    async def run():
+        await bus.publish("render_light", {}, {"source_id": "unit-test"})
+        await bus.publish("ui:shader_intent", {}, {"source_id": "unit-test"})
+        await bus.join()
+
+    asyncio.run(run())
+
+    assert received == ["ui:shader_intent"]
+
+
+def test_bus_sheds_only_telemetry_even_when_intents_are_refused():
+    lag = [0.1]
+    shedder = LoadShedder(telemetry_lag=0.05, intent_lag=0.25, lag=lambda: lag[0])
+    bus = AetherBus(shedder=shedder)
+    received = []
+
+    async def subscriber(frame):
+        received.append(json.loads(frame)["params"]["name"])
+
+    bus.subscribe(subscriber)
+
+    async def run():
+        shed = await bus.publish_many("render_light", [{}, {}], {"source_id": "unit-test"})
+        lag[0] = 0.5
+        # Already admitted and acknowledged, so delivered despite the overload
+        kept = await bus.publish_many("ui:shader_intent", [{}, {}], {"source_id": "unit-test"})
+        await bus.publish("ui:shader_intent", {}, {"source_id": "unit-test"})
+        await bus.join()
+        return shed, kept
+
+    assert asyncio.run(run()) == (0, 2)
+    assert received == ["ui:shader_intent"] * 3
+    # New intents are refused at admission, with an error for the client
+    controller = AdmissionController(shedder=shedder)
+    assert controller.admit(controller.connection_bucket())[0] == "overloaded"
+
+
+def test_pipeline_returns_budget_slots_when_messages_leave():
+    class NullVault:
+        def commit_changes(self, changes, ritual_tag="normal"):
+            return [None] * len(changes)
+
+    budget = ConcurrencyBudget(limit=8)
+    bus = AetherBus()
+
+    async def run():
+        pipeline = VoicePipeline(bus, SATI(), PRGX_Triad(), NullVault(), budget=budget).start()
+        texts = ["", "hello", "world"]  # The empty one is blocked by PRGX1
+        assert budget.try_acquire(len(texts))
+        await pipeline.submit_many(texts)
+        while pipeline.processed + pipeline.blocked < 3:
+            await asyncio.sleep(0.01)
+        released = budget.in_flight
+        assert budget.try_acquire(2)
+        await pipeline.submit_many(["never", "processed"])
+        await pipeline.close()
+        return released
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5.0)) == 0
+    assert budget.in_flight == 0
@@ -0,0 +1,113 @@
+from pathlib import Path
+import sys
+import asyncio
+import json
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from aether_bus import AetherBus, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT
+
+
+def test_topic_subscriptions_route_only_matching_messages():
+    bus = AetherBus()
+    ui_messages = []
+    light_messages = []
+
+    async def ui_subscriber(message_text):
+        ui_messages.append(json.loads(message_text)["params"]["name"])
+
+    async def light_subscriber(message_text):
+        light_messages.append(json.loads(message_text)["params"]["name"])
+
+    bus.subscribe(ui_subscriber, topics=["ui:*"])
+    bus.subscribe(light_subscriber, topics=["render_light"])
+
+    async def run():
+        await bus.publish("ui:shader_intent", {}, {"source_id": "unit-test"})
+        await bus.publish("render_light", {}, {"source_id": "unit-test"})
+        await bus.publish("intent_verify", {}, {"source_id": "unit-test"})
+        await bus.join()
+
+    asyncio.run(run())
+
+    assert ui_messages == ["ui:shader_intent"]
+    assert light_messages == ["render_light"]
+
+
+def test_stalled_subscriber_does_not_block_publish():
+    bus = AetherBus()
+    fast_messages = []
+    release = None
+
+    async def stalled_subscriber(message_text):
+        await release.wait()
+
+    async def fast_subscriber(message_text):
+        fast_messages.append(message_text)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        stalled = bus.subscribe(stalled_subscriber, maxsize=2, overflow=OVERFLOW_COALESCE)
+        bus.subscribe(fast_subscriber)
+
+        for i in range(5):
+            await asyncio.wait_for(
+                bus.publish("render_light", {"tick": i}, {"source_id": "unit-test"}), timeout=1.0
+            )
+        await asyncio.sleep(0)
+
+        # Only the latest pending frame per topic survives while the consumer is stalled
+        pending = [json.loads(message)["params"]["arguments"]["tick"] for _, message, _, _ in stalled.queue]
+        assert pending == [4]
+
+        release.set()
+        await bus.join()
+
+    asyncio.run(run())
+    assert len(fast_messages) == 5
+
+
+def test_disconnect_policy_removes_overflowing_subscriber():
+    bus = AetherBus()
+
+    async def never_ready(message_text):
+        await asyncio.sleep(3600)
+
+    async def run():
+        bus.subscribe(never_ready, maxsize=1, overflow=OVERFLOW_DISCONNECT)
+        for i in range(3):
+            await bus.publish("render_light", {"tick": i}, {"source_id": "unit-test"})
+
+    asyncio.run(run())
+    assert never_ready not in bus.subscribers
+
+
+def test_publish_encodes_one_frame_shared_by_all_subscribers():
+    bus = AetherBus()
+    frames = []
+
+    async def first(frame):
+        frames.append(frame)
+
+    async def second(frame):
+        frames.append(frame)
+
+    bus.subscribe(first)
+    bus.subscribe(second)
+    payload = {"vibe_state": {"mood": "CALM", "energy_level": 0.5}, "text": "สวัสดี"}
+
+    async def run():
+        await bus.publish("intent_manifest", payload, {"source_id": "unit-test"})
+        await bus.join()
+
+    asyncio.run(run())
+
+    assert len(frames) == 2
+    assert isinstance(frames[0], bytes)
+    assert frames[0] is frames[1]
+    assert json.loads(frames[0]) == {
+        "jsonrpc": "2.0",
+        "method": "tools/intent_manifest",
+        "params": {"name": "intent_manifest", "arguments": payload, "_identity": {"source_id": "unit-test"}},
+    }
@@ -0,0 +1,91 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("chromadb")
+
+from memory.akashic_vault import AkashicVault
+
+
+PHYSICS = {"vibe_score": 0.8, "emotional_tone": "WAKING"}
+
+
+def test_commit_change_is_write_behind_and_flushes_in_one_batch(tmp_path):
+    vault = AkashicVault(persist_path=str(tmp_path / "record"), flush_interval=60.0)
+
+    gem_ids = [vault.commit_change(PHYSICS, f"intent {i}") for i in range(5)]
+    assert vault.pending_count == 5
+
+    assert vault.flush() == 5
+    stored = vault.gems.get(ids=gem_ids)
+    assert sorted(stored["ids"]) == sorted(gem_ids)
+    vault.close()
+
+
+def test_close_flushes_pending_commits(tmp_path):
+    vault = AkashicVault(persist_path=str(tmp_path / "record"), flush_interval=60.0)
+    gem_id = vault.commit_change(PHYSICS, "remember me")
+
+    vault.close()
+
+    assert vault.pending_count == 0
+    assert vault.gems.get(ids=[gem_id])["ids"] == [gem_id]
+
+
+def test_repeated_commit_resonates_pending_gem(tmp_path):
+    vault = AkashicVault(persist_path=str(tmp_path / "record"), flush_interval=60.0)
+
+    first_id = vault.commit_change(PHYSICS, "WAKE UP")
+    second_id = vault.commit_change(PHYSICS, "WAKE UP")
+    vault.close()
+
+    assert first_id == second_id
+    assert vault.gems.count() == 1
+    assert vault.gems.get(ids=[first_id])["metadatas"][0]["usage_count"] == 2
+
+
+def test_commit_changes_queues_group_for_one_flush(tmp_path):
+    vault = AkashicVault(persist_path=str(tmp_path / "record"), flush_interval=60.0)
+    changes = [(PHYSICS, "group a", None), ({"vibe_score": 0.1}, "broken", None),
+               (PHYSICS, "group b", None), (PHYSICS, "group a", None)]
+
+    gem_ids = vault.commit_changes(changes)
+
+    # The change missing its tone fails alone; the repeat resonates within the group
+    assert gem_ids[1] is None
+    assert gem_ids[3] == gem_ids[0]
+    assert vault.flush() == 3
+    assert vault.gems.count() == 2
+    assert vault.gems.get(ids=[gem_ids[0]])["metadatas"][0]["usage_count"] == 2
+    vault.close()
+
+
+def test_concurrent_commits_of_one_text_share_a_gem(tmp_path):
+    import threading
+
+    vault = AkashicVault(persist_path=str(tmp_path / "record"), flush_interval=60.0)
+    # Both threads miss the lookup before either queues its gem
+    both_looked = threading.Barrier(2)
+
+    def missing(text, embedding=None):
+        both_looked.wait(timeout=5)
+        return None
+
+    vault.find_resonant = missing
+    gem_ids = []
+    commits = [
+        threading.Thread(target=lambda: gem_ids.append(vault.commit_change(PHYSICS, "WAKE UP"))),
+        threading.Thread(target=lambda: gem_ids.append(vault.commit_changes([(PHYSICS, "WAKE UP", None)])[0])),
+    ]
+    for commit in commits:
+        commit.start()
+    for commit in commits:
+        commit.join()
+    vault.close()
+
+    assert gem_ids[0] == gem_ids[1]
+    assert vault.gems.count() == 1
+    assert vault.gems.get(ids=[gem_ids[0]])["metadatas"][0]["usage_count"] == 2
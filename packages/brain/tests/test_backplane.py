@@ -0,0 +1,61 @@
+from pathlib import Path
+import sys
+import asyncio
+import json
+import tempfile
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from aether_bus import AetherBus
+from backplane import HEADER, UnixSocketBackplane
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_frames_are_relayed_between_buses_without_echo():
+    first_bus, second_bus = AetherBus(), AetherBus()
+    first_received, second_received = [], []
+
+    async def first_subscriber(frame):
+        first_received.append(json.loads(frame)["params"]["arguments"])
+
+    async def second_subscriber(frame):
+        second_received.append(json.loads(frame)["params"]["arguments"])
+
+    first_bus.subscribe(first_subscriber)
+    second_bus.subscribe(second_subscriber, topics=["ui:*"])
+
+    async def run():
+        # Short directory: Unix socket paths are limited to ~100 bytes
+        with tempfile.TemporaryDirectory(prefix="aeb") as directory:
+            await first_bus.attach_backplane(UnixSocketBackplane(directory, peer_refresh_seconds=0))
+            await second_bus.attach_backplane(UnixSocketBackplane(directory, peer_refresh_seconds=0))
+
+            await first_bus.publish("ui:shader_intent", {"tick": 1}, {"source_id": "worker-1"})
+            await first_bus.publish("render_light", {"tick": 2}, {"source_id": "worker-1"})
+            await _wait_for(lambda: second_received)
+            await asyncio.sleep(0.05)
+            await first_bus.join()
+
+            await first_bus.detach_backplane()
+            await second_bus.detach_backplane()
+
+    asyncio.run(run())
+    assert second_received == [{"tick": 1}]
+    assert first_received == [{"tick": 1}, {"tick": 2}]
+
+
+def test_duplicate_and_own_frames_are_dropped():
+    backplane = UnixSocketBackplane("/unused")
+    peer = b"p" * 16
+
+    assert backplane._is_duplicate(backplane.node_id.bytes, 1)
+    assert not backplane._is_duplicate(peer, 1)
+    assert backplane._is_duplicate(peer, 1)
+    assert not backplane._is_duplicate(peer, 2)
+    assert HEADER.size == 30
@@ -0,0 +1,53 @@
+from pathlib import Path
+import asyncio
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import benchmark_suite
+from benchmark_suite import compare, summarize
+
+
+def test_summarize_reports_percentiles_in_ms_and_throughput():
+    stats = summarize([0.001] * 98 + [0.010, 0.020], items=1000, elapsed=2.0)
+
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 1.0
+    assert stats["p99_ms"] > stats["p95_ms"] >= 1.0
+    assert stats["throughput_per_s"] == 500.0
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = {"results": {
+        "a": {"p95_ms": 10.0, "throughput_per_s": 100.0},
+        "b": {"p95_ms": 10.0, "throughput_per_s": 100.0},
+    }}
+    results = {
+        "a": {"p95_ms": 11.0, "throughput_per_s": 90.0},  # Within 20%
+        "b": {"p95_ms": 13.0, "throughput_per_s": 70.0},
+        "new": {"p95_ms": 1.0, "throughput_per_s": 1.0},
+    }
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("b:") for regression in regressions)
+
+
+def test_bus_benchmark_delivers_to_every_subscriber():
+    results = asyncio.run(benchmark_suite.bench_bus([1, 5], delivery_budget=500, max_messages=100))
+
+    stats = results["bus.publish[subscribers=5]"]
+    assert stats["count"] == 100
+    assert stats["deliveries_per_s"] > stats["throughput_per_s"]
+
+
+def test_ws_round_trips_through_in_process_asgi_clients(tmp_path, monkeypatch):
+    # main opens akashic_record relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+    results = asyncio.run(benchmark_suite.bench_ws([2], messages_per_client=3, timeout=5.0))
+
+    stats = results["ws.voice_data_round_trip[clients=2]"]
+    assert stats["errors"] == 0
+    assert stats["count"] == 6
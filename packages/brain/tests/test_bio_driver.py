@@ -0,0 +1,210 @@
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from admission import LoadShedder
+from aether_bus import AetherBus, OVERFLOW_COALESCE
+from bio_driver import MockBioDriver, TickScheduler
+
+
+def _vitals(heart_rate=72.0, energy_level=0.5, mood="WAKING"):
+    return {
+        "timestamp": 0.0,
+        "heart_rate": heart_rate,
+        "body_temperature": 36.6,
+        "energy_level": energy_level,
+        "mood": mood,
+        "urgency": 0.2,
+    }
+
+
+def test_keyframe_then_deltas_with_only_changed_fields():
+    driver = MockBioDriver(AetherBus(), keyframe_interval=3)
+    source = driver.sources[0]
+    readings = iter([
+        _vitals(),
+        _vitals(heart_rate=72.2),  # Below the 1 bpm threshold
+        _vitals(energy_level=0.9, mood="FOCUSED"),
+        _vitals(energy_level=0.9, mood="FOCUSED"),
+    ])
+    driver._generate_vitals = lambda source=None: next(readings)
+
+    keyframe = driver._next_frame(source)
+    assert keyframe["frame"] == "key"
+    assert keyframe["render_params"]["geometry"] == "FLUID_ORB"
+    assert keyframe["vibe_state"]["mood"] == "WAKING"
+
+    assert driver._next_frame(source) is None
+
+    delta = driver._next_frame(source)
+    assert delta["frame"] == "delta"
+    assert delta["vibe_state"] == {"mood": "FOCUSED", "energy_level": 0.9}
+    assert set(delta["render_params"]) == {"chroma_primary", "chroma_secondary", "bloom_factor"}
+
+    # Keyframe interval reached: full state again even without changes
+    assert driver._next_frame(source)["frame"] == "key"
+
+
+def test_deltas_repeat_every_field_moved_since_the_keyframe():
+    driver = MockBioDriver(AetherBus())
+    source = driver.sources[0]
+    readings = iter([
+        _vitals(),
+        _vitals(energy_level=0.9, mood="FOCUSED"),
+        _vitals(heart_rate=80.0, energy_level=0.9, mood="FOCUSED"),
+        _vitals(heart_rate=80.0),
+    ])
+    driver._generate_vitals = lambda source=None: next(readings)
+
+    driver._next_frame(source)
+    driver._next_frame(source)
+    # A consumer that missed the previous delta is whole again after this one
+    delta = driver._next_frame(source)
+    assert delta["vibe_state"] == {"mood": "FOCUSED", "energy_level": 0.9}
+    assert set(delta["render_params"]) == {"chroma_primary", "chroma_secondary", "pulse_frequency", "bloom_factor"}
+
+    # Fields back at their keyframe value are still sent
+    delta = driver._next_frame(source)
+    assert delta["vibe_state"] == {"mood": "WAKING", "energy_level": 0.5}
+
+
+def _frames(subscription):
+    return [json.loads(frame)["params"]["arguments"] for _, frame, _, _ in subscription.queue]
+
+
+def test_dropped_frame_is_followed_by_a_keyframe():
+    bus = AetherBus()
+    driver = MockBioDriver(bus)
+    readings = iter([_vitals(), _vitals(energy_level=0.9), _vitals(energy_level=0.9)])
+    driver._generate_vitals = lambda source=None: next(readings)
+
+    async def stalled(frame):
+        pass
+
+    async def run():
+        subscription = bus.subscribe(stalled, topics=["render_light"], maxsize=1)
+        await driver.tick()
+        await driver.tick()  # Pushes the keyframe out of the full queue
+        await driver.tick()
+        return _frames(subscription)
+
+    assert [frame["frame"] for frame in asyncio.run(run())] == ["key"]
+
+
+def test_shed_frame_is_followed_by_a_keyframe():
+    lag = [0.0]
+    bus = AetherBus(shedder=LoadShedder(telemetry_lag=0.05, lag=lambda: lag[0]))
+    driver = MockBioDriver(bus)
+    readings = iter([_vitals(), _vitals(energy_level=0.9), _vitals(energy_level=0.9)])
+    driver._generate_vitals = lambda source=None: next(readings)
+
+    async def run():
+        await driver.tick()
+        lag[0] = 0.1
+        await driver.tick()
+        lag[0] = 0.0
+        await driver.tick()
+
+    sent = []
+    original = bus.publish
+
+    async def recording_publish(topic, payload, identity_header, key=None):
+        published = await original(topic, payload, identity_header, key)
+        sent.append((payload["frame"], published))
+        return published
+
+    bus.publish = recording_publish
+    asyncio.run(run())
+    assert sent == [("key", True), ("delta", False), ("key", True)]
+
+
+def test_coalescing_keeps_the_latest_frame_per_source():
+    bus = AetherBus()
+    driver = MockBioDriver(bus, sources=2)
+    release = None
+
+    async def stalled(frame):
+        await release.wait()
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        subscription = bus.subscribe(stalled, topics=["render_light"], overflow=OVERFLOW_COALESCE)
+        await driver.tick()
+        frames = _frames(subscription)
+        release.set()
+        return frames
+
+    assert [frame["source"] for frame in asyncio.run(run())] == ["bio-0", "bio-1"]
+
+
+def test_tick_interval_adapts_to_change_and_backpressure():
+    bus = AetherBus()
+    driver = MockBioDriver(bus, min_interval=0.1, max_interval=1.0)
+
+    driver.interval = driver._adapt_interval(changed=False)
+    assert driver.interval > 0.1
+    driver.interval = driver._adapt_interval(changed=True)
+    assert driver.interval == 0.1
+
+    async def slow(frame):
+        pass
+
+    subscription = bus.subscribe(slow, topics=["render_light"], maxsize=4)
+    subscription.queue.extend([("render_light", b"{}", None, None)] * 3)
+    assert bus.pressure("render_light") == 0.75
+    assert driver._adapt_interval(changed=True) == 0.2
+
+
+def test_multiple_sources_share_one_driver():
+    driver = MockBioDriver(AetherBus(), sources=3)
+
+    frames = [driver._next_frame(source) for source in driver.sources]
+
+    assert [frame["source"] for frame in frames] == ["bio-0", "bio-1", "bio-2"]
+    assert all(frame["frame"] == "key" for frame in frames)
+
+
+def test_tick_scheduler_holds_rate_and_counts_missed_deadlines():
+    clock = [100.0]
+
+    async def fake_sleep(seconds):
+        clock[0] += seconds
+
+    async def run():
+        scheduler = TickScheduler(0.01, clock=lambda: clock[0], sleep=fake_sleep)
+        deadlines = []
+        for work in (0.004, 0.004, 0.035, 0.004):
+            deadlines.append(await scheduler.wait())
+            clock[0] += work  # Time spent on the tick itself
+        return scheduler, deadlines
+
+    scheduler, deadlines = asyncio.run(run())
+
+    # Work time does not accumulate into drift; the 35 ms stall skips 2 deadlines
+    assert deadlines == pytest.approx([100.0, 100.01, 100.02, 100.05])
+    assert scheduler.missed == 2
+    assert scheduler.stats()["ticks"] == 4
+
+
+def test_generate_block_is_sources_by_samples():
+    driver = MockBioDriver(AetherBus(), sources=4, seed=7)
+    timestamps = driver.sources[0].start_time + np.arange(25) * 0.01
+
+    block = driver._generate_block(driver.sources, timestamps)
+
+    assert block["sources"] == ["bio-0", "bio-1", "bio-2", "bio-3"]
+    for field in ("heart_rate", "body_temperature", "energy_level", "mood", "urgency"):
+        assert len(block[field]) == 4
+        assert all(len(row) == 25 for row in block[field])
+    assert all(50.0 < hr < 100.0 for row in block["heart_rate"] for hr in row)
+    assert set(mood for row in block["mood"] for mood in row) <= {"WAKING", "FOCUSED", "WARNING"}
+
+    vitals = driver._generate_vitals(driver.sources[0])
+    assert isinstance(vitals["heart_rate"], float) and isinstance(vitals["mood"], str)
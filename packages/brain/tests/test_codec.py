@@ -0,0 +1,73 @@
+from pathlib import Path
+import sys
+import asyncio
+import json
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import codec as codec_module
+from aether_bus import AetherBus
+from codec import CODECS, JSON, negotiate
+
+
+def test_negotiate_follows_client_preference_and_falls_back_to_json():
+    assert negotiate(None) == (JSON, None)
+    assert negotiate(["graphql-ws", "aetherbus.bogus"]) == (JSON, None)
+    assert negotiate(["aetherbus.json"]) == (JSON, "aetherbus.json")
+
+    for name, codec in CODECS.items():
+        assert negotiate(["aetherbus.bogus", codec.subprotocol, "aetherbus.json"]) == (codec, codec.subprotocol)
+
+
+@pytest.mark.parametrize("name", ["msgpack", "cbor"])
+def test_binary_codecs_round_trip_envelopes(name):
+    pytest.importorskip("msgpack" if name == "msgpack" else "cbor2")
+    codec = CODECS[name]
+    message = {
+        "jsonrpc": "2.0",
+        "method": "tools/ui:shader_intent",
+        "params": {"name": "ui:shader_intent", "arguments": {"vector": [0.0, 0.5, -1.25], "mood": "CALM"}},
+    }
+
+    encoded = codec.encode(message)
+
+    assert isinstance(encoded, bytes)
+    assert codec.decode(encoded) == message
+
+
+def test_bus_encodes_once_per_codec_for_mixed_subscribers(monkeypatch):
+    pytest.importorskip("cbor2")
+    cbor = CODECS["cbor"]
+    calls = []
+    original = codec_module.CborCodec.encode
+
+    def counting_encode(self, message):
+        calls.append(message)
+        return original(self, message)
+
+    monkeypatch.setattr(codec_module.CborCodec, "encode", counting_encode)
+
+    bus = AetherBus()
+    received = {"json": [], "cbor_a": [], "cbor_b": []}
+
+    def sink(name):
+        async def callback(frame):
+            received[name].append(frame)
+        return callback
+
+    bus.subscribe(sink("json"))
+    bus.subscribe(sink("cbor_a"), codec=cbor)
+    bus.subscribe(sink("cbor_b"), codec=cbor)
+
+    async def run():
+        await bus.publish("ui:shader_intent", {"vector": [0.0, 0.5]}, {"source_id": "unit-test"})
+        await bus.join()
+
+    asyncio.run(run())
+
+    assert len(calls) == 1
+    expected = json.loads(received["json"][0])
+    assert cbor.decode(received["cbor_a"][0]) == expected
+    assert received["cbor_a"][0] is received["cbor_b"][0]
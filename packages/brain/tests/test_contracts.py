@@ -20,7 +20,11 @@ def test_aether_bus_publish_builds_mcp_payload_contract():
     payload = {"intent_vector": "LIGHT", "vibe_score": 0.4}
     identity_header = {"source_id": "unit-test"}
 
-    asyncio.run(bus.publish("ui:shader_intent", payload, identity_header))
+    async def run():
+        await bus.publish("ui:shader_intent", payload, identity_header)
+        await bus.join()
+
+    asyncio.run(run())
 
     assert len(received) == 1
     message = received[0]
@@ -0,0 +1,117 @@
+from pathlib import Path
+import sys
+import asyncio
+import json
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from aether_bus import AetherBus
+from dead_letter import DeadLetter, DeadLetterQueue
+
+
+def test_ring_buffer_caps_entries_and_spills_overflow(tmp_path):
+    spill = tmp_path / "dead_letters.ndjson"
+    dlq = DeadLetterQueue(max_entries=2, spill_path=str(spill))
+
+    for i in range(5):
+        dlq.push(DeadLetter("render_light", "Subscriber Error", frame=f'{{"tick":{i}}}'.encode()))
+
+    assert len(dlq) == 2
+    assert dlq.stats()["evicted"] == 3
+    assert [json.loads(r["frame"])["tick"] for r in dlq.iter_spill()] == [0, 1, 2]
+
+
+def test_ring_buffer_caps_bytes():
+    dlq = DeadLetterQueue(max_entries=100, max_bytes=10)
+    for _ in range(4):
+        dlq.push(DeadLetter("render_light", "Subscriber Error", frame=b"12345"))
+
+    assert len(dlq) == 2
+    assert dlq.stats()["bytes"] == 10
+
+
+def test_failed_delivery_is_replayed_to_the_same_subscriber():
+    bus = AetherBus()
+    received = []
+    failures = 1
+
+    async def flaky(frame):
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise ConnectionError("socket hiccup")
+        received.append(json.loads(frame)["params"]["arguments"])
+
+    bus.subscribe(flaky)
+
+    async def run():
+        await bus.publish("ui:shader_intent", {"tick": 1}, {"source_id": "unit-test"})
+        await bus.join()
+        assert bus.dead_letter_stats()["depth"] == 1
+
+        result = await bus.replay_dead_letters(rate_per_second=None)
+        await bus.join()
+        return result
+
+    result = asyncio.run(run())
+    assert result == {"replayed": 1, "expired": 0}
+    assert received == [{"tick": 1}]
+    assert len(bus.dead_letter_queue) == 0
+
+
+def test_replay_retires_a_letter_its_subscriber_keeps_failing():
+    bus = AetherBus(max_delivery_attempts=3)
+    calls = 0
+
+    async def broken(frame):
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("socket gone")
+
+    bus.subscribe(broken)
+
+    async def run():
+        await bus.publish("ui:shader_intent", {"tick": 1}, {"source_id": "unit-test"})
+        await bus.join()
+        # A paced replay yields to the drain task, so failed redeliveries
+        # come back into the queue while it is still running
+        return await asyncio.wait_for(bus.replay_dead_letters(rate_per_second=1000.0), timeout=5)
+
+    result = asyncio.run(run())
+    assert result == {"replayed": 3, "expired": 1}
+    assert calls == 4
+    assert len(bus.dead_letter_queue) == 0
+
+
+def test_replayed_identical_frames_keep_their_own_attempts():
+    bus = AetherBus()
+
+    async def broken(frame):
+        raise ConnectionError("socket gone")
+
+    bus.subscribe(broken)
+
+    async def run():
+        # The same payload twice encodes to byte-identical frames
+        for _ in range(2):
+            await bus.publish("ui:shader_intent", {"tick": 1}, {"source_id": "unit-test"})
+        await bus.join()
+        letters = list(bus.dead_letter_queue)
+
+        await bus.replay_dead_letters(rate_per_second=None)
+        await bus.join()
+        return letters
+
+    letters = asyncio.run(run())
+    assert list(bus.dead_letter_queue) == letters
+    assert [letter.attempts for letter in letters] == [1, 1]
+
+
+def test_unserializable_payload_lands_in_dead_letter_queue():
+    bus = AetherBus()
+
+    asyncio.run(bus.publish("ui:shader_intent", {"bad": object()}, {"source_id": "unit-test"}))
+
+    [letter] = list(bus.dead_letter_queue)
+    assert letter.reason.startswith("Serialization Error")
+    assert letter.frame is None
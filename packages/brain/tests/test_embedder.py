@@ -0,0 +1,75 @@
+from pathlib import Path
+import sys
+import hashlib
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+np = pytest.importorskip("numpy")
+
+from memory.embedder import HashEmbedder
+
+
+def _reference_embedding(text, dimensions=384):
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    vector = []
+    while len(vector) < dimensions:
+        vector.extend([byte / 255.0 for byte in seed])
+        seed = hashlib.sha256(seed).digest()
+    return vector[:dimensions]
+
+
+def test_batch_embedding_matches_original_chain_values():
+    texts = ["I am vibrant", "I am a ghost", "สวัสดี", ""]
+    embedder = HashEmbedder()
+
+    vectors = embedder.embed(texts)
+
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (4, 384)
+    assert vectors.flags["C_CONTIGUOUS"]
+    for text, vector in zip(texts, vectors):
+        expected = np.asarray(_reference_embedding(text), dtype=np.float32)
+        assert np.array_equal(vector, expected)
+
+
+def test_repeated_texts_hit_the_cache():
+    embedder = HashEmbedder(cache_size=2)
+
+    first = embedder.embed(["LIGHT", "LIGHT", "DARK"])
+    second = embedder.embed_one("LIGHT")
+
+    assert np.array_equal(first[0], first[1])
+    assert np.array_equal(first[0], second)
+    assert embedder.misses == 3
+    assert embedder.hits == 1
+
+
+def test_ngram_encoder_batches_fixed_width_normalized_vectors():
+    from memory.embedder import NGramEncoder
+
+    encoder = NGramEncoder()
+    vectors = encoder.embed(["light the orb", "Light the orb please", "delete sector 7", "a"])
+
+    assert vectors.shape == (4, 384)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    # Paraphrases score higher than unrelated intents
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+    # A text encodes the same alone as inside a batch
+    assert np.allclose(encoder.embed_one("delete sector 7"), vectors[2])
+
+
+def test_sati_shares_encoder_output():
+    from memory.embedder import NGramEncoder
+    from sati import SATI
+
+    encoder = NGramEncoder()
+    sati = SATI(encoder=encoder)
+
+    vector = sati.encode_intent("light the orb")
+    assert vector.shape == (384,)
+    assert np.array_equal(vector, encoder.embed_one("light the orb"))
+    assert encoder.hits == 1
+    assert len(sati.encode_intent("   ")) == 0
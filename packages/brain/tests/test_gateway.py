@@ -0,0 +1,78 @@
+from pathlib import Path
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("chromadb")
+pytest.importorskip("fastapi")
+
+import jsonrpc
+from benchmark_suite import AsgiLifespan, AsgiWebSocket
+
+
+async def _reply(socket, predicate, timeout=10.0):
+    # Intent frames from the bus interleave with replies; skip them
+    while True:
+        frame = json.loads(await asyncio.wait_for(socket.receive(), timeout))
+        if predicate(frame):
+            return frame
+
+
+def test_ws_answers_every_request_in_a_batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AKASHIC_RECORD_DIR", str(tmp_path / "record"))
+    import main
+
+    async def run():
+        async with AsgiLifespan(main.app):
+            socket = await AsgiWebSocket(main.app).connect()
+            await socket.send_text(json.dumps([
+                {"jsonrpc": "2.0", "id": 1, "method": "input/voice_data", "params": {"text": "light the orb"}},
+                {"jsonrpc": "2.0", "method": "input/voice_data", "params": {"text": "calm the ocean"}},
+                "not a request",
+                {"jsonrpc": "2.0", "id": 2, "method": "no/such_method"},
+            ]))
+            batch = await _reply(socket, lambda frame: isinstance(frame, list))
+
+            await socket.send_text(json.dumps(
+                {"jsonrpc": "2.0", "id": 3, "method": "input/voice_data", "params": {"text": "light the orb"}}
+            ))
+            single = await _reply(socket, lambda frame: isinstance(frame, dict) and frame.get("id") == 3)
+            await socket.close()
+        return batch, single
+
+    batch, single = asyncio.run(run())
+
+    # The notification gets no entry; the rest are answered in one array
+    by_id = {entry["id"]: entry for entry in batch}
+    assert len(batch) == 3
+    assert by_id[1] == {"jsonrpc": "2.0", "id": 1, "result": {"accepted": True}}
+    assert by_id[None]["error"]["code"] == jsonrpc.INVALID_REQUEST
+    assert by_id[2]["error"]["code"] == jsonrpc.METHOD_NOT_FOUND
+    assert single == {"jsonrpc": "2.0", "id": 3, "result": {"accepted": True}}
+    assert (tmp_path / "record" / "chroma.sqlite3").exists()
+
+
+def test_second_process_on_a_record_fails_readiness(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AKASHIC_RECORD_DIR", str(tmp_path / "record"))
+    import main
+
+    # Another worker already holds the Record
+    held = main.lock_record(str(tmp_path / "record"))
+    app = SimpleNamespace(state=SimpleNamespace(status="starting", settled=asyncio.Event(), background=[]))
+    try:
+        asyncio.run(main.awaken(app, 0.0))
+    finally:
+        os.close(held)
+
+    assert app.state.status == "failed"
+    assert app.state.settled.is_set()
+    assert not (tmp_path / "record" / "chroma.sqlite3").exists()
@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from identity import DEFAULT_TONE, PRGX1_Sentry, PRGX2_Alchemist, TONE_TABLE, tone_profile
+
+
+def _vibe(tone, intensity=0.5):
+    return {"score": intensity, "tone": tone, "intensity": intensity}
+
+
+def test_transmute_uses_the_shared_tone_table():
+    params = PRGX2_Alchemist.transmute(_vibe("WARNING", 0.9), [0.1])
+
+    assert params["emotional_tone"] == "WARNING"
+    assert params["neural_shader_params"] == {
+        "color_base": "#ff0000",
+        "vibe_intensity": 0.9,
+        "ripple_pattern": "chaotic_noise",
+    }
+    assert tone_profile("UNKNOWN") is DEFAULT_TONE
+    assert PRGX2_Alchemist.transmute(_vibe("UNKNOWN"), [0.1])["neural_shader_params"]["color_base"] == "#2323ee"
+
+
+def test_transmuted_payloads_do_not_share_shader_params():
+    first = PRGX2_Alchemist.transmute(_vibe("FOCUSED", 0.2), [0.1])
+    first["neural_shader_params"]["vibe_intensity"] = 99
+
+    second = PRGX2_Alchemist.transmute(_vibe("FOCUSED", 0.3), [0.1])
+
+    assert second["neural_shader_params"]["vibe_intensity"] == 0.3
+    assert TONE_TABLE["FOCUSED"].color_base == "#ffffff"
+
+
+def test_transmute_many_keeps_order():
+    tones = ["WAKING", "CALM", "FOCUSED"]
+
+    payloads = PRGX2_Alchemist.transmute_many([_vibe(tone) for tone in tones], [[1.0], [2.0], [3.0]])
+
+    assert [payload["emotional_tone"] for payload in payloads] == tones
+    assert [payload["intent_vector"] for payload in payloads] == [[1.0], [2.0], [3.0]]
+    assert payloads[1]["neural_shader_params"]["ripple_pattern"] == "calm_waves"
+
+
+def test_sentry_accepts_sati_vectors_directly():
+    from sati import SATI
+
+    sati = SATI()
+
+    def inspect(intent_vector):
+        return PRGX1_Sentry.inspect({"intent_vector": intent_vector, "vibe_score": 0.1})
+
+    assert inspect(sati.encode_intent("hello there")) == (True, "CLEAN")
+    assert inspect(sati.encode_intent("   ")) == (False, "MISSING_VECTOR")
+    assert inspect([]) == (False, "MISSING_VECTOR")
+    assert inspect(None) == (False, "MISSING_VECTOR")
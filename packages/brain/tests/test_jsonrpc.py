@@ -0,0 +1,33 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import jsonrpc
+
+
+def test_single_request_is_not_a_batch():
+    request = {"jsonrpc": "2.0", "method": "input/voice_data", "params": {"text": "hi"}}
+
+    assert jsonrpc.split_batch(request) == ([request], [], False)
+
+
+def test_batch_isolates_invalid_entries_and_keeps_order():
+    first = {"jsonrpc": "2.0", "method": "input/voice_data", "params": {"text": "a"}}
+    second = {"jsonrpc": "2.0", "method": "input/voice_data", "params": {"text": "b"}, "id": 2}
+
+    requests, errors, is_batch = jsonrpc.split_batch([first, 42, {"id": 7}, second])
+
+    assert is_batch
+    assert requests == [first, second]
+    assert [(e["id"], e["error"]["code"]) for e in errors] == [
+        (None, jsonrpc.INVALID_REQUEST), (7, jsonrpc.INVALID_REQUEST)
+    ]
+
+
+def test_empty_batch_is_one_invalid_request():
+    requests, errors, is_batch = jsonrpc.split_batch([])
+
+    assert requests == []
+    assert errors == [jsonrpc.error(None, jsonrpc.INVALID_REQUEST, "Empty batch")]
+    assert is_batch
@@ -0,0 +1,51 @@
+from pathlib import Path
+import sys
+import gzip
+import json
+import logging
+import queue
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from logger import DroppingQueueHandler, RSILogger
+
+
+def test_audit_events_are_batched_to_ndjson(tmp_path):
+    log_file = tmp_path / "audit.log"
+    audit = RSILogger(log_file=str(log_file), name="RSI_Audit.batch", flush_interval=60.0)
+    try:
+        for i in range(3):
+            audit.log_event("unit-test", "Publish", "Success", {"tick": i})
+        assert audit.flush()
+
+        lines = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [line["payload_summary"]["tick"] for line in lines] == [0, 1, 2]
+        assert lines[0]["source"] == "unit-test"
+        assert "ts" in lines[0]
+    finally:
+        audit.close()
+
+
+def test_full_queue_counts_dropped_records():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    for i in range(4):
+        handler.emit(logging.LogRecord("RSI_Audit", logging.INFO, __file__, 0, {"tick": i}, None, None))
+
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == {"tick": 0}
+
+
+def test_rotation_compresses_segments(tmp_path):
+    log_file = tmp_path / "audit.log"
+    audit = RSILogger(log_file=str(log_file), name="RSI_Audit.rotate", batch_size=1, max_bytes=200, compression="gzip")
+    try:
+        for i in range(10):
+            audit.log_event("unit-test", "Publish", "Success", {"tick": i})
+        assert audit.flush()
+    finally:
+        audit.close()
+
+    segment = tmp_path / "audit.log.1.gz"
+    assert audit.sink.rotations > 0
+    with gzip.open(segment, "rt") as f:
+        assert json.loads(f.readline())["source"] == "unit-test"
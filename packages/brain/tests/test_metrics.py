@@ -0,0 +1,54 @@
+from pathlib import Path
+import sys
+import time
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from metrics import MetricsRegistry, SlowRequestProfiler
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["method"])
+    requests.labels("get").inc()
+    requests.labels("get").inc(2)
+    depth = registry.gauge("queue_depth", "Depth")
+    depth.set_function(lambda: 7)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="get"} 3' in text
+    assert "queue_depth 7" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "latency_seconds_sum 5.55" in text
+
+
+def test_registry_returns_existing_metric_by_name():
+    registry = MetricsRegistry()
+
+    assert registry.counter("hits_total", "Hits") is registry.counter("hits_total", "Hits")
+
+
+def test_profiler_reports_only_slow_spans():
+    profiler = SlowRequestProfiler(threshold=0.05, sample_interval=0.005).start()
+    try:
+        with profiler.span("fast"):
+            pass
+        with profiler.span("slow"):
+            deadline = time.perf_counter() + 0.15
+            while time.perf_counter() < deadline:
+                pass
+    finally:
+        profiler.stop()
+
+    assert [report["name"] for report in profiler.reports] == ["slow"]
+    report = profiler.reports[0]
+    assert report["samples"] > 0
+    assert "test_profiler_reports_only_slow_spans" in report["stacks"][0]["stack"]
@@ -0,0 +1,117 @@
+from pathlib import Path
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("chromadb")
+
+from memory.embedder import NGramEncoder
+from memory.vault import Vault
+
+
+DAY_ONE = datetime(2026, 3, 2, 9, 30)  # A Monday
+
+
+def _vault(tmp_path, partitioning="day"):
+    return Vault(persist_path=str(tmp_path / "vault"), embedder=NGramEncoder(), partitioning=partitioning)
+
+
+def test_writes_go_to_the_current_partition(tmp_path):
+    vault = _vault(tmp_path)
+    for day in range(3):
+        vault.gems.clock = lambda day=day: DAY_ONE + timedelta(days=day)
+        vault.store_gems([f"day {day} a", f"day {day} b"], [{"id": f"{day}a"}, {"id": f"{day}b"}])
+
+    names = [p.name for p in vault.gems.partitions()]
+    assert names == [
+        "vocal_resonance_gems_char-ngram_d20260302",
+        "vocal_resonance_gems_char-ngram_d20260303",
+        "vocal_resonance_gems_char-ngram_d20260304",
+    ]
+    assert vault.gems.count() == 6
+    assert vault.gems.collection(names[1]).get(include=[])["ids"] == ["1a", "1b"]
+
+    # Paged reads walk the partitions oldest first
+    page = vault.gems.get(limit=3, offset=1, include=["documents"])
+    assert page["ids"] == ["0b", "1a", "1b"]
+    vault.close()
+
+
+def test_week_partitions_start_on_monday(tmp_path):
+    vault = _vault(tmp_path, partitioning="week")
+
+    assert vault.gems.partition_for(DAY_ONE + timedelta(days=6)).name == "vocal_resonance_gems_char-ngram_w20260302"
+    assert vault.gems.partition_for(DAY_ONE + timedelta(days=7)).name == "vocal_resonance_gems_char-ngram_w20260309"
+    vault.close()
+
+
+def test_vault_api_spans_partitions(tmp_path):
+    vault = _vault(tmp_path)
+    vault.gems.clock = lambda: DAY_ONE
+    vault.store_gem("wake up the light", {"id": "light", "usage_count": 1})
+    vault.gems.clock = lambda: DAY_ONE + timedelta(days=1)
+    vault.store_gem("calm the ocean", {"id": "ocean", "usage_count": 1})
+
+    # Queries fan out and merge top-k across partitions
+    assert [hit["id"] for hit in vault.recall("wake up the light", k=2)] == ["light", "ocean"]
+    assert [[hit["id"] for hit in hits] for hits in vault.recall(["calm the ocean", "light"], k=1)] == [
+        ["ocean"], ["light"]
+    ]
+
+    # Resonance updates find the gem in an older partition
+    vault.update_resonance("light")
+    vault.flush()
+    assert vault.get_usage_count("light") == 2
+
+    # A fresh process rediscovers the partitions and dedups against them
+    vault.close()
+    reopened = _vault(tmp_path)
+    assert reopened.gems.count() == 2
+    assert reopened.find_resonant("calm the ocean") == "ocean"
+    reopened.close()
+
+
+def test_drop_waits_for_queries_already_on_the_partition(tmp_path):
+    import threading
+
+    vault = _vault(tmp_path)
+    for day in range(2):
+        vault.gems.clock = lambda day=day: DAY_ONE + timedelta(days=day)
+        vault.store_gem(f"day {day} light", {"id": f"{day}", "usage_count": 1})
+    oldest = vault.gems.partitions()[0].name
+    querying, release = threading.Event(), threading.Event()
+
+    class SlowQueries:
+        def __init__(self, collection):
+            self.collection = collection
+
+        def query(self, **kwargs):
+            querying.set()
+            release.wait(timeout=5)
+            return self.collection.query(**kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self.collection, name)
+
+    vault.gems._collections[oldest] = SlowQueries(vault.gems._collections[oldest])
+    hits = []
+    query = threading.Thread(target=lambda: hits.extend(vault.recall("day 0 light", k=2)))
+    query.start()
+    querying.wait(timeout=5)
+    drop = threading.Thread(target=vault.gems.drop, args=(oldest,))
+    drop.start()
+
+    # New reads no longer see the partition, but the one in flight keeps it
+    drop.join(timeout=0.2)
+    assert drop.is_alive()
+    assert vault.gems.count() == 1
+    release.set()
+    query.join()
+    drop.join()
+
+    assert [hit["id"] for hit in hits] == ["0", "1"]
+    assert oldest not in [collection.name for collection in vault.client.list_collections()]
+    vault.close()
@@ -0,0 +1,108 @@
+from pathlib import Path
+import sys
+import asyncio
+import json
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from aether_bus import AetherBus
+from identity import PRGX_Triad
+from pipeline import VoicePipeline
+from sati import SATI
+
+
+class RecordingVault:
+    def __init__(self):
+        self.commits = []
+        self.groups = []
+
+    def commit_change(self, physics_params, original_text, ritual_tag="normal", embedding=None):
+        self.commits.append(original_text)
+        return f"gem-{len(self.commits)}"
+
+    def commit_changes(self, changes, ritual_tag="normal"):
+        self.groups.append(len(changes))
+        return [self.commit_change(physics_params, text, ritual_tag, embedding) for physics_params, text, embedding in changes]
+
+
+def test_voice_pipeline_publishes_in_arrival_order():
+    bus = AetherBus()
+    vault = RecordingVault()
+    published = []
+
+    async def subscriber(frame):
+        published.append(json.loads(frame)["params"]["name"])
+
+    bus.subscribe(subscriber, topics=["ui:*"])
+
+    async def run():
+        pipeline = VoicePipeline(bus, SATI(), PRGX_Triad(), vault, batch_size=4).start()
+        for i in range(10):
+            await pipeline.submit(f"utterance {i}")
+
+        while pipeline.processed < 10:
+            await asyncio.sleep(0.01)
+        await bus.join()
+        depths = pipeline.depths()
+        await pipeline.close()
+        return depths
+
+    depths = asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+    assert vault.commits == [f"utterance {i}" for i in range(10)]
+    assert published == ["ui:shader_intent"] * 10
+    assert depths == {"intake": 0, "transmute": 0, "commit": 0, "publish": 0}
+
+
+def test_blocked_intents_are_not_committed():
+    bus = AetherBus()
+    vault = RecordingVault()
+
+    async def run():
+        pipeline = VoicePipeline(bus, SATI(), PRGX_Triad(), vault).start()
+        # An empty utterance yields no intent vector, which PRGX1 blocks
+        await pipeline.submit("")
+        await pipeline.submit("hello")
+        while pipeline.processed + pipeline.blocked < 2:
+            await asyncio.sleep(0.01)
+        await pipeline.close()
+        return pipeline.blocked
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5.0)) == 1
+    assert vault.commits == ["hello"]
+
+
+def test_burst_is_micro_batched_through_commit_and_publish():
+    bus = AetherBus()
+    vault = RecordingVault()
+    frames = []
+    publish_calls = []
+    publish_many = bus.publish_many
+
+    async def subscriber(frame):
+        frames.append(json.loads(frame)["params"]["arguments"])
+
+    async def recording_publish_many(topic, payloads, identity_header):
+        publish_calls.append(len(payloads))
+        return await publish_many(topic, payloads, identity_header)
+
+    bus.subscribe(subscriber, topics=["ui:*"])
+    bus.publish_many = recording_publish_many
+
+    async def run():
+        pipeline = VoicePipeline(bus, SATI(), PRGX_Triad(), vault, batch_size=8, batch_window=0.05).start()
+        # One JSON-RPC batch, plus a straggler that lands inside the batch window
+        await pipeline.submit_many([f"burst {i}" for i in range(5)])
+        await asyncio.sleep(0.01)
+        await pipeline.submit("burst 5")
+        while pipeline.processed < 6:
+            await asyncio.sleep(0.01)
+        await bus.join()
+        await pipeline.close()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5.0))
+
+    assert vault.commits == [f"burst {i}" for i in range(6)]
+    assert vault.groups == [6]
+    assert publish_calls == [6]
+    assert len(frames) == 6
@@ -0,0 +1,39 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sati import SATI
+from session import SessionRegistry
+
+
+def test_sessions_keep_independent_vibe_state():
+    sati = SATI()
+    registry = SessionRegistry(shards=4)
+    calm = registry.open("calm-client")
+    alarmed = registry.open("alarmed-client")
+
+    sati.observe("breathe", 0.3, "CALM", state=calm)
+    sati.observe("alert", -0.7, "WARNING", state=alarmed)
+    sati.encode_intent("breathe", state=calm)
+
+    assert calm.current_vibe == {"score": 0.3, "tone": "CALM", "intensity": 0.3}
+    assert alarmed.current_vibe == {"score": -0.7, "tone": "WARNING", "intensity": 0.7}
+    assert alarmed.last_intent_vector == []
+    assert registry.open("calm-client") is calm
+    assert sati.current_vibe["tone"] == "NEUTRAL"
+
+
+def test_idle_sessions_are_evicted_and_capacity_is_bounded():
+    registry = SessionRegistry(shards=1, idle_timeout=10.0, max_sessions=2)
+    stale = registry.open("stale")
+    registry.open("fresh")
+    stale.last_seen -= 60.0
+
+    assert registry.evict_idle() == 1
+    assert registry.get("stale") is None
+
+    registry.open("second")
+    registry.open("third")
+    assert len(registry) == 2
+    assert registry.get("fresh") is None
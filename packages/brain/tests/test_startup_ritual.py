@@ -0,0 +1,35 @@
+from pathlib import Path
+import asyncio
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from memory.embedder import NGramEncoder
+from rituals.startup_ritual import WARMUP_TEXTS, perform_startup_ritual
+
+
+class WarmVault:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.warmed = False
+
+    def warm(self):
+        if self.fail:
+            raise OSError("index unreadable")
+        self.warmed = True
+        return 3
+
+
+def test_ritual_warms_vault_and_prefills_encoder():
+    vault = WarmVault()
+    encoder = NGramEncoder()
+
+    assert asyncio.run(perform_startup_ritual(vault=vault, embedder=encoder)) is True
+
+    assert vault.warmed
+    encoder.embed(list(WARMUP_TEXTS))
+    assert encoder.hits == len(WARMUP_TEXTS)
+
+
+def test_ritual_fails_when_the_index_cannot_load():
+    assert asyncio.run(perform_startup_ritual(vault=WarmVault(fail=True))) is False
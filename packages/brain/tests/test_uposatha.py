@@ -0,0 +1,120 @@
+from pathlib import Path
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("chromadb")
+
+from memory.vault import Vault
+from rituals.uposatha import UposathaCleaner
+
+
+OLD_DATE = (datetime.now() - timedelta(days=20)).isoformat()
+
+
+def _seed(vault, phantoms, keepers):
+    texts, metadatas = [], []
+    for i in range(phantoms):
+        texts.append(f"ghost {i}")
+        metadatas.append({"id": f"phantom_{i}", "usage_count": 1, "last_synced": OLD_DATE})
+    for i in range(keepers):
+        texts.append(f"vibrant {i}")
+        metadatas.append({"id": f"vibrant_{i}", "usage_count": 1, "last_synced": datetime.now().isoformat()})
+    vault.store_gems(texts, metadatas)
+
+
+def test_paged_cleanse_releases_only_phantoms(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"))
+    _seed(vault, phantoms=25, keepers=10)
+    vault.store_gem("noble", {"id": "noble", "usage_count": 5, "last_synced": OLD_DATE})
+
+    result = UposathaCleaner(vault.client, vault=vault, page_size=7, pause_seconds=0).cleanse_entropy()
+
+    assert result == {"status": "purified", "deleted_count": 25}
+    remaining = set(vault.gems.get()["ids"])
+    assert remaining == {f"vibrant_{i}" for i in range(10)} | {"noble"}
+    vault.close()
+
+
+def test_budgeted_cleanse_resumes_where_it_stopped(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"))
+    _seed(vault, phantoms=12, keepers=3)
+    cleaner = UposathaCleaner(vault.client, vault=vault, page_size=5, pause_seconds=0)
+
+    first = cleaner.cleanse_entropy(max_deletes=5)
+    assert first["status"] == "partial"
+    assert first["deleted_count"] == 5
+
+    second = cleaner.cleanse_entropy()
+    assert second["deleted_count"] == 7
+    assert cleaner.progress is None
+    assert vault.gems.count() == 3
+    vault.close()
+
+
+def test_uposatha_flushes_pending_resonance_before_judgment(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), flush_interval=60.0)
+    vault.store_gem("REVIVED", {"id": "gem_revived", "usage_count": 2, "last_synced": OLD_DATE})
+    vault.update_resonance("gem_revived")
+
+    result = UposathaCleaner(vault.client, vault=vault).cleanse_entropy()
+
+    assert result["deleted_count"] == 0
+    assert vault.gems.get(ids=["gem_revived"])["ids"] == ["gem_revived"]
+    vault.close()
+
+
+def test_partitioned_cleanse_promotes_resonant_gems_and_drops_expired_partitions(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), partitioning="day")
+    now = datetime.now()
+
+    vault.gems.clock = lambda: now - timedelta(days=30)
+    _seed(vault, phantoms=6, keepers=2)
+    vault.store_gem("noble", {"id": "noble", "usage_count": 5, "last_synced": OLD_DATE})
+    vault.gems.clock = lambda: now
+    vault.store_gem("fresh", {"id": "fresh", "usage_count": 1, "last_synced": OLD_DATE})
+    expired_name = vault.gems.partition_for(now - timedelta(days=30)).name
+
+    result = UposathaCleaner(vault.client, vault=vault, page_size=3).cleanse_entropy()
+
+    # Recently synced but faint gems go with their partition too
+    assert result == {
+        "status": "purified", "deleted_count": 8, "promoted_count": 1, "dropped_partitions": 1,
+    }
+    assert expired_name not in {p.name for p in vault.gems.partitions()}
+    noble = vault.gems.collection(vault.gems.noble_name)
+    assert noble.get(include=[])["ids"] == ["noble"]
+    # Only whole expired partitions go; the current one is untouched
+    assert set(vault.gems.get()["ids"]) == {"noble", "fresh"}
+    assert vault.find_resonant("ghost 0") is None
+    assert vault.find_resonant("vibrant 0") is None
+
+    assert UposathaCleaner(vault.client, vault=vault).cleanse_entropy()["status"] == "stable"
+    vault.close()
+
+
+def test_partitioned_cleanse_still_judges_noble_and_unpartitioned_gems(tmp_path):
+    path = str(tmp_path / "vault")
+    legacy = Vault(persist_path=path)
+    _seed(legacy, phantoms=3, keepers=1)
+    legacy.close()
+
+    vault = Vault(persist_path=path, partitioning="day")
+    vault.gems.noble().upsert(
+        ids=["faded_noble", "steady_noble"],
+        documents=["faded", "steady"],
+        embeddings=vault.embedder.embed(["faded", "steady"]),
+        metadatas=[
+            {"usage_count": 1, "last_synced": OLD_DATE},
+            {"usage_count": 9, "last_synced": OLD_DATE},
+        ],
+    )
+
+    result = UposathaCleaner(vault.client, vault=vault, page_size=2, pause_seconds=0).cleanse_entropy()
+
+    assert result == {"status": "purified", "deleted_count": 4, "promoted_count": 0, "dropped_partitions": 0}
+    assert set(vault.gems.get()["ids"]) == {"vibrant_0", "steady_noble"}
+    vault.close()
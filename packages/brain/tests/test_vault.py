@@ -0,0 +1,280 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("chromadb")
+
+from memory.embedder import NGramEncoder
+from memory.vault import Vault
+
+
+def test_repeated_intent_resonates_instead_of_duplicating(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"))
+
+    first_id, first_resonated = vault.resonate_or_store("LIGHT THE ORB", {"source": "voice"})
+    second_id, second_resonated = vault.resonate_or_store("LIGHT THE ORB", {"source": "voice"})
+
+    assert (first_resonated, second_resonated) == (False, True)
+    assert first_id == second_id
+    assert vault.gems.count() == 1
+    assert vault.get_usage_count(first_id) == 2
+
+
+def test_nearest_neighbour_stage_finds_gems_missing_from_the_hash_index(tmp_path):
+    path = str(tmp_path / "vault")
+    Vault(persist_path=path).store_gem("LIGHT THE ORB", {"id": "gem_light"})
+
+    # A fresh process starts with an empty hash index
+    vault = Vault(persist_path=path)
+    assert vault.find_resonant("LIGHT THE ORB") == "gem_light"
+    assert vault.find_resonant("DIM THE ORB") is None
+
+
+def test_forgotten_gem_is_stored_again(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"))
+    gem_id, _ = vault.resonate_or_store("ECHO", {})
+    vault.gems.delete(ids=[gem_id])
+    vault.forget([gem_id])
+
+    new_id, resonated = vault.resonate_or_store("ECHO", {})
+
+    assert not resonated
+    assert new_id != gem_id
+
+
+def test_forget_drops_every_text_that_resolved_to_the_gem(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), embedder=NGramEncoder(), dedup_threshold=0.5)
+    gem_id, _ = vault.resonate_or_store("LIGHT THE ORB", {})
+    near_id, resonated = vault.resonate_or_store("LIGHT THE ORB NOW", {})
+    assert (near_id, resonated) == (gem_id, True)
+
+    vault.gems.delete(ids=[gem_id])
+    vault.forget([gem_id])
+
+    assert vault._text_index == {}
+    assert vault.find_resonant("LIGHT THE ORB") is None
+    assert vault.find_resonant("LIGHT THE ORB NOW") is None
+
+
+def test_resonance_flush_forgets_gems_deleted_underneath(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), embedder=NGramEncoder(), dedup_threshold=0.5,
+                  flush_interval=60.0)
+    gem_id, _ = vault.resonate_or_store("LIGHT THE ORB", {})
+    vault.resonate_or_store("LIGHT THE ORB NOW", {})
+
+    # Released by another process (e.g. Uposatha) with resonance still pending
+    vault.gems.delete(ids=[gem_id])
+    assert vault.flush() == 0
+
+    assert vault.find_resonant("LIGHT THE ORB") is None
+    assert vault.find_resonant("LIGHT THE ORB NOW") is None
+    vault.close()
+
+
+NEAR_MISSES = [
+    ("set the brightness to 10 percent", "set the brightness to 100 percent"),
+    ("please do not delete the archive tonight", "please do delete the archive tonight"),
+    ("set brightness to 10", "set brightness to 100"),
+]
+
+
+@pytest.mark.parametrize("first, second", NEAR_MISSES)
+def test_near_miss_intents_stay_distinct_without_a_semantic_threshold(tmp_path, first, second):
+    path = str(tmp_path / "vault")
+    vault = Vault(persist_path=path, embedder=NGramEncoder(), dedup_threshold=None)
+    first_id, _ = vault.resonate_or_store(first, {})
+    second_id, resonated = vault.resonate_or_store(second, {})
+    assert not resonated
+    assert second_id != first_id
+
+    # Identical intents still resonate through Chroma once the text index is cold
+    restarted = Vault(persist_path=path, embedder=NGramEncoder(), dedup_threshold=None)
+    assert restarted.find_resonant(first) == first_id
+    assert restarted.find_resonant(second) == second_id
+
+
+def test_each_embedder_writes_its_own_collection(tmp_path):
+    path = str(tmp_path / "vault")
+    Vault(persist_path=path).store_gem("LIGHT THE ORB", {"id": "gem_hashed"})
+    Vault(persist_path=path, partitioning="day").store_gem("DIM THE ORB", {"id": "gem_partitioned"})
+
+    # Opening with the n-gram encoder re-embeds the hash-chain gems once
+    encoded = Vault(persist_path=path, embedder=NGramEncoder())
+    assert encoded.collection_name == "vocal_resonance_gems_char-ngram"
+    assert [c.name for c in encoded.client.list_collections()] == ["vocal_resonance_gems_char-ngram"]
+    assert encoded.gems.count() == 2
+    assert encoded.find_resonant("LIGHT THE ORB") == "gem_hashed"
+    assert encoded.recall("dim the orb", k=1)[0]["id"] == "gem_partitioned"
+
+    assert Vault(persist_path=path, embedder=NGramEncoder()).migrate_legacy_gems() == 0
+
+
+def test_resonance_is_coalesced_until_flush(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), flush_interval=60.0)
+    vault.store_gem("HOT INTENT", {"id": "gem_hot"})
+
+    for _ in range(100):
+        vault.update_resonance("gem_hot")
+
+    assert vault.gems.get(ids=["gem_hot"])["metadatas"][0]["usage_count"] == 1
+    assert vault.get_usage_count("gem_hot") == 101
+
+    vault.flush()
+    assert vault.gems.get(ids=["gem_hot"])["metadatas"][0]["usage_count"] == 101
+    assert vault.get_usage_count("gem_hot") == 101
+    vault.close()
+
+
+def test_usage_count_is_consistent_during_a_flush(tmp_path):
+    import threading
+
+    vault = Vault(persist_path=str(tmp_path / "vault"), flush_interval=60.0)
+    vault.store_gem("HOT INTENT", {"id": "gem_hot"})
+    for _ in range(3):
+        vault.update_resonance("gem_hot")
+    vault.hot.discard(["gem_hot"])
+    seen = []
+    readers = []
+
+    class SlowUpdates:
+        # Reads the count while the delta is swapped out but not yet written
+        def __init__(self, gems):
+            self.gems = gems
+
+        def __getattr__(self, name):
+            return getattr(self.gems, name)
+
+        def update(self, **kwargs):
+            reader = threading.Thread(target=lambda: seen.append(vault.get_usage_count("gem_hot")))
+            reader.start()
+            readers.append(reader)
+            reader.join(0.2)
+            self.gems.update(**kwargs)
+
+    vault.gems = SlowUpdates(vault.gems)
+    vault.flush()
+    readers[0].join(5.0)
+
+    assert seen == [4]
+    vault.close()
+
+
+def test_hot_tier_answers_recent_lookups_without_chroma(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), flush_interval=60.0)
+    vault.store_gem("RECENT", {"id": "gem_recent"})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cold tier should not be queried")
+
+    vault.gems.query = fail
+    vault.gems.get = fail
+    vault._text_index.clear()
+
+    assert vault.find_resonant("RECENT") == "gem_recent"
+    assert vault.get_gem("gem_recent")["document"] == "RECENT"
+    assert vault.hot_stats()["hits"] == 2
+
+
+def test_hot_tier_evicts_least_resonant_of_the_oldest():
+    from memory.vault import HotTier
+    import numpy as np
+
+    tier = HotTier(capacity=3, dimensions=4, eviction_sample=2)
+    tier.put("noble", "a", {"usage_count": 9}, np.array([1, 0, 0, 0]))
+    tier.put("phantom", "b", {"usage_count": 1}, np.array([0, 1, 0, 0]))
+    tier.put("fresh", "c", {"usage_count": 1}, np.array([0, 0, 1, 0]))
+    tier.put("newest", "d", {"usage_count": 1}, np.array([0, 0, 0, 1]))
+
+    assert "phantom" not in tier
+    assert "noble" in tier
+    assert tier.nearest(np.array([0, 0, 0, 2]), 0.99)[0] == "newest"
+    assert tier.nearest(np.array([0, 1, 0, 0]), 0.99) is None
+
+
+def test_warm_loads_recent_gems_into_memory(tmp_path):
+    path = str(tmp_path / "vault")
+    Vault(persist_path=path).store_gems(
+        ["FIRST LIGHT", "SECOND LIGHT", "THIRD LIGHT"], [{"id": "gem_1"}, {"id": "gem_2"}, {"id": "gem_3"}]
+    )
+
+    vault = Vault(persist_path=path, hot_tier_size=2)
+    assert vault.warm() == 2
+
+    # The two most recent gems resolve without touching ChromaDB
+    assert "gem_3" in vault.hot and "gem_2" in vault.hot
+    vault.gems = None
+    assert vault.find_resonant("THIRD LIGHT") == "gem_3"
+
+
+def _recall_vault(tmp_path):
+    vault = Vault(persist_path=str(tmp_path / "vault"), embedder=NGramEncoder(), dedup_threshold=None)
+    vault.store_gems(
+        ["wake up the light", "wake the light up now", "calm the ocean"],
+        [
+            {"id": "light", "emotional_tone": "WAKING", "ritual_tag": "normal", "usage_count": 1},
+            {"id": "light_now", "emotional_tone": "WAKING", "ritual_tag": "normal", "usage_count": 40},
+            {"id": "ocean", "emotional_tone": "CALM", "ritual_tag": "uposatha", "usage_count": 3},
+        ],
+    )
+    return vault
+
+
+def test_recall_returns_top_k_with_metadata_filters(tmp_path):
+    vault = _recall_vault(tmp_path)
+
+    hits = vault.recall("wake up the light", k=2)
+    assert [hit["id"] for hit in hits] == ["light", "light_now"]
+    assert hits[0]["similarity"] == pytest.approx(1.0, abs=1e-4)
+
+    assert [hit["id"] for hit in vault.recall("wake up the light", k=3, tone="CALM")] == ["ocean"]
+    assert [hit["id"] for hit in vault.recall("light", k=3, min_usage=10)] == ["light_now"]
+    assert vault.recall("light", k=3, tone="WAKING", ritual_tag="uposatha") == []
+
+    batched = vault.recall(["wake up the light", "calm the ocean"], k=1)
+    assert [[hit["id"] for hit in hits] for hits in batched] == [["light"], ["ocean"]]
+
+
+def test_recall_rerank_weighs_resonance(tmp_path):
+    vault = _recall_vault(tmp_path)
+
+    plain = vault.recall("wake up the light", k=2, rerank=True, resonance_weight=0.0)
+    assert [hit["id"] for hit in plain] == ["light", "light_now"]
+
+    # Enough weight on resonance lifts the heavily used near match
+    resonant = vault.recall("wake up the light", k=2, rerank=True, resonance_weight=0.5)
+    assert [hit["id"] for hit in resonant] == ["light_now", "light"]
+    assert resonant[0]["score"] > resonant[1]["score"]
+
+
+def test_single_flight_shares_one_execution():
+    import threading
+    from memory.vault import SingleFlight
+
+    joined = threading.Event()
+    flight = SingleFlight(on_join=lambda key: joined.set())
+    started = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        started.set()
+        # Finish only once the follower has joined this call
+        assert joined.wait(5.0)
+        return "hits"
+
+    outcomes = []
+    leader = threading.Thread(target=lambda: outcomes.append(flight.do("q", lookup)))
+    leader.start()
+    assert started.wait(5.0)
+    follower = threading.Thread(target=lambda: outcomes.append(flight.do("q", lookup)))
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert len(calls) == 1
+    assert sorted(outcomes) == [("hits", False), ("hits", True)]
+    # Finished calls are not cached
+    assert flight.do("q", lambda: "fresh") == ("fresh", False)
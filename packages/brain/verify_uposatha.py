@@ -22,7 +22,7 @@ def verify_uposatha():
     print("Gems stored.")
 
     # 2. Run Ritual
-    cleaner = UposathaCleaner(vault.client)
+    cleaner = UposathaCleaner(vault.client, vault=vault)
     print("Invoking Uposatha...")
     result = cleaner.cleanse_entropy()
     print(f"Ritual Result: {result}")